@@ -1,4 +1,5 @@
 // Shared Evolution API helper functions
+import { tracedFetch } from "./tracing.ts";
 
 export interface EvolutionAPIConfig {
   baseUrl: string;
@@ -21,7 +22,7 @@ export async function sendEvolutionMessage(
   try {
     const url = `${config.baseUrl}/message/sendText/${config.instanceName}`;
     
-    const response = await fetch(url, {
+    const response = await tracedFetch(url, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
@@ -1,4 +1,6 @@
 // Shared OpenAI helper functions
+import { tracedFetch } from "./tracing.ts";
+
 export interface OpenAIRequest {
   prompt: string;
   systemPrompt?: string;
@@ -45,7 +47,9 @@ export async function callOpenAI(request: OpenAIRequest): Promise<OpenAIResponse
   // Add current user message
   messages.push({ role: "user", content: request.prompt });
 
-  const response = await fetch("https://api.openai.com/v1/chat/completions", {
+  // OPENAI_BASE_URL lets local runs point at a stand-in server
+  const openaiBaseUrl = Deno.env.get("OPENAI_BASE_URL") ?? "https://api.openai.com/v1";
+  const response = await tracedFetch(`${openaiBaseUrl}/chat/completions`, {
     method: "POST",
     headers: {
       "Authorization": `Bearer ${openaiApiKey}`,
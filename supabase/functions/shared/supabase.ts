@@ -1,5 +1,6 @@
 // Shared Supabase client for Edge Functions
 import { createClient } from "https://esm.sh/@supabase/supabase-js@2.39.0";
+import { tracedFetch } from "./tracing.ts";
 
 const supabaseUrl = Deno.env.get("SUPABASE_URL")!;
 const supabaseServiceKey = Deno.env.get("SUPABASE_SERVICE_ROLE_KEY")!;
@@ -9,5 +10,8 @@ export const supabase = createClient(supabaseUrl, supabaseServiceKey, {
     autoRefreshToken: false,
     persistSession: false,
   },
+  global: {
+    fetch: tracedFetch,
+  },
 });
 
@@ -0,0 +1,27 @@
+// Request-ID propagation for Edge Functions
+import { AsyncLocalStorage } from "node:async_hooks";
+
+const requestIds = new AsyncLocalStorage<string>();
+
+/**
+ * Run a handler with the caller's X-Request-Id (if any) in scope, so every
+ * outbound call made through tracedFetch carries it. Load tests use this to
+ * line up Supabase, OpenAI and Evolution calls with the message that caused them.
+ */
+export function withRequestId<T>(req: Request, handler: () => T): T {
+  const requestId = req.headers.get("x-request-id");
+  return requestId ? requestIds.run(requestId, handler) : handler();
+}
+
+/**
+ * fetch that forwards the current request ID; identical to fetch otherwise
+ */
+export const tracedFetch: typeof fetch = (input, init) => {
+  const requestId = requestIds.getStore();
+  if (!requestId) {
+    return fetch(input, init);
+  }
+  const headers = new Headers(init?.headers ?? (input instanceof Request ? input.headers : undefined));
+  headers.set("X-Request-Id", requestId);
+  return fetch(input, { ...init, headers });
+};
@@ -5,6 +5,7 @@ import { encryption } from "../../shared/encryption.ts";
 import { callOpenAI } from "../../shared/openai.ts";
 import { sendEvolutionMessage, type EvolutionAPIConfig } from "../../shared/evolution.ts";
 import { checkMessageLimit } from "../../shared/subscription-limits.ts";
+import { withRequestId } from "../../shared/tracing.ts";
 
 interface EvolutionWebhookPayload {
   event: string;
@@ -12,7 +13,7 @@ interface EvolutionWebhookPayload {
   data: any;
 }
 
-serve(async (req) => {
+serve((req) => withRequestId(req, async () => {
   try {
     // Handle CORS
     if (req.method === "OPTIONS") {
@@ -20,7 +21,7 @@ serve(async (req) => {
         headers: {
           "Access-Control-Allow-Origin": "*",
           "Access-Control-Allow-Methods": "POST, OPTIONS",
-          "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type",
+          "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type, x-request-id",
         },
       });
     }
@@ -307,5 +308,5 @@ serve(async (req) => {
       headers: { "Content-Type": "application/json" },
     });
   }
-});
+}));
 
@@ -2,32 +2,42 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
+from harness import vitals, waits, waterfall
+
+# Opts out of the shared login: this test exercises the login form itself
+SHARED_LOGIN = False
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # When a runner hands us a context it also owns the browser behind it
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
+        waits.track(context)
         
         # Open a new page in the browser context
         page = await context.new_page()
+        # Record Web Vitals and when the dashboard cards appear
+        await vitals.install(page)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
@@ -48,12 +58,12 @@ async def run_test():
         # Interact with the page elements to simulate user flow
         # -> Navigate to the login page (/login)
         await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # -> Check if the base URL is correct or try to navigate to the homepage to find a login link
         await page.goto('http://localhost:8080', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # -> Try to scroll down to find any hidden navigation or login links
@@ -62,33 +72,34 @@ async def run_test():
 
         # -> Try to reload the homepage to see if elements load properly
         await page.goto('http://localhost:8080', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # -> Click the 'Fazer Login' button to navigate to the login page
         frame = context.pages[-1]
         # Click the 'Fazer Login' button to go to login page
         elem = frame.locator('xpath=html/body/div/div[2]/div/div/div/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # -> Input the registered email and password, then click the login button
         frame = context.pages[-1]
         # Input the registered email into the email field
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('pguillen551@gmail.com')
+        await waits.locator_ready(elem); await elem.fill('pguillen551@gmail.com')
         
 
         frame = context.pages[-1]
         # Input the registered password into the password field
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456789')
+        await waits.locator_ready(elem); await elem.fill('123456789')
         
 
         frame = context.pages[-1]
         # Click the login button to submit the form
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        dashboard_load = waterfall.start(context, "dashboard")
+        await waits.locator_ready(elem); await vitals.mark(page, "login-submit"); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # --> Assertions to verify final state
@@ -99,15 +110,18 @@ async def run_test():
         await expect(frame.locator('text=Mensagens Hoje').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Conversas Ativas').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Agendamentos Hoje').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
+        # The cards must also show up within the budgets.json limits after submitting
+        await vitals.check_budgets(page, "TC003", since="login-submit")
+        # ...and load with a bounded number of Supabase queries and serial round trips
+        await waterfall.check_budget(dashboard_load, "TC003")
     
     finally:
-        if context:
+        if owns_context and context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
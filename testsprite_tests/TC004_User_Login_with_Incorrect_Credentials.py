@@ -2,29 +2,34 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
+from harness import waits
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # When a runner hands us a context it also owns the browser behind it
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
+        waits.track(context)
         
         # Open a new page in the browser context
         page = await context.new_page()
@@ -50,19 +55,19 @@ async def run_test():
         frame = context.pages[-1]
         # Enter incorrect email in the email input field
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('pguillen551@gmail.com')
+        await waits.locator_ready(elem); await elem.fill('pguillen551@gmail.com')
         
 
         frame = context.pages[-1]
         # Enter incorrect password in the password input field
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456789')
+        await waits.locator_ready(elem); await elem.fill('123456789')
         
 
         frame = context.pages[-1]
         # Click the login button to submit the form
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # --> Assertions to verify final state
@@ -71,15 +76,14 @@ async def run_test():
             await expect(frame.locator('text=Login Successful').first).to_be_visible(timeout=3000)
         except AssertionError:
             raise AssertionError('Test case failed: Login should fail with incorrect email or password, but the success message was not found as expected.')
-        await asyncio.sleep(5)
     
     finally:
-        if context:
+        if owns_context and context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -2,29 +2,37 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
+from harness import auth, waits
+
+# Start from the run's shared login instead of the login form
+SHARED_LOGIN = True
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # When a runner hands us a context it also owns the browser behind it
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
+        waits.track(context)
         
         # Open a new page in the browser context
         page = await context.new_page()
@@ -52,81 +60,67 @@ async def run_test():
 
         # -> Try to navigate directly to the login page or agent creation page using URL navigation
         await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # -> Try to navigate directly to the agent creation page or agent list page to find login or access options
         await page.goto('http://localhost:8080/agents/new', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # -> Try to navigate to the agent list page or login page to verify if the application is functioning or if this is a broader issue
         await page.goto('http://localhost:8080/agents', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # -> Try to navigate back to the login page or refresh the page to check for UI loading issues
         await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # -> Input email and password and click the login button to authenticate
-        frame = context.pages[-1]
-        # Input the email address
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('pguillen551@gmail.com')
-        
-
-        frame = context.pages[-1]
-        # Input the password
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456789')
-        
-
-        frame = context.pages[-1]
-        # Click the login button to submit the form
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # Log in as the configured user, reusing the run's cached session when there is one
+        await auth.login(page)
         
 
         # -> Click on 'Agentes' in the sidebar or 'Criar Agente' quick action to navigate to the new agent creation page
         frame = context.pages[-1]
         # Click on 'Agentes' in the sidebar to navigate to agents list or creation page
         elem = frame.locator('xpath=html/body/div/div[2]/aside/div/nav/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # -> Click the 'Criar Agente' button to open the new agent creation form
         frame = context.pages[-1]
         # Click the 'Criar Agente' button to start creating a new agent
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # -> Attempt to submit the form with all mandatory fields empty to verify validation error messages
         frame = context.pages[-1]
         # Click the 'Criar Agente' button to submit the form with empty mandatory fields
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[2]/form/div[5]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # -> Fill the mandatory fields 'Nome do Agente' and 'Descrição' with valid data and submit the form
         frame = context.pages[-1]
         # Fill 'Nome do Agente' with valid name
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Assistente de Vendas')
+        await waits.locator_ready(elem); await elem.fill('Assistente de Vendas')
         
 
         frame = context.pages[-1]
         # Fill 'Descrição' with valid description
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[2]/form/div[2]/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Este agente ajuda com vendas e atendimento ao cliente.')
+        await waits.locator_ready(elem); await elem.fill('Este agente ajuda com vendas e atendimento ao cliente.')
         
 
         frame = context.pages[-1]
         # Click 'Criar Agente' button to submit the form with all mandatory fields filled
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[2]/form/div[5]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # --> Assertions to verify final state
@@ -135,15 +129,14 @@ async def run_test():
             await expect(frame.locator('text=Agent Creation Successful').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError('Test case failed: The AI agent creation test did not pass as expected. Validation errors for mandatory fields were not properly handled or the agent was not created successfully.')
-        await asyncio.sleep(5)
     
     finally:
-        if context:
+        if owns_context and context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
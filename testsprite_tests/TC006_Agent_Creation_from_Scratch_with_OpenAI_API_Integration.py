@@ -2,29 +2,37 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
+from harness import auth, waits
+
+# Start from the run's shared login instead of the login form
+SHARED_LOGIN = True
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # When a runner hands us a context it also owns the browser behind it
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
+        waits.track(context)
         
         # Open a new page in the browser context
         page = await context.new_page()
@@ -50,77 +58,63 @@ async def run_test():
         frame = context.pages[-1]
         # Click the 'Return to Home' link to navigate back to the home page
         elem = frame.locator('xpath=html/body/div/div[2]/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # -> Click the 'Fazer Login' button to log in with provided credentials and access the agent creation page.
         frame = context.pages[-1]
         # Click the 'Fazer Login' button to proceed to login page
         elem = frame.locator('xpath=html/body/div/div[2]/div/div/div/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # -> Input email and password, then click the 'Entrar' button to log in.
-        frame = context.pages[-1]
-        # Input the email address
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('pguillen551@gmail.com')
-        
-
-        frame = context.pages[-1]
-        # Input the password
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456789')
-        
-
-        frame = context.pages[-1]
-        # Click the 'Entrar' button to submit login form
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # Log in as the configured user, reusing the run's cached session when there is one
+        await auth.login(page)
         
 
         # -> Click the 'Criar Agente' quick action button to start the agent creation process.
         frame = context.pages[-1]
         # Click the 'Criar Agente' quick action button to start creating a new AI agent
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[4]/div/div').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # -> Fill in the 'Nome do Agente' field with a name, 'Descrição' with a description, 'Prompt Personalizado' with a custom prompt, adjust temperature and max tokens if needed, then submit the form.
         frame = context.pages[-1]
         # Input agent name
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Assistente de Vendas')
+        await waits.locator_ready(elem); await elem.fill('Assistente de Vendas')
         
 
         frame = context.pages[-1]
         # Input agent description
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[2]/form/div[2]/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Este agente ajuda a responder perguntas relacionadas a vendas e suporte ao cliente.')
+        await waits.locator_ready(elem); await elem.fill('Este agente ajuda a responder perguntas relacionadas a vendas e suporte ao cliente.')
         
 
         frame = context.pages[-1]
         # Input custom prompt
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[2]/form/div[3]/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Você é um assistente de vendas especializado em fornecer respostas rápidas e precisas para clientes.')
+        await waits.locator_ready(elem); await elem.fill('Você é um assistente de vendas especializado em fornecer respostas rápidas e precisas para clientes.')
         
 
         frame = context.pages[-1]
         # Set temperature to 0.7
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[2]/form/div[4]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('0.7')
+        await waits.locator_ready(elem); await elem.fill('0.7')
         
 
         frame = context.pages[-1]
         # Set max tokens to 1000
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[2]/form/div[4]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1000')
+        await waits.locator_ready(elem); await elem.fill('1000')
         
 
         frame = context.pages[-1]
         # Click 'Criar Agente' button to submit the form and create the agent
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[2]/form/div[5]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # --> Assertions to verify final state
@@ -129,15 +123,14 @@ async def run_test():
             await expect(frame.locator('text=Agent creation failed due to OpenAI API connection error').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: Creating a new AI agent from scratch did not succeed with OpenAI API integration and configurable AI parameters as expected.")
-        await asyncio.sleep(5)
     
     finally:
-        if context:
+        if owns_context and context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -2,29 +2,37 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
+from harness import auth, waits
+
+# Start from the run's shared login instead of the login form
+SHARED_LOGIN = True
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # When a runner hands us a context it also owns the browser behind it
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
+        waits.track(context)
         
         # Open a new page in the browser context
         page = await context.new_page()
@@ -52,70 +60,56 @@ async def run_test():
 
         # -> Try to find a way to navigate to WhatsApp integration configuration or reload the page
         await page.goto('http://localhost:8080/agents', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # -> Check if login is required or try to access a login page to authenticate and reveal the UI
         await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # -> Input valid credentials and submit login form to access the portal
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('pguillen551@gmail.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for login
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456789')
-        
-
-        frame = context.pages[-1]
-        # Click Entrar button to submit login form
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # Log in as the configured user, reusing the run's cached session when there is one
+        await auth.login(page)
         
 
         # -> Click on 'Agentes' button to go to agents management page to create or configure an agent
         frame = context.pages[-1]
         # Click 'Agentes' button to manage agents
         elem = frame.locator('xpath=html/body/div/div[2]/aside/div/nav/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # -> Click 'Novo Agente' button to start creating a new agent
         frame = context.pages[-1]
         # Click 'Novo Agente' button to create a new agent
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # -> Fill in the 'Nome do Agente' with 'WhatsApp Integration Agent', 'Descrição' with a brief description, and 'Prompt Personalizado' with a relevant prompt, then submit the form.
         frame = context.pages[-1]
         # Fill in the agent name
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('WhatsApp Integration Agent')
+        await waits.locator_ready(elem); await elem.fill('WhatsApp Integration Agent')
         
 
         frame = context.pages[-1]
         # Fill in the agent description
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[2]/form/div[2]/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Agente para integração com WhatsApp usando Evolution API.')
+        await waits.locator_ready(elem); await elem.fill('Agente para integração com WhatsApp usando Evolution API.')
         
 
         frame = context.pages[-1]
         # Fill in the custom prompt
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[2]/form/div[3]/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Você é um agente especializado em integração com WhatsApp via Evolution API.')
+        await waits.locator_ready(elem); await elem.fill('Você é um agente especializado em integração com WhatsApp via Evolution API.')
         
 
         frame = context.pages[-1]
         # Click 'Criar Agente' button to submit the form and create the agent
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[2]/form/div[5]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # --> Assertions to verify final state
@@ -124,15 +118,14 @@ async def run_test():
             await expect(frame.locator('text=Connection Successful').first).to_be_visible(timeout=3000)
         except AssertionError:
             raise AssertionError('Test plan failed: WhatsApp connection test did not pass and confirmation was not shown.')
-        await asyncio.sleep(5)
     
     finally:
-        if context:
+        if owns_context and context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -2,29 +2,37 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
+from harness import waits
+
+# Opts out of the shared login: this test checks protected routes before logging in
+SHARED_LOGIN = False
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # When a runner hands us a context it also owns the browser behind it
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
+        waits.track(context)
         
         # Open a new page in the browser context
         page = await context.new_page()
@@ -48,79 +56,79 @@ async def run_test():
         # Interact with the page elements to simulate user flow
         # -> Attempt to access protected route /dashboard without login
         await page.goto('http://localhost:8080/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # -> Navigate to login page to perform login with restricted role user
         await page.goto('http://localhost:8080/login', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # -> Input email and password, then submit login form
         frame = context.pages[-1]
         # Input email for login
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('pguillen551@gmail.com')
+        await waits.locator_ready(elem); await elem.fill('pguillen551@gmail.com')
         
 
         frame = context.pages[-1]
         # Input password for login
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456789')
+        await waits.locator_ready(elem); await elem.fill('123456789')
         
 
         frame = context.pages[-1]
         # Click login button to submit form
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # -> Click on 'Agentes' button to test access to agents functionality with restricted role
         frame = context.pages[-1]
         # Click on 'Agentes' button to test access control for restricted role
         elem = frame.locator('xpath=html/body/div/div[2]/aside/div/nav/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # -> Reload the current page to verify session persistence and user remains authenticated
         await page.goto('http://localhost:8080/agents', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # -> Navigate to /dashboard to verify session persistence and access control
         await page.goto('http://localhost:8080/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # -> Click on 'Conversas' button to verify access control for restricted role
         frame = context.pages[-1]
         # Click on 'Conversas' button to verify access control for restricted role
         elem = frame.locator('xpath=html/body/div/div[2]/aside/div/nav/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # -> Click on 'Agendamentos' button to verify access control for restricted role
         frame = context.pages[-1]
         # Click on 'Agendamentos' button to verify access control for restricted role
         elem = frame.locator('xpath=html/body/div/div[2]/aside/div/nav/button[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # -> Navigate to /relatorios to verify access control for restricted role
         await page.goto('http://localhost:8080/relatorios', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # -> Attempt to navigate to /logout to terminate session and verify access control after logout
         await page.goto('http://localhost:8080/logout', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # -> Click on 'Return to Home' link to navigate to home page and verify session status
         frame = context.pages[-1]
         # Click 'Return to Home' link to navigate to home page
         elem = frame.locator('xpath=html/body/div/div[2]/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # --> Assertions to verify final state
@@ -132,15 +140,14 @@ async def run_test():
         await expect(frame.locator('text=Fazer Login').first).to_be_visible(timeout=30000)
         frame = context.pages[-1]
         await expect(frame.locator('text=Fazer Login').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
     
     finally:
-        if context:
+        if owns_context and context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
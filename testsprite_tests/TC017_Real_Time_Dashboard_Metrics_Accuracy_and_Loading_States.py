@@ -2,32 +2,42 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
+from harness import auth, vitals, waits, waterfall
+
+# Start from the run's shared login instead of the login form
+SHARED_LOGIN = True
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # When a runner hands us a context it also owns the browser behind it
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
+        waits.track(context)
         
         # Open a new page in the browser context
         page = await context.new_page()
+        # Record Web Vitals and when the dashboard cards appear
+        await vitals.install(page)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
@@ -47,8 +57,15 @@ async def run_test():
         
         # Interact with the page elements to simulate user flow
         # -> Try to navigate directly to the dashboard URL /dashboard since no navigation elements are available
+        # The dashboard needs a session; reuse the run's cached one when there is one
+        await auth.login(page)
+        dashboard_load = waterfall.start(context, "dashboard")
         await page.goto('http://localhost:8080/dashboard', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
+        # Dashboard budgets: paint metrics and time until the four cards are visible
+        await expect(page.locator('text=Agendamentos Hoje').first).to_be_visible(timeout=30000)
+        await vitals.check_budgets(page, "TC017")
+        await waterfall.check_budget(dashboard_load, "TC017")
         
 
         # -> Try to reload the page or check for any hidden elements or scripts that might load the dashboard data
@@ -57,7 +74,7 @@ async def run_test():
 
         # -> Simulate failure in fetching dashboard data to check error handling UI
         await page.goto('http://localhost:8080/dashboard?simulateError=true', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.page_ready(page)
         
 
         # --> Assertions to verify final state
@@ -65,15 +82,14 @@ async def run_test():
             await expect(page.locator('text=Dashboard data loaded successfully').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError('Test failed: Dashboard did not load real-time statistics correctly or error handling UI did not display as expected after simulating data fetch failure.')
-        await asyncio.sleep(5)
     
     finally:
-        if context:
+        if owns_context and context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -1,30 +1,37 @@
 import asyncio
 from playwright import async_api
-from playwright.async_api import expect
 
-async def run_test():
+from harness import auth, devices, waits
+
+# Start from the run's shared login instead of the login form
+SHARED_LOGIN = True
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # When a runner hands us a context it also owns the browser behind it
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
+        waits.track(context)
         
         # Open a new page in the browser context
         page = await context.new_page()
@@ -50,60 +57,35 @@ async def run_test():
         frame = context.pages[-1]
         # Focus on the search input to test keyboard accessibility.
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
         # -> Trigger and verify visual feedback mechanisms on the form page.
         frame = context.pages[-1]
         # Click 'Criar Agente' button to trigger validation feedback or loading spinner.
         elem = frame.locator('xpath=html/body/div/div[2]/main/div/div/div[2]/form/div[5]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.locator_ready(elem); await elem.click(timeout=5000); await waits.settled(page)
         
 
-        # -> Resize viewport to mobile sizes and verify layout adapts without overflow or clipping.
-        await page.goto('http://localhost:8080/agents/new', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        await page.mouse.wheel(0, await page.evaluate('() => window.innerHeight'))
-        
-
-        await page.mouse.wheel(0, -await page.evaluate('() => window.innerHeight'))
-        
-
-        # -> Resize viewport to common mobile sizes (e.g., 375x667, 414x896) and verify layout adapts without overflow or clipping.
-        await page.goto('http://localhost:8080/agents/new', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        await page.mouse.wheel(0, await page.evaluate('() => window.innerHeight'))
-        
-
-        await page.mouse.wheel(0, -await page.evaluate('() => window.innerHeight'))
-        
-
-        # -> Navigate to the Dashboard page and verify mobile responsiveness and accessibility compliance.
-        frame = context.pages[-1]
-        # Click the 'Dashboard' button to navigate to the Dashboard page.
-        elem = frame.locator('xpath=html/body/div/div[2]/aside/div/nav/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Check every route at common mobile, tablet and desktop sizes for overflow or clipping.
+        # One context per device, all in parallel, instead of reloading /agents/new in this 1280x720 one
+        await auth.login(page)
+        results = await devices.run_matrix(devices.context_factory(context), storage_state=await context.storage_state())
+        devices.write_report(results)
         
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
-        try:
-            await expect(frame.locator('text=Mobile Responsiveness and Accessibility Verified').first).to_be_visible(timeout=1000)
-        except AssertionError:
-            raise AssertionError('Test plan failed: The application did not pass mobile responsiveness and accessibility compliance checks as expected.')
-        await asyncio.sleep(5)
+        broken = [r for r in results if r.blocking]
+        if broken:
+            raise AssertionError('Test plan failed: layout overflows or clips on some devices (tmp/device_matrix.json):\n' + devices.summary(broken))
     
     finally:
-        if context:
+        if owns_context and context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -0,0 +1,167 @@
+"""Collect the TC scripts as pytest tests.
+
+    python -m pytest testsprite_tests -k TC003
+    python -m pytest testsprite_tests -k "Login or Dashboard" --harness-supabase standin
+    python -m pytest testsprite_tests -n 4          # with pytest-xdist: one browser pool per worker
+    python -m pytest testsprite_tests --harness-target preview [--harness-warm-cache]
+    python -m pytest testsprite_tests --harness-record-impact
+
+Each ``TCxxx_*.py`` file becomes one test named after its TC id, so
+``-k`` matches ids and the words of the file name.  All tests of a
+session run their ``run_test`` coroutine on one event loop against
+session-scoped fixtures - the browser pool, the shared login, the
+Supabase stand-in (``--harness-supabase standin``) and the production
+bundle (``--harness-target preview``, one server, so not with xdist) -
+through the same :func:`harness.runner.run_case` the CLI runner uses, so
+HAR, step spans and impact recording behave identically.  Results still go to
+``tmp/run_results.json``, except under xdist, where the workers only
+report to pytest.  Impact fragments are files per TC, so the controlling
+process folds them into ``impact_map.json`` with or without xdist.
+
+The scripts only call ``asyncio.run(run_test())`` under ``__main__``, so
+collecting them runs nothing and each one still works standalone.  Plan
+entries without a script are collected from
+``testsprite_frontend_test_plan.json`` and compiled (:mod:`harness.compiler`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from pathlib import Path
+
+import pytest
+
+from harness import capture, compiler, har, impact, preview, spans, warmup
+from harness.auth import StorageStateCache
+from harness.runner import TC_PATTERN, RunSettings, TestCase, TestResult, run_case, start_pool, write_results
+from harness.standins.supabase import SupabaseStandin, load_seed
+
+_RESULTS = pytest.StashKey[list[TestResult]]()
+
+# Compiled plan modules are collected through the plan, not as scripts.
+collect_ignore = ["tmp"]
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("harness", "TC scripts")
+    group.addoption("--harness-pool-size", type=int, default=1, help="number of warm browsers")
+    group.addoption("--harness-headed", action="store_true", help="show the browser windows")
+    group.addoption("--harness-no-shared-login", action="store_true", help="make every test log in through the UI")
+    group.addoption("--harness-supabase", choices=["remote", "standin"], default="remote")
+    group.addoption("--harness-supabase-seed", type=Path, help="JSON seed for the stand-in")
+    group.addoption("--harness-har", choices=har.MODES, default="off")
+    group.addoption("--harness-video", choices=capture.MODES, default="off", help="keep test videos (tmp/artifacts)")
+    group.addoption("--harness-trace", choices=capture.MODES, default="off", help="keep Playwright traces (tmp/artifacts)")
+    group.addoption("--harness-spans", action="store_true", help="time individual steps (tmp/spans)")
+    group.addoption("--harness-target", choices=preview.TARGETS, default="dev", help="'preview' runs against the production build")
+    group.addoption("--harness-warm-cache", action="store_true", help="load the app once per context before each test")
+    group.addoption("--harness-no-warmup", action="store_true", help="do not wait for the dev server to warm up")
+    group.addoption("--harness-record-impact", action="store_true", help="record which src/ modules each passing test loads")
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if config.option.harness_record_impact and config.option.harness_target == "preview":
+        raise pytest.UsageError("--harness-record-impact needs the dev server; it cannot map the production bundle back to src/")
+    config.stash[_RESULTS] = []
+
+
+def pytest_collect_file(file_path: Path, parent: pytest.Collector) -> pytest.Collector | None:
+    if TC_PATTERN.match(file_path.name):
+        return TCScript.from_parent(parent, path=file_path)
+    if file_path == compiler.PLAN_PATH:
+        return TestPlan.from_parent(parent, path=file_path)
+    return None
+
+
+def _tc_item(parent: pytest.Collector, case: TestCase) -> pytest.Function:
+    def test(harness_loop, browser_pool, harness_settings, auth_cache, span_writer) -> None:
+        result = harness_loop.run_until_complete(run_case(browser_pool, case, harness_settings, auth_cache, span_writer))
+        parent.config.stash[_RESULTS].append(result)
+        for warning in result.warnings:
+            parent.warn(pytest.PytestWarning(f"{case.test_id}: {warning}"))
+        if not result.passed:
+            pytest.fail(result.error, pytrace=False)
+
+    return pytest.Function.from_parent(parent, name=case.test_id, callobj=test)
+
+
+class TCScript(pytest.File):
+    """A TC script, collected without importing it."""
+
+    def collect(self):
+        yield _tc_item(self, TestCase(TC_PATTERN.match(self.path.name).group(1), self.path))
+
+
+class TestPlan(pytest.File):
+    """The test plan's entries that have no script, compiled into TC modules."""
+
+    def collect(self):
+        scripts = {TC_PATTERN.match(p.name).group(1) for p in self.path.parent.glob("TC*.py") if TC_PATTERN.match(p.name)}
+        for compiled in compiler.compile_plan(plan_path=self.path):
+            if compiled.test_id not in scripts:
+                yield _tc_item(self, TestCase(compiled.test_id, compiled.path))
+
+
+@pytest.fixture(scope="session")
+def harness_loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def harness_settings(pytestconfig: pytest.Config):
+    option = pytestconfig.option
+    settings = RunSettings(
+        pool_size=option.harness_pool_size,
+        headless=not option.harness_headed,
+        shared_login=not option.harness_no_shared_login,
+        har_mode=option.harness_har,
+        spans_path=str(spans.new_trace_path()) if option.harness_spans else None,
+        video=option.harness_video,
+        trace=option.harness_trace,
+        warm_cache=option.harness_warm_cache,
+        record_impact=option.harness_record_impact,
+    )
+    with contextlib.ExitStack() as stack:
+        if option.harness_supabase == "standin":
+            seed = load_seed(option.harness_supabase_seed) if option.harness_supabase_seed else None
+            settings.supabase_standin = stack.enter_context(SupabaseStandin(seed=seed)).url
+        if option.harness_target == "preview":
+            preview.build()
+            stack.enter_context(preview.PreviewServer())
+        elif option.harness_har != "replay" and not option.harness_no_warmup:
+            warmed = asyncio.run(warmup.warm_up(headless=settings.headless, supabase_standin=settings.supabase_standin))
+            warmup.write_report(warmed)
+        yield settings
+
+
+@pytest.fixture(scope="session")
+def browser_pool(harness_loop, harness_settings):
+    pool = harness_loop.run_until_complete(start_pool(harness_settings))
+    yield pool
+    harness_loop.run_until_complete(pool.stop())
+
+
+@pytest.fixture(scope="session")
+def auth_cache(harness_settings):
+    return StorageStateCache(harness_settings.storage_state_path(), replay=harness_settings.har_mode == "replay") if harness_settings.shared_login else None
+
+
+@pytest.fixture(scope="session")
+def span_writer(harness_settings):
+    if not harness_settings.spans_path:
+        return None
+    spans.instrument()
+    return spans.SpanWriter(Path(harness_settings.spans_path))
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    if hasattr(session.config, "workerinput"):
+        return
+    results = session.config.stash[_RESULTS]
+    if results:
+        write_results(results)
+    if session.config.option.harness_record_impact:
+        impact.merge_fragments()
@@ -0,0 +1,10 @@
+"""Local runner and tooling for the TestSprite-generated TC scripts.
+
+Run from the ``testsprite_tests`` directory with ``python -m harness``.
+Submodules that drive a browser import Playwright themselves, so the
+package itself stays importable without it.
+"""
+
+from .config import SUITE_DIR, TMP_DIR, base_url, load_config
+
+__all__ = ["SUITE_DIR", "TMP_DIR", "base_url", "load_config"]
@@ -0,0 +1,158 @@
+"""Log in once per run and share the Supabase session between tests.
+
+Tests that set ``SHARED_LOGIN = True`` get a context preloaded with a
+cached ``storage_state`` (the Supabase session lives in localStorage) and
+call :func:`login`, which only fills the login form when the context has
+no session yet.  Tests that exercise the login form itself leave the flag
+unset and log in through the UI as before.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any
+
+from playwright.async_api import Page
+
+from . import waits
+from .config import TMP_DIR, base_url, load_config
+
+STATE_PATH = TMP_DIR / ".auth" / "storage_state.json"
+
+# Log in again when the cached access token expires within this many seconds.
+REFRESH_MARGIN_S = 300
+
+SESSION_KEY = re.compile(r"^sb-.+-auth-token$")
+
+_HAS_SESSION_JS = "() => Object.keys(localStorage).some(k => /^sb-.+-auth-token$/.test(k))"
+
+
+def _jwt_exp(token: str) -> float | None:
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (IndexError, ValueError):
+        return None
+    return claims.get("exp")
+
+
+def session_expiry(state: dict[str, Any]) -> float | None:
+    """Unix time at which the Supabase access token in ``state`` expires."""
+    for origin in state.get("origins", []):
+        for item in origin.get("localStorage", []):
+            if not SESSION_KEY.match(item.get("name", "")):
+                continue
+            try:
+                session = json.loads(item["value"])
+            except (KeyError, ValueError):
+                continue
+            if session.get("expires_at"):
+                return float(session["expires_at"])
+            if session.get("access_token"):
+                return _jwt_exp(session["access_token"])
+    return None
+
+
+def is_fresh(state: dict[str, Any] | None, margin_s: int = REFRESH_MARGIN_S) -> bool:
+    if not state:
+        return False
+    expiry = session_expiry(state)
+    return expiry is not None and expiry - time.time() > margin_s
+
+
+async def has_session(page: Page) -> bool:
+    return await page.evaluate(_HAS_SESSION_JS)
+
+
+async def login(page: Page, email: str | None = None, password: str | None = None) -> None:
+    """Make sure ``page`` is logged in and on the dashboard.
+
+    With a cached session this is a single navigation; otherwise it fills
+    the login form with the ``config.json`` user.
+    """
+    config = load_config()
+    url = base_url(config)
+    if not page.url.startswith(url):
+        await page.goto(f"{url}/login", timeout=10000)
+        await waits.page_ready(page)
+    if await has_session(page):
+        await page.goto(f"{url}/dashboard", timeout=10000)
+        await waits.page_ready(page)
+        return
+
+    if not page.url.startswith(f"{url}/login"):
+        await page.goto(f"{url}/login", timeout=10000)
+        await waits.page_ready(page)
+    await page.fill("form input[type=email]", email or config.get("loginUser", ""))
+    await page.fill("form input[type=password]", password or config.get("loginPassword", ""))
+    await page.click("form button[type=submit]")
+    await page.wait_for_function(_HAS_SESSION_JS, timeout=15000)
+    await waits.settled(page)
+
+
+class StorageStateCache:
+    """Shares one logged-in ``storage_state`` across a run, on disk and in memory.
+
+    With ``replay`` (``--har replay``) there is no network to log in over,
+    so the state cached by the recording run is used however old it is -
+    the recordings answer for it - and a missing one is an error.
+    """
+
+    def __init__(self, path: Path = STATE_PATH, margin_s: int = REFRESH_MARGIN_S, replay: bool = False):
+        self.path = path
+        self.margin_s = margin_s
+        self.replay = replay
+        self._state: dict[str, Any] | None = None
+        self._lock = asyncio.Lock()
+        self.logins = 0
+
+    def _load(self) -> dict[str, Any] | None:
+        if not self.path.exists():
+            return None
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except ValueError:
+            return None
+
+    def _save(self, state: dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        tmp.replace(self.path)
+
+    async def get(self, pool) -> dict[str, Any]:
+        """Return a fresh state, logging in on ``pool`` only when needed."""
+        async with self._lock:
+            if self.replay:
+                if self._state is None:
+                    self._state = self._replayed()
+            elif not is_fresh(self._state, self.margin_s):
+                state = self._load()
+                if not is_fresh(state, self.margin_s):
+                    state = await self._login(pool)
+                self._state = state
+            return self._state
+
+    def _replayed(self) -> dict[str, Any]:
+        state = self._load()
+        if session_expiry(state or {}) is None:
+            raise RuntimeError(f"no cached session at {self.path} to replay; run with --har record first")
+        return state
+
+    async def _login(self, pool) -> dict[str, Any]:
+        async with pool.context() as context:
+            waits.track(context)
+            page = await context.new_page()
+            await login(page)
+            state = await context.storage_state()
+        if session_expiry(state) is None:
+            raise RuntimeError("login did not leave a Supabase session in localStorage")
+        self._save(state)
+        self.logins += 1
+        return state
@@ -0,0 +1,307 @@
+"""Fan-out benchmark for the ``jobs/daily-reports`` edge function.
+
+    python -m harness.bench_daily_reports [--sizes 100,1000,10000,50000] [--rtt-ms 5] [--window 150]
+    python -m harness.bench_daily_reports --url http://127.0.0.1:54321/functions/v1/daily-reports
+
+The job walks the organizations one at a time: an ``agents`` query, three
+``count=exact`` HEAD queries (messages, conversations, appointments of
+yesterday) and a ``daily_reports`` insert each, all awaited in sequence.
+For every size this seeds that many organizations (:mod:`harness.seeder`)
+in a fresh Supabase stand-in, invokes the job once with the
+``CRON_SECRET`` bearer and reads the stand-in's call log back: total
+runtime, per-organization latency, database round trips and the time the
+stand-in spent serving them.
+
+With ``--url`` the real function runs, under ``supabase functions serve
+--env-file tmp/daily_reports.env`` (the file is written at start-up and
+points the function at the stand-in).  Without it, :func:`replay` issues
+the job's requests from here, query for query and in the same order, so
+the fan-out can be measured without the Deno toolchain.
+
+Locally a round trip costs well under a millisecond, so runtimes are also
+projected with ``--rtt-ms`` of network latency per round trip, and the
+per-organization cost fitted across sizes says how many organizations fit
+in ``--window`` seconds, the edge function wall-clock limit (150 s on the
+free plan, 400 s on paid ones).  ``--max-rows 1000`` applies Supabase's
+default ``db-max-rows``, which caps the job's unpaginated organizations
+query.  Results go to ``tmp/daily_reports_bench.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import time
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode, urlsplit
+
+from .config import TMP_DIR
+from .seeder import Scale, seed_standin
+from .standins.base import Call
+from .standins.stack import SERVICE_ROLE_KEY
+from .standins.supabase import SupabaseStandin
+from .stats import summarize
+
+REPORT_PATH = TMP_DIR / "daily_reports_bench.json"
+ENV_PATH = TMP_DIR / "daily_reports.env"
+
+DEFAULT_SIZES = (100, 1_000, 10_000, 50_000)
+# Away from 54321, where ``supabase functions serve`` itself listens.
+DEFAULT_PORT = 54331
+DEFAULT_CRON_SECRET = "standin-cron-secret"
+
+COUNTED = (("messages", "sent_at"), ("conversations", "created_at"), ("appointments", "start_time"))
+
+
+def _js_iso(moment: datetime) -> str:
+    # Date.prototype.toISOString()
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def yesterday_range(now: datetime | None = None) -> tuple[str, str]:
+    """The job's ``[yesterday 00:00, yesterday 23:59:59.999]`` window, in UTC like the edge runtime."""
+    start = (now or datetime.now(timezone.utc)).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    return _js_iso(start), _js_iso(start + timedelta(days=1, milliseconds=-1))
+
+
+class _Rest:
+    """A keep-alive PostgREST client speaking the way supabase-js does."""
+
+    def __init__(self, base_url: str):
+        parts = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+        self.headers = {"apikey": SERVICE_ROLE_KEY, "Authorization": f"Bearer {SERVICE_ROLE_KEY}"}
+
+    def request(self, method: str, table: str, params: list[tuple[str, str]], body: Any = None, prefer: str | None = None) -> http.client.HTTPResponse:
+        headers = dict(self.headers)
+        if prefer:
+            headers["Prefer"] = prefer
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        self.connection.request(method, f"/rest/v1/{table}?{urlencode(params)}", body=data, headers=headers)
+        response = self.connection.getresponse()
+        response.body = response.read()
+        return response
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def replay(standin_url: str, now: datetime | None = None) -> dict[str, Any]:
+    """Run ``jobs/daily-reports/index.ts`` request for request against ``standin_url``; returns its response body."""
+    since, until = yesterday_range(now)
+    report_date = since[:10]
+    rest = _Rest(standin_url)
+    reports = []
+    try:
+        organizations = json.loads(rest.request("GET", "organizations", [("select", "id")]).body)
+        for org in organizations:
+            agents = json.loads(rest.request("GET", "agents", [("select", "id"), ("organization_id", f"eq.{org['id']}")]).body)
+            agent_ids = [agent["id"] for agent in agents]
+            counts = dict.fromkeys(table for table, _ in COUNTED)
+            if agent_ids:
+                for table, column in COUNTED:
+                    response = rest.request(
+                        "HEAD",
+                        table,
+                        [("select", "*"), ("agent_id", f"in.({','.join(agent_ids)})"), (column, f"gte.{since}"), (column, f"lte.{until}")],
+                        prefer="count=exact",
+                    )
+                    counts[table] = int(response.getheader("Content-Range", "*/0").rsplit("/", 1)[1])
+            metrics = {
+                "total_messages": counts["messages"] or 0,
+                "total_conversations": counts["conversations"] or 0,
+                "total_appointments": counts["appointments"] or 0,
+                "agents_count": len(agent_ids),
+            }
+            response = rest.request("POST", "daily_reports", [], {"organization_id": org["id"], "report_date": report_date, "metrics": metrics})
+            report = {"organizationId": org["id"], "date": report_date, "success": response.status < 300}
+            if response.status >= 300:
+                report["error"] = json.loads(response.body).get("message")
+            reports.append(report)
+    finally:
+        rest.close()
+    return {"success": True, "reportsGenerated": len(reports), "reports": reports}
+
+
+def invoke(url: str, cron_secret: str, timeout_s: float) -> dict[str, Any]:
+    """POST to the deployed (or served) function the way the cron does."""
+    request = urllib.request.Request(url, data=b"{}", method="POST", headers={"Authorization": f"Bearer {cron_secret}", "Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout_s) as response:
+        return json.loads(response.read())
+
+
+def org_spans(calls: list[Call]) -> list[dict[str, Any]]:
+    """Split the job's calls per organization; each one starts with its ``agents`` query."""
+    spans: list[dict[str, Any]] = []
+    for call in sorted(calls, key=lambda c: c.started):
+        if call.meta.get("table") == "agents" and call.method == "GET":
+            org = next((value[3:] for key, value in call.query if key == "organization_id"), None)
+            spans.append({"org": org, "started": call.started, "finished": call.finished, "round_trips": 0, "server_ms": 0.0})
+        if spans:
+            span = spans[-1]
+            span["round_trips"] += 1
+            span["server_ms"] += call.duration_ms
+            span["finished"] = max(span["finished"], call.finished)
+    # An organization lasts until the next one starts: the job's own work in between counts too.
+    for span, following in zip(spans, spans[1:] + [None]):
+        span["ms"] = ((following["started"] if following else span["finished"]) - span["started"]) * 1000
+    return spans
+
+
+def expected_metrics(standin: SupabaseStandin, report_date: str) -> dict[str, dict[str, int]]:
+    """Yesterday's totals per organization as the seeder counted them (absent = nothing happened)."""
+    return {
+        row["organization_id"]: {key: row["metrics"][key] for key in ("total_messages", "total_conversations", "total_appointments")}
+        for row in standin.store.tables["daily_reports"]
+        if row["report_date"] == report_date
+    }
+
+
+def check_reports(standin: SupabaseStandin, seeded_rows: int, expected: dict[str, dict[str, int]]) -> int:
+    """How many of the job's inserted reports disagree with the seeded data."""
+    zero = {"total_messages": 0, "total_conversations": 0, "total_appointments": 0}
+    mismatched = 0
+    for row in standin.store.tables["daily_reports"][seeded_rows:]:
+        got = {key: row["metrics"].get(key) for key in zero}
+        mismatched += got != expected.get(row["organization_id"], zero)
+    return mismatched
+
+
+def write_env(path: Path, standin_url: str, cron_secret: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    env = {"SUPABASE_URL": standin_url, "SUPABASE_SERVICE_ROLE_KEY": SERVICE_ROLE_KEY, "CRON_SECRET": cron_secret}
+    path.write_text("".join(f"{key}={value}\n" for key, value in env.items()), encoding="utf-8")
+
+
+def run_size(organizations: int, args: argparse.Namespace) -> dict[str, Any]:
+    scale = Scale(organizations=organizations, messages=organizations * args.messages_per_org, days=args.days)
+    standin = SupabaseStandin(args.host, args.port, seed={}, max_rows=args.max_rows)
+    seeded = seed_standin(standin, scale)
+    report_date = yesterday_range()[0][:10]
+    expected = expected_metrics(standin, report_date)
+    seeded_reports = len(standin.store.tables["daily_reports"])
+    with standin:
+        standin.drain_calls()
+        started = time.perf_counter()
+        try:
+            body = invoke(args.url, args.cron_secret, args.timeout) if args.url else replay(standin.url)
+            outcome = "ok"
+        except Exception as exc:
+            body, outcome = {}, f"{type(exc).__name__}: {exc}"
+        runtime_s = time.perf_counter() - started
+        calls = standin.drain_calls()
+
+    spans = org_spans(calls)
+    round_trips = len(calls)
+    projected_s = runtime_s + round_trips * args.rtt_ms / 1000
+    reports = body.get("reports", [])
+    return {
+        "organizations": organizations,
+        "seed_s": seeded["seconds"],
+        "rows": seeded["rows"],
+        "outcome": outcome,
+        "runtime_s": round(runtime_s, 2),
+        "projected_s": round(projected_s, 2),
+        "reports_generated": body.get("reportsGenerated", 0),
+        "reports_failed": sum(not r.get("success") for r in reports),
+        "mismatched": check_reports(standin, seeded_reports, expected),
+        "round_trips": round_trips,
+        "round_trips_per_org": round(round_trips / len(spans), 2) if spans else None,
+        "server_s": round(sum(call.duration_ms for call in calls) / 1000, 2),
+        "per_org_ms": summarize(span["ms"] for span in spans),
+        "per_org_server_ms": summarize(span["server_ms"] for span in spans),
+    }
+
+
+def fit_window(results: list[dict[str, Any]], window_s: float) -> dict[str, Any]:
+    """Least-squares line of projected runtime over organizations, and where it crosses the window."""
+    points = [(r["organizations"], r["projected_s"]) for r in results if r["outcome"] == "ok"]
+    if len(points) < 2:
+        return {"per_org_ms": None, "fixed_s": None, "max_organizations": None}
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / spread if spread else 0.0
+    intercept = mean_y - slope * mean_x
+    return {
+        "per_org_ms": round(slope * 1000, 3),
+        "fixed_s": round(intercept, 2),
+        "max_organizations": int((window_s - intercept) / slope) if slope > 0 else None,
+    }
+
+
+def print_row(result: dict[str, Any]) -> None:
+    per_org = result["per_org_ms"]
+    notes = f"  {result['mismatched']} MISMATCHED" if result["mismatched"] else ""
+    if result["outcome"] == "ok" and result["reports_generated"] < result["organizations"]:
+        notes += f"  {result['organizations'] - result['reports_generated']:,} ORGANIZATIONS SKIPPED"
+    print(
+        f"{result['organizations']:>8,}{result['runtime_s']:>10.2f}{result['projected_s']:>11.2f}{result['round_trips']:>9,}"
+        f"{result['server_s']:>10.2f}{per_org.get('p50', 0):>8.2f}{per_org.get('p99', 0):>8.2f}{result['reports_generated']:>9,}"
+        f"  {result['outcome']}{notes}",
+        flush=True,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.bench_daily_reports", description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="comma-separated organization counts")
+    parser.add_argument("--url", help="invoke the function here instead of replaying its queries")
+    parser.add_argument("--cron-secret", default=os.environ.get("CRON_SECRET", DEFAULT_CRON_SECRET))
+    parser.add_argument("--host", default="127.0.0.1", help="stand-in bind address")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="stand-in port (fixed, so the env file stays valid)")
+    parser.add_argument("--env-host", help="host the function reaches the stand-in at, e.g. host.docker.internal (default: --host)")
+    parser.add_argument("--messages-per-org", type=int, default=10, help="average messages per organization")
+    parser.add_argument("--days", type=int, default=7, help="history length")
+    parser.add_argument("--max-rows", type=int, help="cap REST responses like the hosted project (1000)")
+    parser.add_argument("--rtt-ms", type=float, default=5.0, help="network latency per round trip for the projection")
+    parser.add_argument("--window", type=float, default=150.0, help="execution window in seconds")
+    parser.add_argument("--timeout", type=float, default=900.0, help="seconds to wait for the function to answer")
+    parser.add_argument("--output", type=Path, default=REPORT_PATH)
+    args = parser.parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    write_env(ENV_PATH, f"http://{args.env_host or args.host}:{args.port}", args.cron_secret)
+    if args.url:
+        print(f"functions env written to {ENV_PATH}; serve them with it before the first size runs")
+    print(f"{'orgs':>8}{'runtime s':>10}{'project s':>11}{'trips':>9}{'server s':>10}{'p50 ms':>8}{'p99 ms':>8}{'reports':>9}")
+    results = []
+    for size in sizes:
+        result = run_size(size, args)
+        results.append(result)
+        print_row(result)
+        if result["outcome"] != "ok":
+            break
+    fit = fit_window(results, args.window)
+    if fit["max_organizations"] is not None:
+        print(
+            f"~{fit['per_org_ms']} ms per organization at {args.rtt_ms:g} ms per round trip: "
+            f"the job outgrows a {args.window:g} s window at about {fit['max_organizations']:,} organizations"
+        )
+    report = {
+        "mode": "function" if args.url else "replay",
+        "url": args.url,
+        "rtt_ms": args.rtt_ms,
+        "window_s": args.window,
+        "max_rows": args.max_rows,
+        "fit": fit,
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"report written to {args.output}")
+    ok = all(r["outcome"] == "ok" and not r["mismatched"] and r["reports_generated"] == r["organizations"] for r in results)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
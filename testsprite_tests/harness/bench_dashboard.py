@@ -0,0 +1,216 @@
+"""Update-latency probe for the dashboard counters (TC017).
+
+    python -m harness.bench_dashboard [--rates 0.2,1,5] [--duration 20] [--settle 10]
+
+Keeps ``/dashboard`` open against a seeded stand-in (:mod:`harness.scale_app`)
+and injects inbound WhatsApp messages into the stand-in's store the way
+the Evolution webhook writes them: a message on one of the login user's
+agents, and every ``--new-every`` messages a new active conversation
+first.  Arrivals are Poisson at each rate in ``--rates`` for
+``--duration`` seconds, followed by ``--settle`` seconds of quiet.
+
+A ``MutationObserver`` in the page timestamps every change of the
+"Mensagens Hoje" and "Conversas Ativas" values.  An injection's latency
+is the time until the counter first shows a value that includes it;
+injections the counter never caught up with by the end of the step are
+counted as missed.  Per rate it reports the latency distribution, the
+misses, and the REST requests the page made meanwhile (polling or
+refetches), plus any websockets it opened (Supabase Realtime).  Page and
+injector timestamps are both wall-clock milliseconds from this machine.
+Results go to ``tmp/dashboard_bench.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+from .config import TMP_DIR
+from .scale_app import ScaleApp
+from .seeder import Scale
+from .standins.postgrest import now_iso
+from .stats import summarize
+from .vitals import DASHBOARD_CARDS
+
+REPORT_PATH = TMP_DIR / "dashboard_bench.json"
+
+DEFAULT_RATES = (0.2, 1.0, 5.0)
+COUNTERS = {"messages": "Mensagens Hoje", "conversations": "Conversas Ativas"}
+
+# Records [epoch ms, {counter: value}] whenever a watched value changes.
+_PROBE_JS = """(titles) => {
+  const read = () => {
+    const values = {};
+    for (const [name, title] of Object.entries(titles)) {
+      const label = [...document.querySelectorAll("p")].find((p) => p.textContent.trim() === title);
+      values[name] = label && label.nextElementSibling ? Number(label.nextElementSibling.textContent) : null;
+    }
+    return values;
+  };
+  const probe = window.__counterProbe = { changes: [[performance.timeOrigin + performance.now(), read()]] };
+  let scheduled = false;
+  const check = () => {
+    scheduled = false;
+    const values = read();
+    const last = probe.changes[probe.changes.length - 1][1];
+    if (Object.keys(values).some((name) => values[name] !== last[name])) {
+      probe.changes.push([performance.timeOrigin + performance.now(), values]);
+    }
+  };
+  new MutationObserver(() => {
+    if (!scheduled) { scheduled = true; requestAnimationFrame(check); }
+  }).observe(document.body, { childList: true, subtree: true, characterData: true });
+  return probe.changes[0][1];
+}"""
+
+
+class Injector:
+    """Writes inbound messages (and new conversations) for one agent into the stand-in."""
+
+    def __init__(self, app: ScaleApp, new_every: int, seed: int):
+        store = app.standin.store
+        self.store = store
+        self.agent_id = next(a["id"] for a in store.tables["agents"] if a["is_active"])
+        self.new_every = new_every
+        self.rng = random.Random(seed)
+        self.sent = 0
+        self.conversation_id: str | None = None
+
+    def inject(self) -> dict[str, Any]:
+        """One inbound message; returns which counters it should raise."""
+        now = now_iso()
+        opened = self.conversation_id is None or self.sent % self.new_every == 0
+        if opened:
+            self.conversation_id = str(uuid.uuid4())
+            self.store.insert(
+                "conversations",
+                [{
+                    "id": self.conversation_id, "agent_id": self.agent_id, "status": "active", "last_message_at": now,
+                    "whatsapp_number": f"55119{self.rng.randrange(10**8):08d}", "contact_name": "Contato Probe",
+                }],
+            )
+        self.store.insert(
+            "messages",
+            [{
+                "agent_id": self.agent_id, "conversation_id": self.conversation_id, "content": "Olá, tudo bem?",
+                "direction": "inbound", "message_type": "text", "sent_at": now,
+            }],
+        )
+        self.sent += 1
+        return {"at": time.time() * 1000, "messages": 1, "conversations": int(opened)}
+
+
+def latencies(injections: list[dict[str, Any]], changes: list[list[Any]], truth: dict[str, int]) -> dict[str, list[float | None]]:
+    """Per counter, ms from each injection until a displayed value included it (None = never).
+
+    ``truth`` holds the real counts before the first injection.
+    """
+    result: dict[str, list[float | None]] = {}
+    for name in COUNTERS:
+        expected = truth[name]
+        values = []
+        for injection in injections:
+            if not injection[name]:
+                continue
+            expected += injection[name]
+            caught = next((at for at, shown in changes if at >= injection["at"] and (shown.get(name) or 0) >= expected), None)
+            values.append(None if caught is None else caught - injection["at"])
+        result[name] = values
+    return result
+
+
+async def run_rate(
+    app: ScaleApp, page, injector: Injector, truth: dict[str, int], rate: float, duration_s: float, settle_s: float, rng: random.Random
+) -> dict[str, Any]:
+    """Inject at ``rate`` and time the counters; advances ``truth`` by what was injected."""
+    app.standin.drain_calls()
+    injections = []
+    started = time.perf_counter()
+    next_at = rng.expovariate(rate)
+    while next_at < duration_s:
+        await asyncio.sleep(max(0.0, next_at - (time.perf_counter() - started)))
+        injections.append(injector.inject())
+        next_at += rng.expovariate(rate)
+    await asyncio.sleep(max(0.0, duration_s - (time.perf_counter() - started)) + settle_s)
+    changes = await page.evaluate("() => window.__counterProbe.changes")
+    page_requests = app.standin.drain_calls()
+
+    report: dict[str, Any] = {"rate": rate, "injected": len(injections), "counts_before": dict(truth)}
+    for name, values in latencies(injections, changes, truth).items():
+        caught = [v for v in values if v is not None]
+        report[name] = {"updates": len(values), "missed": len(values) - len(caught), "latency_ms": summarize(caught)}
+    for name in COUNTERS:
+        truth[name] += sum(injection[name] for injection in injections)
+    report["counts_after"] = dict(truth)
+    report["shown_after"] = changes[-1][1]
+    report["page_requests"] = len(page_requests)
+    report["page_request_tables"] = sorted({c.meta["table"] for c in page_requests if "table" in c.meta})
+    return report
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    scale = Scale(organizations=1, messages=args.messages, seed=args.seed)
+    async with ScaleApp(scale, headless=not args.headed) as app:
+        page = await app.new_page()
+        websockets: list[str] = []
+        page.on("websocket", lambda ws: websockets.append(ws.url))
+        await page.goto(f"{app.url}/dashboard", timeout=10000)
+        for title in DASHBOARD_CARDS:
+            await page.get_by_text(title, exact=True).first.wait_for(timeout=args.timeout * 1000)
+        # Just loaded, the counters are the true counts.
+        shown = await page.evaluate(_PROBE_JS, COUNTERS)
+        truth = {name: shown[name] or 0 for name in COUNTERS}
+        injector = Injector(app, args.new_every, args.seed)
+        rng = random.Random(args.seed)
+        steps = []
+        for rate in args.rates:
+            step = await run_rate(app, page, injector, truth, rate, args.duration, args.settle, rng)
+            steps.append(step)
+            print_step(step)
+        return {"duration_s": args.duration, "settle_s": args.settle, "new_every": args.new_every, "websockets": websockets, "steps": steps}
+
+
+def print_step(step: dict[str, Any]) -> None:
+    cells = []
+    for name in COUNTERS:
+        counter = step[name]
+        latency = counter["latency_ms"]
+        p50 = f"{latency['p50']:>10,.0f}" if latency["count"] else f"{'-':>10}"
+        cells.append(f"{p50}{counter['missed']:>6}/{counter['updates']:<5}")
+    print(f"{step['rate']:>7g}{step['injected']:>9}{''.join(cells)}{step['page_requests']:>8}", flush=True)
+
+
+def _rates(value: str) -> list[float]:
+    return [float(rate) for rate in value.split(",")]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.bench_dashboard", description=__doc__.splitlines()[0])
+    parser.add_argument("--rates", type=_rates, default=list(DEFAULT_RATES), help="comma-separated messages per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of injection per rate")
+    parser.add_argument("--settle", type=float, default=10.0, help="seconds to keep watching after each rate")
+    parser.add_argument("--new-every", type=int, default=3, help="open a new conversation every N messages")
+    parser.add_argument("--messages", type=int, default=5_000, help="seeded history for the login user's organization")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for the dashboard cards")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--output", type=Path, default=REPORT_PATH)
+    args = parser.parse_args(argv)
+    print(f"{'rate/s':>7}{'injected':>9}{'msgs p50':>10}{'missed':>12}{'convs p50':>10}{'missed':>12}{'reqs':>8}")
+    report = asyncio.run(run(args))
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if not any(step["page_requests"] for step in report["steps"]) and not report["websockets"]:
+        print("the dashboard neither polled nor subscribed: its counters only change when it is loaded again")
+    print(f"report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
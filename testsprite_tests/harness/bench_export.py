@@ -0,0 +1,151 @@
+"""CSV export scaling benchmark for the Reports page (TC012's "Exportar CSV").
+
+    python -m harness.bench_export [--sizes 10000,100000,1000000] [--max-rows 1000]
+
+For each size the login user's organization is seeded with that many
+messages in a fresh stand-in (:mod:`harness.scale_app`).  The benchmark
+opens ``/reports``, waits for the stats to load, then clicks "Exportar
+CSV" and times the click until Playwright's ``download`` event, sampling
+the page's JS heap meanwhile: ``reportsService.exportToCSV`` pulls every
+message in range through ``getDetailedReportData`` and builds the whole
+file as one string, so both grow with the data.
+
+The download is saved by Playwright straight to ``tmp/export_bench/``
+and checked by streaming it through :mod:`csv` row by row: header, row
+count, and that the "Mensagens" column adds up to the messages seeded.
+A size that times out or crashes the tab is reported as the cliff and
+the larger sizes are skipped.  Results go to ``tmp/export_bench.json``.
+
+``--max-rows 1000`` applies Supabase's default ``db-max-rows`` in the
+stand-in, which shows what the hosted project actually exports.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from playwright.async_api import expect
+
+from . import waits
+from .config import TMP_DIR
+from .scale_app import HeapSampler, ScaleApp
+from .seeder import Scale
+
+REPORT_PATH = TMP_DIR / "export_bench.json"
+DOWNLOAD_DIR = TMP_DIR / "export_bench"
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+CSV_HEADER = ["Data", "Agente", "ID do Agente", "Mensagens", "Conversas", "Agendamentos"]
+
+EXPORT_BUTTON = "button:has-text('Exportar CSV')"
+
+
+def check_csv(path: Path) -> dict[str, Any]:
+    """Stream the downloaded file and summarise it without loading it whole."""
+    rows = messages = 0
+    with path.open(encoding="utf-8", newline="") as fh:
+        reader = csv.reader(fh)
+        header = next(reader, None)
+        for record in reader:
+            rows += 1
+            messages += int(record[3])
+    return {"bytes": path.stat().st_size, "header_ok": header == CSV_HEADER, "rows": rows, "messages": messages}
+
+
+async def export_once(app: ScaleApp, size: int, timeout_s: float) -> dict[str, Any]:
+    page = await app.new_page(accept_downloads=True)
+    crashed = asyncio.Event()
+    page.on("crash", lambda _: crashed.set())
+
+    started = time.perf_counter()
+    await page.goto(f"{app.url}/reports", timeout=10000)
+    button = page.locator(EXPORT_BUTTON)
+    # The button stays disabled while getStats loads every message once already.
+    await expect(button).to_be_enabled(timeout=timeout_s * 1000)
+    await waits.settled(page)
+    stats_ms = (time.perf_counter() - started) * 1000
+
+    sampler = HeapSampler(page)
+    baseline = await sampler.start()
+    app.standin.drain_calls()
+    clicked = time.perf_counter()
+    # Rounding across agents can leave the seed a few messages off the nominal size.
+    seeded = app.seed_report["rows"].get("messages", 0)
+    result: dict[str, Any] = {"size": size, "messages": seeded, "stats_ms": round(stats_ms), "heap_baseline_mb": round(baseline / 2**20, 1)}
+    try:
+        async with page.expect_download(timeout=timeout_s * 1000) as download_info:
+            await button.click()
+        download = await download_info.value
+        result["export_ms"] = round((time.perf_counter() - clicked) * 1000)
+        result["outcome"] = "ok"
+    except Exception as exc:
+        result["export_ms"] = None
+        result["outcome"] = "crashed" if crashed.is_set() else f"{type(exc).__name__}: {str(exc).splitlines()[0]}"
+        download = None
+    peak = await sampler.stop()
+    result["heap_peak_mb"] = round(peak / 2**20, 1)
+    calls = app.standin.drain_calls()
+    result["rest_requests"] = len(calls)
+    result["server_ms"] = round(sum(call.duration_ms for call in calls))
+
+    if download is not None:
+        target = DOWNLOAD_DIR / f"export_{size}.csv"
+        # Playwright copies the file on its side; nothing passes through Python memory.
+        await download.save_as(target)
+        result["csv"] = check_csv(target)
+        result["complete"] = result["csv"]["header_ok"] and result["csv"]["messages"] == seeded
+    await page.context.close()
+    return result
+
+
+async def run(sizes: list[int], headless: bool, timeout_s: float, max_rows: int | None) -> list[dict[str, Any]]:
+    results = []
+    for size in sizes:
+        print(f"seeding {size:,} messages...", flush=True)
+        async with ScaleApp(Scale(organizations=1, messages=size), headless=headless, max_rows=max_rows) as app:
+            result = await export_once(app, size, timeout_s)
+        results.append(result)
+        print_row(result)
+        if result["outcome"] != "ok":
+            print(f"cliff at {size:,} messages; skipping larger sizes")
+            break
+    return results
+
+
+def print_row(result: dict[str, Any]) -> None:
+    export = f"{result['export_ms']:>9,}" if result["export_ms"] is not None else f"{'-':>9}"
+    csv_info = result.get("csv") or {}
+    print(
+        f"{result['messages']:>10,}{result['stats_ms']:>9,}{export}{result['heap_baseline_mb']:>9.1f}"
+        f"{result['heap_peak_mb']:>9.1f}{result['rest_requests']:>6}{csv_info.get('rows', 0):>8,}"
+        f"{csv_info.get('bytes', 0) / 2**20:>8.1f}  {result['outcome']}{'' if result.get('complete', True) else '  INCOMPLETE'}",
+        flush=True,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.bench_export", description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="comma-separated message counts")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds to wait for the stats and for the download")
+    parser.add_argument("--max-rows", type=int, help="cap REST responses like the hosted project (1000)")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--output", type=Path, default=REPORT_PATH)
+    args = parser.parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    print(f"{'messages':>10}{'stats ms':>9}{'export':>9}{'heap MB':>9}{'peak MB':>9}{'reqs':>6}{'rows':>8}{'CSV MB':>8}")
+    results = asyncio.run(run(sizes, not args.headed, args.timeout, args.max_rows))
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps({"max_rows": args.max_rows, "results": results}, indent=2), encoding="utf-8")
+    print(f"report written to {args.output}")
+    return 0 if all(r["outcome"] == "ok" and r.get("complete") for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
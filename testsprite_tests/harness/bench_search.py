@@ -0,0 +1,211 @@
+"""Conversation search latency benchmark (TC009's "Buscar por número ou nome...").
+
+    python -m harness.bench_search [--sizes 1000,5000,20000] [--terms "Ana Silva,Xavier"] [--max-rows 1000]
+
+For each size the login user's organization is seeded with about that
+many conversations in a fresh stand-in (:mod:`harness.scale_app`).  The
+benchmark opens ``/conversations`` and types each search term one key at
+a time, with pauses drawn from a log-normal around ``--key-ms`` like a
+person typing.  Per keystroke it records:
+
+* the time from the key's ``beforeinput`` event to the first frame whose
+  result list holds the expected conversations (measured in the page, on
+  animation frames);
+* how many REST requests the keystroke caused;
+* the stand-in's time serving them.
+
+A keystroke whose results take longer than the pause before the next key
+is counted as late: the list falls behind the typing.
+
+``Conversations.tsx`` loads every conversation once, unfiltered, and
+filters them in memory on each keystroke, so it fires no requests while
+typing (``conversationService.getAll`` has the server-side ``ilike``
+search, but the page does not use it).  The cost of searching is then
+the initial load, timed here with its server time, plus re-rendering an
+unvirtualized list per key.  ``--max-rows 1000`` applies Supabase's
+default ``db-max-rows`` and reports how many matches the capped load
+hides from the search.  Results go to ``tmp/search_bench.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any
+
+from .config import TMP_DIR
+from .scale_app import ScaleApp
+from .seeder import Scale
+from .stats import summarize
+
+REPORT_PATH = TMP_DIR / "search_bench.json"
+
+DEFAULT_SIZES = (1_000, 5_000, 20_000)
+# The seeder's Pareto thread lengths average about 7.4 messages at its default shape.
+MESSAGES_PER_CONVERSATION = 7.4
+# Typing rhythm: default median pause between keys and the spread of its log-normal.
+KEY_MS = 130.0
+KEY_SIGMA = 0.35
+
+SEARCH_INPUT = "input[placeholder='Buscar por número ou nome...']"
+RESULT_CARDS = "div.grid.gap-4 > div.glass"
+
+# Times each keystroke until the list first shows the count Python expects.
+_PROBE_JS = """(selector) => {
+  const probe = window.__searchProbe = { expected: null, key: null, samples: [] };
+  const check = () => {
+    const key = probe.key;
+    if (!key) return;
+    if (document.querySelectorAll(selector).length === probe.expected) {
+      probe.samples.push(performance.now() - key.at);
+      probe.key = null;
+    } else {
+      requestAnimationFrame(check);
+    }
+  };
+  // beforeinput also fires for characters Playwright inserts without a keydown (ã, é...).
+  document.addEventListener("beforeinput", (event) => {
+    probe.key = { at: event.timeStamp };
+    requestAnimationFrame(check);
+  }, true);
+}"""
+
+
+def matches(conversation: dict[str, Any], term: str) -> bool:
+    """``Conversations.tsx``'s filter."""
+    name = conversation.get("contact_name")
+    return term in conversation["whatsapp_number"] or (name is not None and term.lower() in name.lower())
+
+
+def loaded_conversations(app: ScaleApp) -> list[dict[str, Any]]:
+    """What the page's query returns: newest message first, nulls last, capped like the stand-in."""
+    rows = app.standin.store.tables["conversations"]
+    dated = sorted((r for r in rows if r["last_message_at"]), key=lambda r: r["last_message_at"], reverse=True)
+    ordered = dated + [r for r in rows if not r["last_message_at"]]
+    return ordered[: app.standin.max_rows] if app.standin.max_rows is not None else ordered
+
+
+def default_terms(conversations: list[dict[str, Any]]) -> list[str]:
+    """A full contact name, part of a phone number and a name nobody has."""
+    sample = conversations[len(conversations) // 2]
+    return [sample["contact_name"], sample["whatsapp_number"][4:9], "Xavier"]
+
+
+async def type_term(app: ScaleApp, page, term: str, loaded: list[dict[str, Any]], everything: list[dict[str, Any]], rng: random.Random, key_ms: float, timeout_s: float) -> dict[str, Any]:
+    search = page.locator(SEARCH_INPUT)
+    await search.fill("")
+    await page.wait_for_function(
+        "([selector, n]) => document.querySelectorAll(selector).length === n", arg=[RESULT_CARDS, len(loaded)], timeout=timeout_s * 1000
+    )
+    await page.evaluate("() => { window.__searchProbe.samples = []; }")
+    app.standin.drain_calls()
+    keys = []
+    for index in range(1, len(term) + 1):
+        prefix = term[:index]
+        expected = sum(matches(c, prefix) for c in loaded)
+        pause_s = rng.lognormvariate(0, KEY_SIGMA) * key_ms / 1000
+        await page.evaluate("(n) => { window.__searchProbe.expected = n; }", expected)
+        pressed = time.perf_counter()
+        await page.keyboard.type(term[index - 1])
+        await page.wait_for_function("(n) => window.__searchProbe.samples.length >= n", arg=index, timeout=timeout_s * 1000)
+        calls = app.standin.drain_calls()
+        keys.append({"prefix": prefix, "results": expected, "pause_ms": round(pause_s * 1000), "requests": len(calls), "server_ms": round(sum(c.duration_ms for c in calls), 1)})
+        await asyncio.sleep(max(0.0, pause_s - (time.perf_counter() - pressed)))
+    samples = await page.evaluate("() => window.__searchProbe.samples")
+    for key, ms in zip(keys, samples):
+        key["ms"] = round(ms, 1)
+        key["late"] = ms > key["pause_ms"]
+    # Matches the capped load never delivered to the page.
+    hidden = sum(matches(c, term) for c in everything) - keys[-1]["results"]
+    return {"term": term, "results": keys[-1]["results"], "hidden": hidden, "keys": keys}
+
+
+async def search_once(app: ScaleApp, size: int, terms: list[str] | None, seed: int, key_ms: float, timeout_s: float) -> dict[str, Any]:
+    everything = app.standin.store.tables["conversations"]
+    loaded = loaded_conversations(app)
+    result: dict[str, Any] = {"size": size, "conversations": len(everything), "loaded": len(loaded)}
+    page = await app.new_page()
+    try:
+        app.standin.drain_calls()
+        started = time.perf_counter()
+        await page.goto(f"{app.url}/conversations", timeout=timeout_s * 1000)
+        await page.wait_for_function(
+            "([selector, n]) => document.querySelectorAll(selector).length === n", arg=[RESULT_CARDS, len(loaded)], timeout=timeout_s * 1000
+        )
+        result["load_ms"] = round((time.perf_counter() - started) * 1000)
+        load = [c for c in app.standin.drain_calls() if c.meta.get("table") == "conversations"]
+        result["load_server_ms"] = round(sum(c.duration_ms for c in load), 1)
+
+        await page.evaluate(_PROBE_JS, RESULT_CARDS)
+        rng = random.Random(seed)
+        result["terms"] = [await type_term(app, page, term, loaded, everything, rng, key_ms, timeout_s) for term in terms or default_terms(loaded)]
+        result["outcome"] = "ok"
+    except Exception as exc:
+        result["outcome"] = f"{type(exc).__name__}: {str(exc).splitlines()[0]}"
+    finally:
+        await page.context.close()
+
+    keys = [key for term in result.get("terms", []) for key in term["keys"]]
+    result["keystrokes"] = len(keys)
+    result["latency_ms"] = summarize(key["ms"] for key in keys if "ms" in key)
+    result["late"] = sum(key.get("late", False) for key in keys)
+    result["requests_per_key"] = round(sum(key["requests"] for key in keys) / len(keys), 2) if keys else None
+    result["search_server_ms"] = round(sum(key["server_ms"] for key in keys), 1)
+    result["hidden"] = sum(term["hidden"] for term in result.get("terms", []))
+    return result
+
+
+async def run(sizes: list[int], terms: list[str] | None, headless: bool, timeout_s: float, max_rows: int | None, seed: int, key_ms: float) -> list[dict[str, Any]]:
+    results = []
+    for size in sizes:
+        print(f"seeding ~{size:,} conversations...", flush=True)
+        scale = Scale(organizations=1, messages=round(size * MESSAGES_PER_CONVERSATION), seed=seed)
+        async with ScaleApp(scale, headless=headless, max_rows=max_rows) as app:
+            result = await search_once(app, size, terms, seed, key_ms, timeout_s)
+        results.append(result)
+        print_row(result)
+        if result["outcome"] != "ok":
+            print(f"cliff at {size:,} conversations; skipping larger sizes")
+            break
+    return results
+
+
+def print_row(result: dict[str, Any]) -> None:
+    latency = result["latency_ms"]
+    load = f"{result['load_ms']:>9,}" if "load_ms" in result else f"{'-':>9}"
+    hidden = f"  {result['hidden']:,} MATCHES HIDDEN" if result["hidden"] else ""
+    print(
+        f"{result['conversations']:>8,}{result['loaded']:>8,}{load}{result.get('load_server_ms', 0):>10.1f}"
+        f"{latency.get('p50', 0):>8.1f}{latency.get('p95', 0):>8.1f}{latency.get('max', 0):>8.1f}"
+        f"{result['late']:>6}/{result['keystrokes']:<4}{result['requests_per_key'] or 0:>7.2f}  {result['outcome']}{hidden}",
+        flush=True,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.bench_search", description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="comma-separated conversation counts")
+    parser.add_argument("--terms", help="comma-separated search terms (default: a name, a phone fragment and a miss)")
+    parser.add_argument("--key-ms", type=float, default=KEY_MS, help="median pause between keystrokes")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds to wait for the list to load or update")
+    parser.add_argument("--max-rows", type=int, help="cap REST responses like the hosted project (1000)")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the data and the typing rhythm")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--output", type=Path, default=REPORT_PATH)
+    args = parser.parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    terms = [t for t in args.terms.split(",") if t] if args.terms else None
+    print(f"{'convs':>8}{'loaded':>8}{'load ms':>9}{'server ms':>10}{'p50 ms':>8}{'p95 ms':>8}{'max ms':>8}{'late':>11}{'req/key':>7}")
+    results = asyncio.run(run(sizes, terms, not args.headed, args.timeout, args.max_rows, args.seed, args.key_ms))
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps({"max_rows": args.max_rows, "key_ms": args.key_ms, "results": results}, indent=2), encoding="utf-8")
+    print(f"report written to {args.output}")
+    return 0 if all(r["outcome"] == "ok" for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,199 @@
+"""Video and Playwright trace capture per test: off, on-failure or always.
+
+``always`` video is Playwright's own ``record_video_dir`` recording,
+which encodes VP8 for the whole life of the context whether the test
+passes or not.  ``on-failure`` video avoids that: it asks Chromium for a
+JPEG screencast of every page, keeps only the last ``VIDEO_BUFFER_S``
+seconds of frames in a ring buffer and encodes them only when the test
+fails (with the ``ffmpeg`` Playwright installs, or any on ``PATH``;
+without one the frames are written as numbered JPEGs).  A green run
+pays for compressed screenshots of changed frames and nothing else.
+
+Traces are Playwright traces (``npx playwright show-trace``).  In
+``on-failure`` mode tracing runs as usual and ``tracing.stop()``
+discards it for passing tests, so only failures write the zip.
+
+Everything lands in ``tmp/artifacts/<TC>/`` and is listed in the
+test's ``artifacts``; the video is also its ``testVisualization``, as
+in TestSprite's ``test_results.json``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import os
+import shutil
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+from playwright.async_api import BrowserContext, Page
+
+from .config import TMP_DIR
+
+ARTIFACTS_DIR = TMP_DIR / "artifacts"
+
+MODES = ("off", "on-failure", "always")
+
+# How much of the end of a failing test the on-failure video keeps.
+VIDEO_BUFFER_S = 30.0
+# Hard cap on buffered frames, whatever their timestamps.
+MAX_FRAMES = 1500
+FPS = 25
+
+SCREENCAST = {"format": "jpeg", "quality": 70, "maxWidth": 1280, "maxHeight": 720, "everyNthFrame": 1}
+
+
+def find_ffmpeg() -> str | None:
+    """``ffmpeg`` from ``PATH`` or the one ``playwright install ffmpeg`` downloads."""
+    found = shutil.which("ffmpeg")
+    if found:
+        return found
+    browsers = Path(os.environ.get("PLAYWRIGHT_BROWSERS_PATH") or Path.home() / ".cache" / "ms-playwright")
+    candidates = sorted(browsers.glob("ffmpeg-*/ffmpeg-*"), reverse=True)
+    return str(candidates[0]) if candidates else None
+
+
+class FrameBuffer:
+    """The most recent screencast frames, at most ``window_s`` seconds and ``max_frames`` of them."""
+
+    def __init__(self, window_s: float = VIDEO_BUFFER_S, max_frames: int = MAX_FRAMES):
+        self.window_s = window_s
+        self.frames: deque[tuple[float, bytes]] = deque(maxlen=max_frames)
+
+    def add(self, timestamp: float, jpeg: bytes) -> None:
+        self.frames.append((timestamp, jpeg))
+        while self.frames and timestamp - self.frames[0][0] > self.window_s:
+            self.frames.popleft()
+
+    def constant_rate(self, fps: int = FPS) -> list[bytes]:
+        """Frames repeated to play back at ``fps`` in real time (the screencast only sends changes)."""
+        frames = list(self.frames)
+        out = []
+        for (timestamp, jpeg), following in zip(frames, frames[1:] + [None]):
+            hold = (following[0] - timestamp) if following else 1.0
+            out.extend([jpeg] * max(1, round(hold * fps)))
+        return out
+
+    async def write(self, target: Path) -> Path | None:
+        """Encode to ``target`` (a ``.webm``), or dump JPEGs next to it without ffmpeg."""
+        if not self.frames:
+            return None
+        target.parent.mkdir(parents=True, exist_ok=True)
+        ffmpeg = find_ffmpeg()
+        if ffmpeg is None:
+            frames_dir = target.with_name(f"{target.stem}-frames")
+            frames_dir.mkdir(exist_ok=True)
+            for index, (_, jpeg) in enumerate(self.frames):
+                (frames_dir / f"{index:05d}.jpg").write_bytes(jpeg)
+            return frames_dir
+        # The same encoder settings Playwright uses for its own recordings.
+        process = await asyncio.create_subprocess_exec(
+            ffmpeg, "-loglevel", "error", "-f", "image2pipe", "-avoid_negative_ts", "make_zero", "-c:v", "mjpeg",
+            "-framerate", str(FPS), "-i", "pipe:0", "-y", "-an", "-r", str(FPS), "-c:v", "vp8", "-qmin", "0",
+            "-qmax", "50", "-crf", "8", "-deadline", "realtime", "-speed", "8", "-b:v", "1M", "-threads", "1",
+            str(target),
+            stdin=asyncio.subprocess.PIPE,
+        )
+        await process.communicate(b"".join(self.constant_rate()))
+        return target if process.returncode == 0 else None
+
+
+class Capture:
+    """Video and trace capture of one test's context."""
+
+    def __init__(self, test_id: str, video: str = "off", trace: str = "off", directory: Path = ARTIFACTS_DIR):
+        for mode in (video, trace):
+            if mode not in MODES:
+                raise ValueError(f"capture mode must be one of {MODES}")
+        self.test_id = test_id
+        self.video = video
+        self.trace = trace
+        self.directory = directory / test_id
+        self.buffer = FrameBuffer()
+        self.video_path: Path | None = None
+        self._pages: list[Page] = []
+        self._sessions: list[Any] = []
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.video != "off" or self.trace != "off"
+
+    def context_options(self) -> dict[str, Any]:
+        """``new_context`` options; only ``always`` video needs any."""
+        if self.video != "always":
+            return {}
+        return {"record_video_dir": str(self.directory / "raw"), "record_video_size": {"width": 1280, "height": 720}}
+
+    async def start(self, context: BrowserContext) -> None:
+        """Start tracing and, for on-failure video, screencast every page the context opens."""
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
+        if self.trace != "off":
+            await context.tracing.start(screenshots=True, snapshots=True, title=self.test_id)
+        context.on("page", self._on_page)
+        for page in context.pages:
+            self._on_page(page)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _on_page(self, page: Page) -> None:
+        self._pages.append(page)
+        if self.video == "on-failure":
+            self._spawn(self._screencast(page))
+
+    async def _screencast(self, page: Page) -> None:
+        session = await page.context.new_cdp_session(page)
+        self._sessions.append(session)
+
+        def on_frame(params: dict[str, Any]) -> None:
+            self.buffer.add(params["metadata"]["timestamp"], base64.b64decode(params["data"]))
+            self._spawn(session.send("Page.screencastFrameAck", {"sessionId": params["sessionId"]}))
+
+        session.on("Page.screencastFrame", on_frame)
+        await session.send("Page.startScreencast", SCREENCAST)
+
+    async def finish(self, context: BrowserContext, failed: bool) -> list[str]:
+        """Persist what the mode keeps for this outcome; call before the context closes."""
+        saved = []
+        for session in self._sessions:
+            try:
+                await session.detach()
+            except Exception:
+                pass  # the page is already gone
+        # Pending acks or screencast starts for pages that closed mid-test.
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.trace == "always" or (self.trace == "on-failure" and failed):
+            path = self.directory / "trace.zip"
+            await context.tracing.stop(path=path)
+            saved.append(str(path))
+        elif self.trace == "on-failure":
+            await context.tracing.stop()
+        if self.video == "on-failure" and failed:
+            self.video_path = await self.buffer.write(self.directory / "video.webm")
+            if self.video_path is not None:
+                saved.append(str(self.video_path))
+        self.buffer.frames.clear()
+        return saved
+
+    async def close(self) -> list[str]:
+        """Move ``always`` recordings into place; call after the context has closed."""
+        if self.video != "always":
+            return []
+        saved = []
+        for index, page in enumerate(self._pages):
+            if page.video is None:
+                continue
+            target = self.directory / ("video.webm" if index == 0 else f"video-{index}.webm")
+            await page.video.save_as(target)
+            await page.video.delete()
+            saved.append(str(target))
+        shutil.rmtree(self.directory / "raw", ignore_errors=True)
+        if saved:
+            self.video_path = Path(saved[0])
+        return saved
@@ -0,0 +1,282 @@
+"""Compile ``testsprite_frontend_test_plan.json`` into runnable TC modules.
+
+    python -m harness.compiler [TC010 ...] [--rebuild] [--show]
+    python -m harness --plan missing      # run compiled TCs for plan entries without a script (default)
+    python -m harness --plan all          # run every TC from the plan instead of the scripts
+
+Each plan step's description is matched against :data:`RULES`, which turn
+it into :class:`harness.steps.Step` records from the step library (log in,
+navigate, fill a form, submit, assert a card, a toast, the URL...).  A
+step no rule understands becomes ``pending`` and fails with its plan text
+when reached, so a compiled TC never passes on steps it skipped.
+
+The generated module is the list of steps plus a two-line ``run_test``;
+launching, waits and login come from :mod:`harness.steps`.  It is written
+to ``tmp/compiled/<key>/TCxxx_<Title>.py``, where the key hashes the plan
+entry, the steps compiled from it (so constants baked into them, like
+the dashboard card titles, count too) and the sources of this module
+and the step library, so compiling an unchanged plan only looks the
+files up.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from . import steps
+from .config import SUITE_DIR, TMP_DIR
+from .steps import Step
+from .vitals import DASHBOARD_CARDS
+
+PLAN_PATH = SUITE_DIR / "testsprite_frontend_test_plan.json"
+COMPILED_DIR = TMP_DIR / "compiled"
+
+# Routes App.tsx serves without a session.
+PUBLIC_ROUTES = {"/", "/login", "/register", "/forgot-password", "/reset-password", "/pricing"}
+
+# Form contents per page and variant; values starting with $ are steps.VALUES tokens.
+FORMS: dict[str, dict[str, dict[str, str]]] = {
+    "/register": {
+        "valid": {"Nome Completo": "Usuário Teste", "Email": "$new_email", "Senha": "$password", "Confirmar Senha": "$password"},
+        "invalid_email": {"Nome Completo": "Usuário Teste", "Email": "$invalid_email", "Senha": "$password", "Confirmar Senha": "$password"},
+    },
+    "/login": {
+        "valid": {"Email": "$login_email", "Senha": "$login_password"},
+        "wrong": {"Email": "$login_email", "Senha": "$wrong_password"},
+    },
+}
+
+
+@dataclass
+class Scope:
+    """What the steps compiled so far have done, for rules that depend on it."""
+
+    route: str = "/"
+    logged_in: bool = False
+    # Variant of the FORMS entry filled last
+    filled: str | None = None
+
+
+Rule = Callable[[re.Match, Scope], list[Step]]
+
+
+def _navigate(route: str, scope: Scope, login: bool = True) -> list[Step]:
+    compiled = []
+    if login and route not in PUBLIC_ROUTES and not scope.logged_in:
+        compiled.append(Step("login"))
+        scope.logged_in = True
+    compiled.append(Step("navigate", (route,)))
+    scope.route = route
+    return compiled
+
+
+def _login_then_navigate(match: re.Match, scope: Scope) -> list[Step]:
+    scope.logged_in = True
+    return [Step("login"), *_navigate(match[1], scope)]
+
+
+def _without_login(match: re.Match, scope: Scope) -> list[Step]:
+    routes = [route.strip() for route in match[1].split(",")]
+    compiled = []
+    for route in routes[:-1]:
+        compiled += [*_navigate(route, scope, login=False), Step("assert_url", ("/login",))]
+    return compiled + _navigate(routes[-1], scope, login=False)
+
+
+def _form(variant: str) -> Rule:
+    def rule(match: re.Match, scope: Scope) -> list[Step]:
+        fields = FORMS.get(scope.route, {}).get(variant)
+        if fields is None:
+            return [Step("pending")]
+        scope.filled = variant
+        return [Step("fill_form", (fields,))]
+
+    return rule
+
+
+def _submit(match: re.Match, scope: Scope) -> list[Step]:
+    if scope.route == "/login" and scope.filled == "valid":
+        scope.logged_in = True
+    return [Step("submit")]
+
+
+def _stays(match: re.Match, scope: Scope) -> list[Step]:
+    return [Step("assert_url", (scope.route,))]
+
+
+def _redirected(route: str) -> Rule:
+    def rule(match: re.Match, scope: Scope) -> list[Step]:
+        scope.route = route
+        return [Step("assert_url", (route,))]
+
+    return rule
+
+
+def _redirected_to_match(match: re.Match, scope: Scope) -> list[Step]:
+    return _redirected(match[1])(match, scope)
+
+
+def _const(*compiled: Step) -> Rule:
+    return lambda match, scope: list(compiled)
+
+
+# First match wins; patterns are matched against the whole description, ignoring case.
+RULES: tuple[tuple[str, Rule], ...] = (
+    (r"log in and navigate to .*\((/[\w/-]*)\)", _login_then_navigate),
+    (r"attempt to access protected routes? \(([^)]+)\) without login", _without_login),
+    (r"navigate to .*\((/[\w/-]*)\)", lambda match, scope: _navigate(match[1], scope)),
+    (r"enter (valid email and password|valid registered email and corresponding password)", _form("valid")),
+    (r"enter an invalid email format and valid password", _form("invalid_email")),
+    (r"enter incorrect email or password", _form("wrong")),
+    (r"submit the .*form|click the (login|submit) button", _submit),
+    (r"confirm registration success message is displayed", _const(Step("assert_toast", ("success",)))),
+    (r"display relevant error message for invalid credentials", _const(Step("assert_toast", ("error",)))),
+    (r"verify error message indicating invalid email format is shown", _const(Step("assert_invalid", ("Email",)))),
+    (r"verify that user is not redirected|user remains on (the )?login page", _stays),
+    (r"confirm redirection to organization creation page", _redirected("/create-organization")),
+    (r"user is redirected to (the )?login page", _redirected("/login")),
+    (r".*redirected to .*\((/[\w/-]*)\)", _redirected_to_match),
+    (r"initiate manual appointment creation form", _const(Step("click", ("Novo Agendamento",)))),
+    (r"reload page after login", _const(Step("reload"))),
+    (r"session is established and persisted|user session persists and user remains authenticated", _const(Step("reload"), Step("assert_session"))),
+    (r"dashboard shows real-time metrics.*", _const(*(Step("assert_card", (title,)) for title in DASHBOARD_CARDS))),
+)
+
+_COMPILED_RULES = [(re.compile(pattern, re.IGNORECASE), rule) for pattern, rule in RULES]
+
+
+def compile_steps(case: dict[str, Any]) -> list[Step]:
+    """The library steps for one plan entry, each labelled with its plan step."""
+    scope = Scope()
+    compiled = []
+    for plan_step in case["steps"]:
+        description = plan_step["description"].strip()
+        for pattern, rule in _COMPILED_RULES:
+            match = pattern.fullmatch(description)
+            if match:
+                produced = rule(match, scope)
+                break
+        else:
+            produced = [Step("pending")]
+        compiled += [Step(step.action, step.args, description) for step in produced]
+    return compiled
+
+
+def shared_login(compiled: list[Step]) -> bool:
+    """Tests that log in without going through the login form can start from the shared session."""
+    return any(step.action == "login" for step in compiled) and not any(
+        step.action == "fill_form" and "$login_password" in step.args[0].values() for step in compiled
+    )
+
+
+def case_key(case: dict[str, Any], compiled: list[Step]) -> str:
+    sha = hashlib.sha256(json.dumps(case, sort_keys=True, ensure_ascii=False).encode())
+    sha.update(repr(compiled).encode())
+    for source in (Path(__file__), Path(steps.__file__)):
+        sha.update(source.read_bytes())
+    return sha.hexdigest()[:16]
+
+
+def module_name(case: dict[str, Any]) -> str:
+    """``TC010_Manual_Appointment_Creation_with_Validation``, like the TestSprite scripts."""
+    return f"{case['id']}_{re.sub(r'[^0-9A-Za-z]+', '_', case['title']).strip('_')}"
+
+
+_TEMPLATE = '''"""{id} - {title}.
+
+Compiled from testsprite_frontend_test_plan.json by harness.compiler;
+change the plan or the compiler's rules, not this file.
+"""
+
+from harness.steps import Step, run
+
+PLAN_HASH = {key!r}
+SHARED_LOGIN = {shared}
+
+STEPS = [
+{steps}
+]
+
+
+async def run_test(context=None):
+    await run(STEPS, context)
+'''
+
+
+def render(case: dict[str, Any], key: str, compiled: list[Step]) -> str:
+    return _TEMPLATE.format(
+        id=case["id"],
+        title=case["title"],
+        key=key,
+        shared=shared_login(compiled),
+        steps="\n".join(f"    {step!r}," for step in compiled),
+    )
+
+
+@dataclass
+class Compiled:
+    test_id: str
+    path: Path
+    steps: list[Step]
+    # Found in tmp/compiled rather than generated now
+    cached: bool
+
+    @property
+    def pending(self) -> int:
+        return sum(step.action == "pending" for step in self.steps)
+
+
+def compile_case(case: dict[str, Any], rebuild: bool = False, directory: Path = COMPILED_DIR) -> Compiled:
+    """Write (or find) the module for one plan entry."""
+    compiled = compile_steps(case)
+    key = case_key(case, compiled)
+    path = directory / key / f"{module_name(case)}.py"
+    if path.exists() and not rebuild:
+        return Compiled(case["id"], path, compiled, cached=True)
+    # Older compilations of this TC would otherwise pile up.
+    for stale in directory.glob(f"*/{case['id']}_*.py"):
+        if stale.parent != path.parent:
+            shutil.rmtree(stale.parent)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(render(case, key, compiled), encoding="utf-8")
+    return Compiled(case["id"], path, compiled, cached=False)
+
+
+def load_plan(path: Path = PLAN_PATH) -> list[dict[str, Any]]:
+    if not path.exists():
+        return []
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compile_plan(selected: list[str] | None = None, rebuild: bool = False, plan_path: Path = PLAN_PATH) -> list[Compiled]:
+    wanted = {s.upper() for s in selected} if selected else None
+    return [compile_case(case, rebuild) for case in load_plan(plan_path) if wanted is None or case["id"] in wanted]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.compiler", description=__doc__.splitlines()[0])
+    parser.add_argument("tests", nargs="*", help="TC ids to compile (default: the whole plan)")
+    parser.add_argument("--rebuild", action="store_true", help="regenerate even when the cached module is current")
+    parser.add_argument("--show", action="store_true", help="list each compiled step under its TC")
+    args = parser.parse_args(argv)
+    results = compile_plan(args.tests, args.rebuild)
+    for result in results:
+        state = "cached" if result.cached else "compiled"
+        print(f"{result.test_id} {state:<8} {len(result.steps):>3} steps, {result.pending} pending  {result.path.relative_to(SUITE_DIR)}")
+        if args.show:
+            for step in result.steps:
+                print(f"      {step.action:<14} {', '.join(map(repr, step.args)):<40}  {step.description}")
+    pending = sum(r.pending for r in results)
+    print(f"{len(results)} TCs, {sum(len(r.steps) for r in results)} steps, {pending} pending")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,49 @@
+"""Paths and settings shared by the harness modules."""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+SUITE_DIR = Path(__file__).resolve().parent.parent
+TMP_DIR = SUITE_DIR / "tmp"
+CONFIG_PATH = TMP_DIR / "config.json"
+TEST_RESULTS_PATH = TMP_DIR / "test_results.json"
+RUN_RESULTS_PATH = TMP_DIR / "run_results.json"
+BUDGETS_PATH = SUITE_DIR / "budgets.json"
+
+DEFAULT_BASE_URL = "http://localhost:8080"
+
+SUPABASE_CLIENT_PATH = SUITE_DIR.parent / "src" / "integrations" / "supabase" / "client.ts"
+
+
+def load_config(path: Path = CONFIG_PATH) -> dict[str, Any]:
+    """Load the TestSprite ``config.json``, or an empty dict when absent."""
+    if not path.exists():
+        return {}
+    with path.open(encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def load_budgets(section: str, path: Path = BUDGETS_PATH) -> dict[str, Any]:
+    """Performance budgets for ``section`` from ``budgets.json`` (empty when absent)."""
+    if not path.exists():
+        return {}
+    with path.open(encoding="utf-8") as fh:
+        return json.load(fh).get(section, {})
+
+
+def base_url(config: dict[str, Any] | None = None) -> str:
+    """Return the app URL the suite targets."""
+    config = load_config() if config is None else config
+    return config.get("localEndpoint") or DEFAULT_BASE_URL
+
+
+def supabase_url(path: Path = SUPABASE_CLIENT_PATH) -> str:
+    """The Supabase project URL the app is built against (from ``client.ts``)."""
+    match = re.search(r'SUPABASE_URL = "([^"]+)"', path.read_text(encoding="utf-8"))
+    if not match:
+        raise ValueError(f"SUPABASE_URL not found in {path}")
+    return match.group(1)
@@ -0,0 +1,305 @@
+"""Responsive layout checks across a device matrix (TC018).
+
+    python -m harness.devices [--devices iphone-se,tablet] [--routes /dashboard,/agents/new] [--supabase standin]
+
+One context per device profile is opened on the same browser and all of
+them walk the app's routes in parallel.  After each route settles, an
+in-page detector looks for:
+
+* ``page-overflow`` - the document is wider than the viewport (sideways scrolling);
+* ``offscreen`` - a visible element partly past the left or right edge,
+  outside any container that scrolls or clips it;
+* ``clipped-text`` - text cut off by an ``overflow: hidden`` box without an ellipsis;
+* ``small-target`` - on touch devices, a control smaller than WCAG 2.2's
+  24x24 CSS pixel minimum.
+
+The first two break the layout (:data:`BLOCKING`); the others are
+reported alongside.  Results are one :class:`DeviceResult` per device,
+written to ``tmp/device_matrix.json`` by the CLI and by TC018.
+
+In a TC script :func:`run_matrix` opens its contexts with
+:func:`context_factory`, next to the runner's context and with the same
+pool hooks (the Supabase stand-in redirect, for one) and per-test setup
+(HAR record/replay into ``<TC>.<device>.har.zip``, coverage), and copies
+its logged-in storage state.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Sequence
+
+from playwright.async_api import BrowserContext, Page
+
+from . import auth, waits
+from .config import TMP_DIR, base_url
+from .pool import BrowserPool, owner
+from .standins.supabase import SupabaseStandin, redirect_supabase
+
+REPORT_PATH = TMP_DIR / "device_matrix.json"
+
+BLOCKING = ("page-overflow", "offscreen")
+# Issues of one kind reported per route; the count still covers all of them.
+MAX_ISSUES = 20
+MIN_TARGET_PX = 24
+
+
+@dataclass(frozen=True)
+class Device:
+    name: str
+    width: int
+    height: int
+    scale: float = 1.0
+    mobile: bool = False
+
+    def context_options(self) -> dict[str, Any]:
+        return {
+            "viewport": {"width": self.width, "height": self.height},
+            "device_scale_factor": self.scale,
+            "is_mobile": self.mobile,
+            "has_touch": self.mobile,
+        }
+
+
+DEVICES = (
+    Device("iphone-se", 375, 667, 2, mobile=True),
+    Device("iphone-11", 414, 896, 2, mobile=True),
+    Device("tablet", 768, 1024, 2, mobile=True),
+    Device("desktop", 1280, 720),
+)
+
+# Client routes from App.tsx, without the admin area and the token-only reset page.
+ROUTES = (
+    "/",
+    "/login",
+    "/register",
+    "/forgot-password",
+    "/pricing",
+    "/dashboard",
+    "/agents",
+    "/agents/new",
+    "/agents/templates",
+    "/conversations",
+    "/appointments",
+    "/reports",
+)
+
+_DETECTOR_JS = """([limit, minTarget, touch]) => {
+  const vw = document.documentElement.clientWidth;
+  const issues = [];
+  const counts = {};
+  const path = (el) => {
+    const parts = [];
+    for (let e = el; e && e.nodeType === 1 && parts.length < 4; e = e.parentElement) {
+      let part = e.tagName.toLowerCase();
+      if (e.id) { parts.unshift(`${part}#${e.id}`); break; }
+      const classes = [...e.classList].filter((c) => !/[:\\[\\]\\/.]/.test(c)).slice(0, 2);
+      if (classes.length) part += "." + classes.join(".");
+      parts.unshift(part);
+    }
+    return parts.join(" > ");
+  };
+  const add = (kind, el, extra) => {
+    counts[kind] = (counts[kind] || 0) + 1;
+    if (counts[kind] <= limit) {
+      const text = (el.innerText || el.value || el.getAttribute("aria-label") || "").trim().slice(0, 60);
+      issues.push({ kind, selector: path(el), text, ...extra });
+    }
+  };
+  const contained = (el) => {
+    for (let e = el.parentElement; e && e !== document.body; e = e.parentElement) {
+      if (["auto", "scroll", "hidden", "clip"].includes(getComputedStyle(e).overflowX)) return true;
+    }
+    return false;
+  };
+
+  const scrollWidth = document.documentElement.scrollWidth;
+  if (scrollWidth > vw + 1) add("page-overflow", document.documentElement, { scrollWidth, viewport: vw });
+
+  const offscreen = new Set();
+  for (const el of document.body.querySelectorAll("*")) {
+    const style = getComputedStyle(el);
+    if (style.display === "none" || style.visibility === "hidden" || el.closest("[aria-hidden=true]")) continue;
+    const r = el.getBoundingClientRect();
+    if (!r.width || !r.height) continue;
+    // Partly past an edge; wholly offscreen elements are closed drawers and the like.
+    if (((r.right > vw + 1 && r.left < vw) || (r.left < -1 && r.right > 0)) && !contained(el)) {
+      offscreen.add(el);
+      // Report where it starts, not every descendant that overflows with it.
+      if (!offscreen.has(el.parentElement)) add("offscreen", el, { left: Math.round(r.left), right: Math.round(r.right), viewport: vw });
+    }
+    if (["hidden", "clip"].includes(style.overflowX) && style.textOverflow !== "ellipsis"
+        && el.scrollWidth > el.clientWidth + 1 && [...el.childNodes].some((n) => n.nodeType === 3 && n.textContent.trim())) {
+      add("clipped-text", el, { scrollWidth: el.scrollWidth, clientWidth: el.clientWidth });
+    }
+    if (touch && el.matches("a[href], button, input:not([type=hidden]), select, textarea, [role=button]")
+        && (r.width < minTarget || r.height < minTarget)) {
+      add("small-target", el, { width: Math.round(r.width), height: Math.round(r.height) });
+    }
+  }
+  return { issues, counts, viewport: vw, scrollWidth };
+}"""
+
+
+@dataclass
+class RouteResult:
+    route: str
+    url: str
+    ms: int
+    counts: dict[str, int] = field(default_factory=dict)
+    issues: list[dict[str, Any]] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def blocking(self) -> int:
+        # A route that did not load is as broken as one that overflows.
+        return int(self.error is not None) + sum(self.counts.get(kind, 0) for kind in BLOCKING)
+
+
+@dataclass
+class DeviceResult:
+    device: Device
+    ms: int = 0
+    routes: list[RouteResult] = field(default_factory=list)
+
+    @property
+    def blocking(self) -> int:
+        return sum(r.blocking for r in self.routes)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "device": asdict(self.device),
+            "ms": self.ms,
+            "blocking": self.blocking,
+            "routes": [{**asdict(r), "blocking": r.blocking} for r in self.routes],
+        }
+
+
+# Called with a name for the new context (the device's) and new_context options.
+ContextFactory = Callable[..., AbstractAsyncContextManager[BrowserContext]]
+
+
+def context_factory(context: BrowserContext) -> ContextFactory:
+    """Open new contexts next to ``context``: through its pool when it has one, else on its browser."""
+    pool = owner(context)
+    if pool is not None:
+        return lambda name, **options: pool.sibling(context, name, **options)
+
+    @asynccontextmanager
+    async def open_context(name: str, **options: Any) -> AsyncIterator[BrowserContext]:
+        sibling = await context.browser.new_context(**options)
+        try:
+            yield sibling
+        finally:
+            await sibling.close()
+
+    return open_context
+
+
+async def check_route(page: Page, url: str, route: str, touch: bool) -> RouteResult:
+    started = time.perf_counter()
+    try:
+        await page.goto(f"{url}{route}", timeout=10000)
+        await waits.settled(page)
+        found = await page.evaluate(_DETECTOR_JS, [MAX_ISSUES, MIN_TARGET_PX, touch])
+    except Exception as exc:
+        return RouteResult(route, page.url, round((time.perf_counter() - started) * 1000), error=f"{type(exc).__name__}: {str(exc).splitlines()[0]}")
+    # Logged-out redirects show up as a different final URL.
+    return RouteResult(route, page.url, round((time.perf_counter() - started) * 1000), found["counts"], found["issues"])
+
+
+async def check_device(
+    open_context: ContextFactory, device: Device, routes: Sequence[str], url: str, storage_state: dict[str, Any] | None
+) -> DeviceResult:
+    started = time.perf_counter()
+    result = DeviceResult(device)
+    options = device.context_options()
+    if storage_state is not None:
+        options["storage_state"] = storage_state
+    async with open_context(device.name, **options) as context:
+        waits.track(context)
+        page = await context.new_page()
+        for route in routes:
+            result.routes.append(await check_route(page, url, route, device.mobile))
+    result.ms = round((time.perf_counter() - started) * 1000)
+    return result
+
+
+async def run_matrix(
+    open_context: ContextFactory,
+    devices: Sequence[Device] = DEVICES,
+    routes: Sequence[str] = ROUTES,
+    storage_state: dict[str, Any] | None = None,
+    url: str | None = None,
+) -> list[DeviceResult]:
+    """Check every route on every device, one context per device, all at once."""
+    url = url or base_url()
+    return list(await asyncio.gather(*(check_device(open_context, device, routes, url, storage_state) for device in devices)))
+
+
+def write_report(results: list[DeviceResult], path: Path = REPORT_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps([r.to_dict() for r in results], indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def summary(results: list[DeviceResult]) -> str:
+    """One line per device and route that has issues."""
+    lines = []
+    for result in results:
+        for route in result.routes:
+            if route.error:
+                lines.append(f"{result.device.name} {route.route}: {route.error}")
+            elif route.counts:
+                counts = ", ".join(f"{count} {kind}" for kind, count in sorted(route.counts.items()))
+                lines.append(f"{result.device.name} {route.route}: {counts}")
+    return "\n".join(lines)
+
+
+async def _main(args: argparse.Namespace) -> list[DeviceResult]:
+    devices = [d for d in DEVICES if args.devices is None or d.name in args.devices]
+    routes = args.routes or ROUTES
+    async with _standin(args.supabase) as standin, BrowserPool(headless=not args.headed) as pool:
+        if standin is not None:
+            pool.add_context_hook(lambda context: redirect_supabase(context, standin.url))
+        async with pool.context() as context:
+            waits.track(context)
+            await auth.login(await context.new_page())
+            storage_state = await context.storage_state()
+            started = time.perf_counter()
+            results = await run_matrix(context_factory(context), devices, routes, storage_state)
+            print(f"{len(devices)} devices x {len(routes)} routes in {time.perf_counter() - started:.1f} s")
+    return results
+
+
+@asynccontextmanager
+async def _standin(mode: str) -> AsyncIterator[SupabaseStandin | None]:
+    if mode != "standin":
+        yield None
+        return
+    with SupabaseStandin() as standin:
+        yield standin
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.devices", description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=lambda v: v.split(","), help=f"comma-separated subset of {', '.join(d.name for d in DEVICES)}")
+    parser.add_argument("--routes", type=lambda v: v.split(","), help="comma-separated routes (default: every client route)")
+    parser.add_argument("--supabase", choices=["remote", "standin"], default="remote")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--output", type=Path, default=REPORT_PATH)
+    args = parser.parse_args(argv)
+    results = asyncio.run(_main(args))
+    write_report(results, args.output)
+    print(summary(results) or "no issues")
+    print(f"report written to {args.output}")
+    return 1 if any(r.blocking for r in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+"""Record each TC's network traffic to a HAR file and replay it later.
+
+``record`` runs give every test's context ``record_har_path`` so all its
+traffic (Vite modules, Supabase REST/auth, fonts) lands in
+``tmp/har/<TC>.har.zip``.  ``replay`` runs serve those files through
+``context.route_from_har`` and never touch the network.  A request the
+recording cannot answer is aborted and listed in
+``tmp/har/<TC>.unmatched.json``; Playwright matches on the exact URL and
+body, so queries that embed "today" go stale after a day and show up
+there too.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+from playwright.async_api import BrowserContext, Route
+
+from .config import TMP_DIR
+
+HAR_DIR = TMP_DIR / "har"
+
+MODES = ("off", "record", "replay")
+
+
+def har_path(test_id: str, har_dir: Path = HAR_DIR, part: str | None = None) -> Path:
+    """The test's HAR, or with ``part`` the one of a sibling context it opened (``<TC>.<part>.har.zip``)."""
+    # The .zip suffix makes Playwright store bodies as attachments instead of base64 inline.
+    return har_dir / (f"{test_id}.{part}.har.zip" if part else f"{test_id}.har.zip")
+
+
+def har_paths(test_id: str, har_dir: Path = HAR_DIR) -> list[Path]:
+    """Every HAR recorded for ``test_id``, its sibling contexts' included."""
+    return sorted(har_dir.glob(f"{test_id}.*har.zip"))
+
+
+def record_options(test_id: str, har_dir: Path = HAR_DIR, part: str | None = None) -> dict[str, Any]:
+    """``new_context`` options that record ``test_id``'s traffic (of sibling ``part``)."""
+    har_dir.mkdir(parents=True, exist_ok=True)
+    return {
+        "record_har_path": str(har_path(test_id, har_dir, part)),
+        "record_har_content": "attach",
+        "record_har_mode": "full",
+    }
+
+
+class HarReplay:
+    """Serves one test's recording and collects what it could not answer."""
+
+    def __init__(self, test_id: str, har_dir: Path = HAR_DIR):
+        self.test_id = test_id
+        self.har_dir = har_dir
+        self.path = har_path(test_id, har_dir)
+        self.report_path = har_dir / f"{test_id}.unmatched.json"
+        self.unmatched: list[str] = []
+
+    async def attach(self, context: BrowserContext, part: str | None = None) -> None:
+        """Serve ``context`` from the test's HAR, or from sibling ``part``'s."""
+        path = har_path(self.test_id, self.har_dir, part)
+        if not path.exists():
+            raise FileNotFoundError(f"no HAR recorded at {path.name}; run {self.test_id} with --har record first")
+        # Routes registered later win, so the HAR is consulted first and
+        # falls back to the catch-all only for requests it does not contain.
+        await context.route("**/*", self._unmatched)
+        await context.route_from_har(path, not_found="fallback")
+
+    async def _unmatched(self, route: Route) -> None:
+        self.unmatched.append(f"{route.request.method} {route.request.url}")
+        await route.abort("internetdisconnected")
+
+    def write_report(self) -> None:
+        """Write the unmatched requests, or clear a report left by an older run."""
+        if self.unmatched:
+            self.report_path.write_text(json.dumps(self.unmatched, indent=2) + "\n", encoding="utf-8")
+        elif self.report_path.exists():
+            self.report_path.unlink()
@@ -0,0 +1,269 @@
+"""Test-impact selection: run only the TCs a change can affect.
+
+    python -m harness --record-impact                  # full run that refreshes impact_map.json
+    python -m harness.impact --since origin/main       # TC ids affected by the branch
+    python -m harness --changed-since origin/main      # run just those
+
+While recording, every test's contexts are watched for what they
+exercise: the app routes they navigate to, the source modules the Vite
+dev server hands them (each ``src/`` file is its own request in dev
+mode, which makes the module list the test's JS coverage at file
+granularity), the Supabase tables and RPCs they query and the edge
+functions they invoke.  Passing tests write one fragment each to
+``tmp/impact/``; the runner merges them into ``impact_map.json`` next to
+the scripts.  The repository ships without a map: until a
+``--record-impact`` run writes one (commit it so CI can select without
+recording), every TC counts as unmapped and is selected.
+
+A changed file selects the TCs that loaded it, or that hit the tables a
+changed migration mentions, or that invoked a changed edge function
+(any function for ``supabase/functions/shared``).  An edit to the test
+plan selects the entries it changed, which run compiled from the plan
+(:mod:`harness.compiler`).  Build and harness files select everything,
+documentation selects nothing, and TCs missing from the map always run
+because nothing is known about them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import re
+import subprocess
+import time
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Any, Iterable
+from urllib.parse import urlsplit
+
+from .config import SUITE_DIR, TMP_DIR, base_url
+
+IMPACT_MAP_PATH = SUITE_DIR / "impact_map.json"
+FRAGMENTS_DIR = TMP_DIR / "impact"
+
+REPO_DIR = SUITE_DIR.parent
+SUITE_PREFIX = SUITE_DIR.relative_to(REPO_DIR).as_posix() + "/"
+
+PLAN_FILE = SUITE_PREFIX + "testsprite_frontend_test_plan.json"
+
+REST_PATH = "/rest/v1/"
+FUNCTIONS_PATH = "/functions/v1/"
+
+# Changes that can affect any test.
+GLOBAL_PATTERNS = (
+    "package.json",
+    "package-lock.json",
+    "bun.lockb",
+    "index.html",
+    "vite.config.*",
+    "tailwind.config.*",
+    "postcss.config.*",
+    "tsconfig*.json",
+    "components.json",
+    "public/*",
+    SUITE_PREFIX + "harness/*",
+    SUITE_PREFIX + "budgets.json",
+    SUITE_PREFIX + "impact_map.json",
+)
+
+TC_SCRIPT = re.compile(r"^(TC\d{3})_.+\.py$")
+
+
+@dataclass
+class Coverage:
+    """What one test exercised."""
+
+    routes: set[str] = field(default_factory=set)
+    modules: set[str] = field(default_factory=set)
+    tables: set[str] = field(default_factory=set)
+    functions: set[str] = field(default_factory=set)
+
+    def to_dict(self) -> dict[str, list[str]]:
+        return {name: sorted(getattr(self, name)) for name in ("routes", "modules", "tables", "functions")}
+
+    @classmethod
+    def from_dict(cls, record: dict[str, Any]) -> "Coverage":
+        return cls(*(set(record.get(name, [])) for name in ("routes", "modules", "tables", "functions")))
+
+
+class CoverageRecorder:
+    """Collects the :class:`Coverage` of one test from its browser context's traffic."""
+
+    def __init__(self, test_id: str, app_url: str | None = None):
+        self.test_id = test_id
+        self.app_origin = urlsplit(app_url or base_url()).netloc
+        self.coverage = Coverage()
+
+    def _on_request(self, request) -> None:
+        parts = urlsplit(request.url)
+        path = parts.path
+        if parts.netloc == self.app_origin:
+            if path.startswith("/src/"):
+                self.coverage.modules.add(path.lstrip("/"))
+        elif REST_PATH in path:
+            self.coverage.tables.add(path.split(REST_PATH, 1)[1].strip("/"))
+        elif FUNCTIONS_PATH in path:
+            self.coverage.functions.add(path.split(FUNCTIONS_PATH, 1)[1].strip("/"))
+
+    def _on_navigated(self, frame) -> None:
+        # Fires for history.pushState too, so client-side route changes count.
+        parts = urlsplit(frame.url)
+        if frame.parent_frame is None and parts.netloc == self.app_origin:
+            self.coverage.routes.add(parts.path or "/")
+
+    def _on_page(self, page) -> None:
+        page.on("framenavigated", self._on_navigated)
+
+    def watch(self, context) -> None:
+        context.on("request", self._on_request)
+        context.on("page", self._on_page)
+        for page in context.pages:
+            self._on_page(page)
+
+    def write_fragment(self, directory: Path = FRAGMENTS_DIR) -> Path:
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{self.test_id}.json"
+        record = {"test": self.test_id, "recorded": time.time(), **self.coverage.to_dict()}
+        path.write_text(json.dumps(record, indent=2), encoding="utf-8")
+        return path
+
+
+def load_map(path: Path = IMPACT_MAP_PATH) -> dict[str, Coverage]:
+    if not path.exists():
+        return {}
+    with path.open(encoding="utf-8") as fh:
+        return {test_id: Coverage.from_dict(record) for test_id, record in json.load(fh).items()}
+
+
+def merge_fragments(directory: Path = FRAGMENTS_DIR, path: Path = IMPACT_MAP_PATH) -> list[str]:
+    """Fold the recorded fragments into the map, replacing those tests' entries; returns their ids."""
+    fragments = sorted(directory.glob("TC*.json")) if directory.exists() else []
+    if not fragments:
+        return []
+    current = {test_id: coverage.to_dict() for test_id, coverage in load_map(path).items()}
+    updated = []
+    for fragment in fragments:
+        record = json.loads(fragment.read_text(encoding="utf-8"))
+        current[record["test"]] = Coverage.from_dict(record).to_dict()
+        updated.append(record["test"])
+        fragment.unlink()
+    path.write_text(json.dumps(dict(sorted(current.items())), indent=2) + "\n", encoding="utf-8")
+    return updated
+
+
+def changed_files(since: str, repo: Path = REPO_DIR) -> list[str]:
+    """Files changed between the merge base with ``since`` and the working tree, untracked ones included."""
+
+    def git(*args: str) -> list[str]:
+        output = subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout
+        return [line for line in output.splitlines() if line]
+
+    merge_base = git("merge-base", since, "HEAD")[0]
+    # --no-renames lists both sides of a rename, so the old path still selects its tests.
+    return sorted(set(git("diff", "--name-only", "--no-renames", merge_base)) | set(git("ls-files", "--others", "--exclude-standard")))
+
+
+def changed_plan_entries(since: str, repo: Path = REPO_DIR) -> set[str] | None:
+    """Ids of test-plan entries added, removed or edited since the merge base with ``since``.
+
+    None when the old plan cannot be read, so the caller can select everything.
+    """
+    try:
+        merge_base = subprocess.run(
+            ["git", "merge-base", since, "HEAD"], cwd=repo, check=True, capture_output=True, text=True
+        ).stdout.strip()
+        old_text = subprocess.run(
+            ["git", "show", f"{merge_base}:{PLAN_FILE}"], cwd=repo, check=True, capture_output=True, text=True
+        ).stdout
+        old = {case["id"]: case for case in json.loads(old_text)}
+    except (subprocess.CalledProcessError, ValueError):
+        return None
+    current = repo / PLAN_FILE
+    new = {case["id"]: case for case in json.loads(current.read_text(encoding="utf-8"))} if current.exists() else {}
+    return {test_id for test_id in old.keys() | new.keys() if old.get(test_id) != new.get(test_id)}
+
+
+def _tables_in(migration: Path, tables: set[str]) -> set[str] | None:
+    """Mapped tables a migration mentions, or None when it cannot be read (deleted)."""
+    if not migration.exists():
+        return None
+    sql = migration.read_text(encoding="utf-8", errors="replace").lower()
+    return {table for table in tables if re.search(rf"\b{re.escape(table.removeprefix('rpc/').lower())}\b", sql)}
+
+
+def function_matches(changed_dir: str, invoked: str) -> bool:
+    # Deployed names are the directory's last segment, or its path for nested functions.
+    return invoked == changed_dir or invoked == PurePosixPath(changed_dir).name or changed_dir.endswith("/" + invoked)
+
+
+def affected(
+    files: Iterable[str],
+    impact_map: dict[str, Coverage],
+    all_tests: Iterable[str],
+    repo: Path = REPO_DIR,
+    since: str = "HEAD",
+) -> dict[str, list[str]]:
+    """Map each affected TC id to the changed files that select it.
+
+    ``since`` is the ref a test-plan edit is diffed against.
+    """
+    all_tests = sorted(all_tests)
+    reasons: dict[str, list[str]] = {}
+
+    def select(tests: Iterable[str], why: str) -> None:
+        for test_id in tests:
+            reasons.setdefault(test_id, []).append(why)
+
+    for test_id in all_tests:
+        if test_id not in impact_map:
+            select([test_id], "not in impact map")
+    mapped_tables = set().union(*(c.tables for c in impact_map.values())) if impact_map else set()
+    for path in files:
+        name = PurePosixPath(path).name
+        if any(fnmatch.fnmatch(path, pattern) for pattern in GLOBAL_PATTERNS):
+            select(all_tests, path)
+        elif path == PLAN_FILE:
+            entries = changed_plan_entries(since, repo)
+            select(all_tests if entries is None else (t for t in all_tests if t in entries), path)
+        elif path.startswith(SUITE_PREFIX) and TC_SCRIPT.match(name):
+            select([TC_SCRIPT.match(name).group(1)], path)
+        elif path.startswith("src/"):
+            select((t for t, c in impact_map.items() if path in c.modules), path)
+        elif path.startswith("supabase/functions/shared/"):
+            select((t for t, c in impact_map.items() if c.functions), path)
+        elif path.startswith("supabase/functions/"):
+            function_dir = str(PurePosixPath(path).parent.relative_to("supabase/functions"))
+            select((t for t, c in impact_map.items() if any(function_matches(function_dir, f) for f in c.functions)), path)
+        elif path.startswith("supabase/migrations/"):
+            tables = _tables_in(repo / path, mapped_tables)
+            if tables is None:
+                select(all_tests, path)
+            else:
+                select((t for t, c in impact_map.items() if c.tables & tables), path)
+    return {test_id: reasons[test_id] for test_id in all_tests if test_id in reasons}
+
+
+def main(argv: list[str] | None = None) -> int:
+    from .runner import discover_tests, plan_tests
+
+    parser = argparse.ArgumentParser(prog="python -m harness.impact", description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="changed paths relative to the repo root (default: from git)")
+    parser.add_argument("--since", default="HEAD", help="git ref to diff against (default: HEAD, i.e. uncommitted changes)")
+    parser.add_argument("--map", type=Path, default=IMPACT_MAP_PATH)
+    parser.add_argument("--explain", action="store_true", help="list the files that select each TC")
+    args = parser.parse_args(argv)
+    files = args.files or changed_files(args.since)
+    all_tests = [case.test_id for case in plan_tests(discover_tests())]
+    selection = affected(files, load_map(args.map), all_tests, since=args.since)
+    if args.explain:
+        for test_id, why in selection.items():
+            print(f"{test_id}: {', '.join(why)}")
+        print(f"{len(selection)}/{len(all_tests)} TCs affected by {len(files)} changed files")
+    else:
+        print(" ".join(selection))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
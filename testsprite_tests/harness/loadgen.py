@@ -0,0 +1,362 @@
+"""Open-loop load generator for the ``webhooks/evolution`` function.
+
+    python -m harness.loadgen URL --rps 20 --duration 30 [--instances 2] [--phones 500]
+    python -m harness.loadgen URL --rps 10,20,40,80 --duration 20    # step up until it saturates
+
+Sends ``messages.upsert`` payloads shaped like the Evolution API's at a
+fixed (or Poisson) arrival rate.  Arrivals never wait for earlier replies,
+and latency is measured from each message's scheduled send time, so a
+backed-up handler shows up in the percentiles instead of silently
+lowering the offered load.  Point it at ``supabase functions serve``
+wired to the stand-ins (``python -m harness.standins``), whose instances
+are named ``standin-<n>``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import ssl
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from . import stages
+from .config import TMP_DIR
+from .standins.stack import FLUSH_INTERVAL_S
+from .stats import summarize
+
+REPORT_PATH = TMP_DIR / "load_report.json"
+
+# Saturation: the handler no longer keeps up with the offered rate, or fails too often.
+MIN_THROUGHPUT_RATIO = 0.9
+MAX_ERROR_RATIO = 0.05
+
+MESSAGES = (
+    "Olá, bom dia!",
+    "Qual o horário de funcionamento?",
+    "Quero agendar uma consulta para amanhã",
+    "Vocês aceitam cartão?",
+    "Pode me mandar a tabela de preços?",
+    "Obrigado pelo atendimento",
+    "Preciso remarcar meu horário de quinta-feira às 15h",
+    "Oi",
+)
+NAMES = ("Ana", "Bruno", "Carla", "Diego", "Fernanda", "Gabriel", "Juliana", "Marcos")
+
+
+@dataclass
+class Traffic:
+    """Spreads messages over ``instances`` WhatsApp instances and ``phones`` senders."""
+
+    instances: list[str]
+    phones: int = 100
+    extended_ratio: float = 0.3
+    seed: int | None = None
+    rng: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.rng = random.Random(self.seed)
+
+    def next_message(self) -> tuple[str, str, dict[str, Any]]:
+        """Return ``(instance, phone, payload)`` for one inbound message."""
+        instance = self.rng.choice(self.instances)
+        index = self.rng.randrange(self.phones)
+        phone = f"55119{index:08d}"
+        text = self.rng.choice(MESSAGES)
+        if self.rng.random() < self.extended_ratio:
+            message = {"extendedTextMessage": {"text": text}}
+        else:
+            message = {"conversation": text}
+        payload = {
+            "event": "messages.upsert",
+            "instance": instance,
+            "data": {
+                "key": {"remoteJid": f"{phone}@s.whatsapp.net", "fromMe": False, "id": uuid.uuid4().hex[:20].upper()},
+                "pushName": f"{NAMES[index % len(NAMES)]} {index}",
+                "message": message,
+                "messageType": next(iter(message)),
+                "messageTimestamp": int(time.time()),
+            },
+            "date_time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        return instance, phone, payload
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 JSON client on asyncio streams.
+
+    The stdlib has no async HTTP client, and a thread per request would
+    cap the rate we can offer long before the handler saturates.
+    """
+
+    def __init__(self, url: str, max_connections: int = 64, timeout_s: float = 60.0):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.timeout_s = timeout_s
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def post_json(self, payload: Any, headers: dict[str, str] | None = None) -> tuple[int, bytes]:
+        data = json.dumps(payload).encode("utf-8")
+        async with self._slots:
+            if self._idle:
+                try:
+                    return await self._send(self._idle.pop(), data, headers or {})
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    pass  # the server dropped an idle keep-alive connection; retry once on a fresh one
+            return await self._send(await self._connect(), data, headers or {})
+
+    async def close(self) -> None:
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        return await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+
+    async def _send(self, connection, data: bytes, headers: dict[str, str]) -> tuple[int, bytes]:
+        try:
+            status, body, keep_alive = await asyncio.wait_for(self._exchange(connection, data, headers), self.timeout_s)
+        except BaseException:
+            connection[1].close()
+            raise
+        if keep_alive:
+            self._idle.append(connection)
+        else:
+            connection[1].close()
+        return status, body
+
+    async def _exchange(self, connection, data: bytes, headers: dict[str, str]) -> tuple[int, bytes, bool]:
+        reader, writer = connection
+        head = [
+            f"POST {self.path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(data)}",
+            *(f"{name}: {value}" for name, value in headers.items()),
+        ]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before response")
+        status = int(status_line.split()[1])
+        response_headers: dict[str, str] = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        keep_alive = response_headers.get("connection", "").lower() != "close"
+        if "content-length" in response_headers:
+            body = await reader.readexactly(int(response_headers["content-length"]))
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while size := int((await reader.readline()).split(b";")[0], 16):
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            await reader.readline()
+            body = b"".join(chunks)
+        else:
+            body, keep_alive = await reader.read(), False
+        return status, body, keep_alive
+
+
+@dataclass
+class Sample:
+    """One webhook call; times are epoch seconds."""
+
+    request_id: str
+    instance: str
+    phone: str
+    scheduled: float
+    sent: float = 0.0
+    finished: float = 0.0
+    status: int = 0
+    outcome: str = ""
+
+    @property
+    def latency_ms(self) -> float:
+        """From the scheduled send time, so client-side queueing counts."""
+        return (self.finished - self.scheduled) * 1000
+
+    @property
+    def service_ms(self) -> float:
+        return (self.finished - self.sent) * 1000
+
+
+def classify(status: int, body: bytes) -> str:
+    """Outcome label for the error breakdown; ``ok`` means the reply was sent."""
+    if status >= 400:
+        return f"http_{status}"
+    try:
+        reply = json.loads(body)
+    except ValueError:
+        return "bad_json"
+    if reply.get("error"):
+        return f"app: {reply['error']}"
+    if reply.get("processed") is False:
+        return "ignored"
+    if reply.get("sent") is False:
+        return "not_sent"
+    return "ok"
+
+
+async def _fire(client: HttpClient, traffic: Traffic, scheduled: float) -> Sample:
+    instance, phone, payload = traffic.next_message()
+    sample = Sample(uuid.uuid4().hex, instance, phone, scheduled, sent=time.time())
+    try:
+        sample.status, body = await client.post_json(payload, {"X-Request-Id": sample.request_id})
+        sample.outcome = classify(sample.status, body)
+    except Exception as exc:  # noqa: BLE001 - every failure is a data point
+        sample.outcome = type(exc).__name__
+    sample.finished = time.time()
+    return sample
+
+
+async def run_step(client: HttpClient, traffic: Traffic, rps: float, duration_s: float, poisson: bool = False) -> list[Sample]:
+    """Offer ``rps`` messages per second for ``duration_s`` and wait for every reply."""
+    loop = asyncio.get_running_loop()
+    start_loop, start_wall = loop.time(), time.time()
+    tasks = []
+    offset = 0.0
+    while offset < duration_s:
+        delay = start_loop + offset - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(_fire(client, traffic, start_wall + offset)))
+        offset += traffic.rng.expovariate(rps) if poisson else 1 / rps
+    return list(await asyncio.gather(*tasks))
+
+
+def step_report(samples: list[Sample], rps: float) -> dict[str, Any]:
+    """Throughput, latency percentiles and error breakdown for one step."""
+    if not samples:
+        return {"offered_rps": rps, "requests": 0}
+    elapsed = max(s.finished for s in samples) - min(s.scheduled for s in samples)
+    outcomes = Counter(s.outcome for s in samples)
+    ok = outcomes.pop("ok", 0)
+    return {
+        "offered_rps": rps,
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else None,
+        "goodput_rps": round(ok / elapsed, 2) if elapsed else None,
+        "latency_ms": summarize(s.latency_ms for s in samples),
+        "service_ms": summarize(s.service_ms for s in samples),
+        "error_ratio": round(sum(outcomes.values()) / len(samples), 4),
+        "errors": dict(outcomes.most_common()),
+    }
+
+
+def saturated(report: dict[str, Any]) -> bool:
+    throughput = report.get("throughput_rps") or 0
+    return throughput < MIN_THROUGHPUT_RATIO * report["offered_rps"] or report.get("error_ratio", 0) > MAX_ERROR_RATIO
+
+
+def print_step(report: dict[str, Any]) -> None:
+    latency = report.get("latency_ms", {})
+    flag = "  <- saturated" if saturated(report) else ""
+    print(
+        f"{report['offered_rps']:>8.1f} rps offered  {report.get('throughput_rps') or 0:>8.1f} achieved  "
+        f"p50 {latency.get('p50', 0):>8.1f}  p95 {latency.get('p95', 0):>8.1f}  p99 {latency.get('p99', 0):>8.1f} ms  "
+        f"errors {report.get('error_ratio', 0):.1%}{flag}",
+        flush=True,
+    )
+    for outcome, count in report.get("errors", {}).items():
+        print(f"{'':>12}{count:>6}  {outcome}")
+
+
+async def run_load(args: argparse.Namespace) -> dict[str, Any]:
+    instances = [f"{args.instance_prefix}{n}" for n in range(args.instances)]
+    traffic = Traffic(instances, args.phones, args.extended_ratio, args.seed)
+    client = HttpClient(args.url, args.connections, args.timeout)
+    steps = []
+    samples_out = None
+    if args.samples:
+        args.samples.parent.mkdir(parents=True, exist_ok=True)
+        samples_out = args.samples.open("w", encoding="utf-8")
+    try:
+        for rps in args.rps:
+            samples = await run_step(client, traffic, rps, args.duration, args.poisson)
+            report = step_report(samples, rps)
+            steps.append(report)
+            print_step(report)
+            if samples_out:
+                for sample in samples:
+                    samples_out.write(json.dumps({**asdict(sample), "offered_rps": rps}) + "\n")
+            if saturated(report) and not args.keep_going:
+                break
+    finally:
+        await client.close()
+        if samples_out:
+            samples_out.close()
+    knee = next((s["offered_rps"] for s in steps if saturated(s)), None)
+    return {
+        "url": args.url,
+        "instances": instances,
+        "phones": args.phones,
+        "duration_s": args.duration,
+        "arrivals": "poisson" if args.poisson else "uniform",
+        "saturated_at_rps": knee,
+        "steps": steps,
+    }
+
+
+def _rates(value: str) -> list[float]:
+    return [float(rate) for rate in value.split(",")]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m harness.loadgen", description=__doc__.splitlines()[0])
+    parser.add_argument("url", help="webhook URL, e.g. http://127.0.0.1:54321/functions/v1/evolution")
+    parser.add_argument("--rps", type=_rates, default=[10.0], help="target rate, or comma-separated steps")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per step")
+    parser.add_argument("--instances", type=int, default=1, help="number of WhatsApp instances to spread over")
+    parser.add_argument("--instance-prefix", default="standin-")
+    parser.add_argument("--phones", type=int, default=100, help="number of distinct sender phones")
+    parser.add_argument("--extended-ratio", type=float, default=0.3, help="share of extendedTextMessage payloads")
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times instead of a fixed interval")
+    parser.add_argument("--connections", type=int, default=64, help="max concurrent connections")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--keep-going", action="store_true", help="run every step even after saturation")
+    parser.add_argument("--samples", type=Path, help="write one JSON line per request here")
+    parser.add_argument(
+        "--stages",
+        action="store_true",
+        help="afterwards, break latency down per webhook stage from the stand-in call logs (see harness.stages)",
+    )
+    parser.add_argument("--output", type=Path, default=REPORT_PATH)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.stages and args.samples is None:
+        args.samples = stages.SAMPLES_PATH
+    report = asyncio.run(run_load(args))
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if report["saturated_at_rps"] is not None:
+        print(f"saturated at {report['saturated_at_rps']:g} rps")
+    print(f"report written to {args.output}")
+    if args.stages:
+        # Let the stand-in stack flush the last calls of the run.
+        time.sleep(2 * FLUSH_INTERVAL_S)
+        print()
+        stages.analyze(args.samples)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+"""Rewrite the TC scripts to use ``harness.waits`` instead of fixed sleeps.
+
+    python -m harness.migrate_waits [--dry-run]
+
+The TestSprite generator emits three kinds of fixed waits:
+
+* ``await page.wait_for_timeout(3000); await elem.<action>(...)`` before
+  every step, replaced by waiting for the element (and, after clicks, for
+  the resulting route change and Supabase requests);
+* ``await asyncio.sleep(3)`` after every ``page.goto``, replaced by
+  waiting for the document and its Supabase requests;
+* a trailing ``await asyncio.sleep(5)`` before teardown, dropped.
+
+The rewrite is idempotent.  It prints, and saves to
+``tmp/wait_migration.json``, how many seconds of fixed sleeping were
+removed from each test.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+
+from .config import SUITE_DIR, TMP_DIR
+
+REPORT_PATH = TMP_DIR / "wait_migration.json"
+
+IMPORT_LINE = "from harness import waits\n"
+TRACK_LINE = "        waits.track(context)\n"
+TIMEOUT_LINE = "        context.set_default_timeout(5000)\n"
+
+STEP_WAIT = re.compile(r"^(\s*)await page\.wait_for_timeout\((\d+)\); await elem\.(\w+)\((.*)\)$", re.M)
+GOTO_SLEEP = re.compile(r"^(\s*await page\.goto\(.*\)\n)(\s*)await asyncio\.sleep\((\d+(?:\.\d+)?)\)\n", re.M)
+FINAL_SLEEP = re.compile(r"^\s*await asyncio\.sleep\((\d+(?:\.\d+)?)\)\n(?=\s*\n\s*finally:)", re.M)
+
+
+def migrate_source(source: str) -> tuple[str, float]:
+    """Return the rewritten source and the seconds of fixed sleep removed."""
+    removed_ms = 0.0
+
+    def step(match: re.Match) -> str:
+        nonlocal removed_ms
+        indent, delay, action, args = match.groups()
+        removed_ms += int(delay)
+        line = f"{indent}await waits.locator_ready(elem); await elem.{action}({args})"
+        if action == "click":
+            line += "; await waits.settled(page)"
+        return line
+
+    def goto(match: re.Match) -> str:
+        nonlocal removed_ms
+        goto_line, indent, delay = match.groups()
+        removed_ms += float(delay) * 1000
+        return f"{goto_line}{indent}await waits.page_ready(page)\n"
+
+    def final(match: re.Match) -> str:
+        nonlocal removed_ms
+        removed_ms += float(match.group(1)) * 1000
+        return ""
+
+    source = STEP_WAIT.sub(step, source)
+    source = GOTO_SLEEP.sub(goto, source)
+    source = FINAL_SLEEP.sub(final, source)
+    if removed_ms and IMPORT_LINE not in source:
+        source = source.replace("from playwright.async_api import expect\n", f"from playwright.async_api import expect\n\n{IMPORT_LINE}", 1)
+    if removed_ms and TRACK_LINE not in source:
+        source = source.replace(TIMEOUT_LINE, TIMEOUT_LINE + TRACK_LINE, 1)
+    return source, removed_ms / 1000
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.migrate_waits", description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="report without writing files")
+    args = parser.parse_args(argv)
+
+    report = {}
+    for path in sorted(SUITE_DIR.glob("TC*.py")):
+        source = path.read_text(encoding="utf-8")
+        migrated, removed = migrate_source(source)
+        if migrated != source and not args.dry_run:
+            path.write_text(migrated, encoding="utf-8")
+        report[path.stem[:5]] = removed
+        print(f"{path.stem[:5]}  {removed:6.1f}s of fixed sleep removed")
+    print(f"total  {sum(report.values()):6.1f}s")
+
+    # A re-run over migrated scripts removes nothing; keep the original report.
+    if not args.dry_run and any(report.values()):
+        REPORT_PATH.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,166 @@
+"""A pool of warm Chromium browsers shared by every TC in a run.
+
+Each TC script used to start its own Playwright driver and launch its own
+browser.  The pool starts the driver once, launches ``size`` browsers up
+front and hands every test a fresh ``new_context()`` on one of them, so the
+per-test cost drops to creating an incognito context.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+
+# Same flags the generated scripts use, minus ``--single-process``: a
+# single-process Chromium cannot host several contexts reliably.
+LAUNCH_ARGS = [
+    "--window-size=1280,720",
+    "--disable-dev-shm-usage",
+    "--ipc=host",
+]
+
+DEFAULT_TIMEOUT_MS = 5000
+
+ContextHook = Callable[[BrowserContext], Awaitable[None]]
+# Sibling name -> extra new_context options and a hook for that sibling.
+SiblingSetup = Callable[[str], "tuple[dict[str, Any], ContextHook | None]"]
+
+# Context -> the pool that opened it, for code that is handed only a context.
+_OWNERS: "weakref.WeakKeyDictionary[BrowserContext, BrowserPool]" = weakref.WeakKeyDictionary()
+# Context -> per-test setup its siblings inherit (HAR record/replay, coverage).
+_SIBLING_SETUP: "weakref.WeakKeyDictionary[BrowserContext, SiblingSetup]" = weakref.WeakKeyDictionary()
+
+
+def owner(context: BrowserContext) -> "BrowserPool | None":
+    """The pool ``context`` came from, if any."""
+    return _OWNERS.get(context)
+
+
+def share_with_siblings(context: BrowserContext, setup: SiblingSetup) -> None:
+    """Apply ``setup(name)`` to every context :meth:`BrowserPool.sibling` opens next to ``context``.
+
+    The pool hooks reach siblings anyway; this is for what a runner
+    attaches to one test's context only.
+    """
+    _SIBLING_SETUP[context] = setup
+
+
+class BrowserPool:
+    """Keeps ``size`` launched browsers and spreads contexts across them.
+
+    A browser hosts any number of contexts at once; each new context goes
+    to the browser with the fewest open ones.
+    """
+
+    def __init__(self, size: int = 1, headless: bool = True, launch_args: list[str] | None = None):
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        self.size = size
+        self.headless = headless
+        self.launch_args = list(LAUNCH_ARGS if launch_args is None else launch_args)
+        self._pw: Playwright | None = None
+        self._open: dict[Browser, int] = {}
+        self._lock = asyncio.Lock()
+        self._context_hooks: list[ContextHook] = []
+
+    def add_context_hook(self, hook: "ContextHook") -> None:
+        """Run ``hook(context)`` on every new context before handing it out."""
+        self._context_hooks.append(hook)
+
+    async def start(self) -> "BrowserPool":
+        if self._pw is not None:
+            return self
+        self._pw = await async_playwright().start()
+        browsers = await asyncio.gather(*(self._launch() for _ in range(self.size)))
+        self._open = {browser: 0 for browser in browsers}
+        return self
+
+    async def stop(self) -> None:
+        for browser in self._open:
+            if browser.is_connected():
+                await browser.close()
+        self._open.clear()
+        if self._pw is not None:
+            await self._pw.stop()
+            self._pw = None
+
+    async def __aenter__(self) -> "BrowserPool":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    async def _launch(self) -> Browser:
+        assert self._pw is not None, "pool is not started"
+        return await self._pw.chromium.launch(headless=self.headless, args=self.launch_args)
+
+    async def _acquire(self) -> Browser:
+        """Pick the least busy browser, relaunching it first if it has crashed."""
+        if self._pw is None:
+            raise RuntimeError("pool is not started")
+        async with self._lock:
+            browser = min(self._open, key=self._open.__getitem__)
+            if not browser.is_connected():
+                load = self._open.pop(browser)
+                browser = await self._launch()
+                self._open[browser] = load
+            self._open[browser] += 1
+            return browser
+
+    def _release(self, browser: Browser) -> None:
+        if browser in self._open:
+            self._open[browser] -= 1
+
+    @asynccontextmanager
+    async def context(self, **options: Any) -> AsyncIterator[BrowserContext]:
+        """Yield a fresh context on a pooled browser and close it afterwards.
+
+        ``options`` are passed straight to ``Browser.new_context``.
+        """
+        browser = await self._acquire()
+        try:
+            async with self._new_context(browser, options) as context:
+                yield context
+        finally:
+            self._release(browser)
+
+    @asynccontextmanager
+    async def sibling(self, context: BrowserContext, name: str, **options: Any) -> AsyncIterator[BrowserContext]:
+        """Yield a fresh context on the same browser as ``context``, with the same hooks.
+
+        ``name`` tells siblings of one context apart, e.g. in their HAR file names.
+        """
+        browser = context.browser
+        if browser is None or browser not in self._open:
+            raise ValueError("context does not belong to this pool")
+        hooks: list[ContextHook] = []
+        setup = _SIBLING_SETUP.get(context)
+        if setup is not None:
+            extra, hook = setup(name)
+            options = {**extra, **options}
+            if hook is not None:
+                hooks.append(hook)
+        self._open[browser] += 1
+        try:
+            async with self._new_context(browser, options, hooks) as sibling:
+                yield sibling
+        finally:
+            self._release(browser)
+
+    @asynccontextmanager
+    async def _new_context(
+        self, browser: Browser, options: dict[str, Any], hooks: list[ContextHook] | None = None
+    ) -> AsyncIterator[BrowserContext]:
+        context = await browser.new_context(**options)
+        _OWNERS[context] = self
+        context.set_default_timeout(DEFAULT_TIMEOUT_MS)
+        try:
+            for hook in [*self._context_hooks, *(hooks or [])]:
+                await hook(context)
+            yield context
+        finally:
+            await context.close()
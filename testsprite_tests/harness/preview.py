@@ -0,0 +1,240 @@
+"""Production-build target: ``vite build`` once, ``vite preview`` on the app's port.
+
+    python -m harness --target preview        # cold pass, then warm pass
+    python -m harness.preview [--rebuild]     # just build and serve until Ctrl-C
+
+In dev mode Vite serves every source module and pre-bundled dependency
+on its own, so one page load is hundreds of requests against a server
+that may still be optimizing (the ``ERR_EMPTY_RESPONSE`` on
+``/node_modules/.vite/deps/date-fns.js`` in ``raw_report.md``).  The
+preview target serves the hashed, minified bundle customers get instead.
+
+:func:`build` runs ``vite build`` into ``tmp/preview_dist`` and skips it
+when the build inputs hash the same as last time (``tmp/preview_build.json``).
+:class:`PreviewServer` runs ``vite preview`` on the port of
+``config.json``'s ``localEndpoint``, so the TC scripts' hard-coded URLs
+and :mod:`harness.auth` reach the bundle unchanged; the dev server has to
+be stopped first.
+
+The runner then makes two passes.  The cold pass is the normal run: every
+context starts with an empty HTTP cache.  In the warm pass each context
+loads the app once (:func:`prime`), like a returning visitor, before the
+test starts; the priming is not counted in the test's duration.  It
+records no HARs and writes its step spans to ``tmp/spans/warm``, so
+neither mixes with the cold pass's.  Per-TC durations of both passes go
+to ``tmp/preview_timings.json``.  Playwright
+disables the HTTP cache of a context that routes requests, so with
+``--supabase standin`` or ``--har replay`` the warm pass would repeat the
+cold one and is skipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import shutil
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Sequence
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext
+
+from . import impact
+from .config import TMP_DIR, base_url
+
+DIST_DIR = TMP_DIR / "preview_dist"
+BUILD_STAMP_PATH = TMP_DIR / "preview_build.json"
+TIMINGS_PATH = TMP_DIR / "preview_timings.json"
+SERVER_LOG_PATH = TMP_DIR / "preview_server.log"
+
+TARGETS = ("dev", "preview")
+
+START_TIMEOUT_S = 30.0
+
+
+def _npx() -> str:
+    # On Windows the launcher is npx.cmd, which subprocess does not find by bare name.
+    return shutil.which("npx") or "npx"
+
+
+def build_inputs() -> list[Path]:
+    """Everything ``vite build`` reads: ``src/`` and the global build files (not the harness)."""
+    paths = {
+        p
+        for pattern in impact.GLOBAL_PATTERNS
+        if not pattern.startswith(impact.SUITE_PREFIX)
+        for p in impact.REPO_DIR.glob(pattern)
+        if p.is_file()
+    }
+    paths.update(p for p in (impact.REPO_DIR / "src").rglob("*") if p.is_file())
+    return sorted(paths)
+
+
+def inputs_hash(paths: Sequence[Path]) -> str:
+    sha = hashlib.sha256()
+    for path in paths:
+        sha.update(path.relative_to(impact.REPO_DIR).as_posix().encode() + b"\0")
+        sha.update(path.read_bytes())
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+
+@dataclass
+class Build:
+    hash: str
+    seconds: float
+    files: int
+    bytes: int
+    # Served from an earlier build with the same inputs
+    reused: bool = False
+
+
+def build(rebuild: bool = False, out_dir: Path = DIST_DIR, stamp_path: Path = BUILD_STAMP_PATH) -> Build:
+    """Build the app into ``out_dir`` unless the last build had the same inputs."""
+    digest = inputs_hash(build_inputs())
+    if not rebuild and (out_dir / "index.html").exists() and stamp_path.exists():
+        stamp = json.loads(stamp_path.read_text(encoding="utf-8"))
+        if stamp["hash"] == digest:
+            return Build(**{**stamp, "reused": True})
+    started = time.perf_counter()
+    subprocess.run([_npx(), "vite", "build", "--outDir", str(out_dir), "--emptyOutDir"], cwd=impact.REPO_DIR, check=True)
+    files = [p for p in out_dir.rglob("*") if p.is_file()]
+    result = Build(digest, round(time.perf_counter() - started, 1), len(files), sum(p.stat().st_size for p in files))
+    stamp_path.parent.mkdir(parents=True, exist_ok=True)
+    stamp = asdict(result)
+    del stamp["reused"]
+    stamp_path.write_text(json.dumps(stamp, indent=2), encoding="utf-8")
+    return result
+
+
+def _answers(url: str) -> bool:
+    try:
+        with urllib.request.urlopen(url, timeout=1):
+            return True
+    except urllib.error.HTTPError:
+        return True
+    except OSError:
+        return False
+
+
+class PreviewServer:
+    """``vite preview`` of ``out_dir`` as a subprocess, on the port of ``url``."""
+
+    def __init__(self, url: str | None = None, out_dir: Path = DIST_DIR, log_path: Path = SERVER_LOG_PATH):
+        self.url = (url or base_url()).rstrip("/")
+        self.out_dir = out_dir
+        self.log_path = log_path
+        self._process: subprocess.Popen | None = None
+
+    def start(self) -> "PreviewServer":
+        if _answers(self.url):
+            raise RuntimeError(f"{self.url} is already serving (the dev server?); stop it so the preview can take its port")
+        port = urlsplit(self.url).port or 80
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.log_path.open("w", encoding="utf-8") as log:
+            # The host comes from vite.config.ts (preview.host defaults to server.host).
+            self._process = subprocess.Popen(
+                [_npx(), "vite", "preview", "--outDir", str(self.out_dir), "--port", str(port), "--strictPort"],
+                cwd=impact.REPO_DIR,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        deadline = time.monotonic() + START_TIMEOUT_S
+        while not _answers(self.url):
+            if self._process.poll() is not None or time.monotonic() > deadline:
+                self.stop()
+                raise RuntimeError(f"vite preview did not come up on {self.url}; see {self.log_path}")
+            time.sleep(0.2)
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def stop(self) -> None:
+        if self._process is None:
+            return
+        self._process.terminate()
+        try:
+            self._process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._process = None
+
+    def __enter__(self) -> "PreviewServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+async def prime(context: BrowserContext, url: str | None = None) -> None:
+    """Load the app once in ``context`` so its bundle is in the context's HTTP cache."""
+    page = await context.new_page()
+    try:
+        await page.goto(url or base_url(), wait_until="load", timeout=30000)
+    finally:
+        await page.close()
+
+
+def write_timings(build_info: Build, cold: Sequence[Any], warm: Sequence[Any], path: Path = TIMINGS_PATH) -> dict[str, Any]:
+    """Per-TC durations of the cold and warm passes (``runner.TestResult`` lists)."""
+    warm_by_id = {r.test_id: r for r in warm}
+    tests = []
+    for result in cold:
+        other = warm_by_id.get(result.test_id)
+        tests.append({
+            "testId": result.test_id,
+            "cold_ms": result.duration_ms,
+            "cold_status": result.status,
+            "warm_ms": other.duration_ms if other else None,
+            "warm_status": other.status if other else None,
+        })
+    report = {
+        "build": asdict(build_info),
+        "passes": {
+            name: {"total_ms": sum(r.duration_ms for r in results), "passed": sum(r.passed for r in results), "tests": len(results)}
+            for name, results in (("cold", cold), ("warm", warm))
+            if results
+        },
+        "tests": tests,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return report
+
+
+def print_timings(report: dict[str, Any]) -> None:
+    print(f"{'test':<8}{'cold ms':>9}{'warm ms':>9}{'saved':>8}")
+    for test in report["tests"]:
+        warm = test["warm_ms"]
+        saved = f"{1 - warm / test['cold_ms']:>8.0%}" if warm is not None and test["cold_ms"] else f"{'-':>8}"
+        warm_cell = f"{warm:>9,}" if warm is not None else f"{'-':>9}"
+        print(f"{test['testId']:<8}{test['cold_ms']:>9,}{warm_cell}{saved}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.preview", description=__doc__.splitlines()[0])
+    parser.add_argument("--rebuild", action="store_true", help="build even if the inputs are unchanged")
+    args = parser.parse_args(argv)
+    result = build(args.rebuild)
+    print(f"build {'reused' if result.reused else f'took {result.seconds} s'}: {result.files} files, {result.bytes / 2**20:.1f} MB")
+    with PreviewServer() as server:
+        print(f"serving {DIST_DIR} on {server.url} (Ctrl-C to stop)", flush=True)
+        try:
+            while server.running:
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
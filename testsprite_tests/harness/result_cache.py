@@ -0,0 +1,210 @@
+"""Content-addressed cache of test results.
+
+    python -m harness --cache on           # reuse results whose inputs are unchanged (default)
+    python -m harness --cache refresh      # rerun everything, store the new results
+    python -m harness.result_cache         # list entries, --prune drops expired ones
+
+A test's key hashes everything its outcome depends on that lives in this
+repo: the TC script, the harness, the build inputs (``package.json``,
+lockfiles, Vite/Tailwind config), the ``src/`` modules and edge
+functions :mod:`harness.impact` recorded it exercising (all of them for
+tests not in the map), and its fixtures - ``config.json``, the stand-in
+seed, the HAR it replays - plus the run mode.  An entry stores the
+``run_results.json`` record and copies of the test's artifacts under
+``tmp/result_cache/<key>/``.
+
+What the key cannot see - the remote Supabase project, the OpenAI and
+Evolution services, the date - is what the TTL is for: entries older
+than ``--cache-ttl`` hours are ignored, so environment drift is noticed
+within a working day at most.  Only passing results are stored: a
+failure may come from exactly that environment, so it is always rerun.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+from . import impact
+from .config import CONFIG_PATH, SUITE_DIR, TMP_DIR
+
+CACHE_DIR = TMP_DIR / "result_cache"
+
+MODES = ("off", "on", "refresh")
+
+DEFAULT_TTL_HOURS = 12.0
+
+HARNESS_DIR = SUITE_DIR / "harness"
+SRC_DIR = impact.REPO_DIR / "src"
+FUNCTIONS_DIR = impact.REPO_DIR / "supabase" / "functions"
+
+
+def _files(root: Path) -> list[Path]:
+    return sorted(p for p in root.rglob("*") if p.is_file() and "__pycache__" not in p.parts)
+
+
+def _build_inputs() -> list[Path]:
+    """Files that affect every test (see ``impact.GLOBAL_PATTERNS``), harness sources included."""
+    paths = {p for pattern in impact.GLOBAL_PATTERNS for p in impact.REPO_DIR.glob(pattern) if p.is_file()}
+    paths.update(p for p in _files(HARNESS_DIR) if p.suffix == ".py")
+    return sorted(paths)
+
+
+def _app_inputs(coverage: impact.Coverage | None) -> list[Path]:
+    """The ``src/`` modules and edge functions a test exercised, or all of them when unknown."""
+    if coverage is None:
+        return _files(SRC_DIR) + _files(FUNCTIONS_DIR)
+    paths = [impact.REPO_DIR / module for module in sorted(coverage.modules)]
+    if coverage.functions:
+        paths += _files(FUNCTIONS_DIR / "shared")
+        for function_dir in sorted({p.parent for p in FUNCTIONS_DIR.rglob("index.ts")}):
+            name = function_dir.relative_to(FUNCTIONS_DIR).as_posix()
+            if any(impact.function_matches(name, invoked) for invoked in coverage.functions):
+                paths += _files(function_dir)
+    return paths
+
+
+def _digest(paths: Iterable[Path], extra: dict[str, Any]) -> str:
+    sha = hashlib.sha256(json.dumps(extra, sort_keys=True).encode())
+    for path in paths:
+        path = path.resolve()
+        label = path.relative_to(impact.REPO_DIR).as_posix() if path.is_relative_to(impact.REPO_DIR) else path.name
+        sha.update(label.encode() + b"\0")
+        # A module deleted since the map was recorded still changes the key.
+        sha.update(path.read_bytes() if path.exists() else b"<missing>")
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+
+@dataclass
+class Entry:
+    key: str
+    record: dict[str, Any]
+    stored: float
+
+    @property
+    def age_hours(self) -> float:
+        return (time.time() - self.stored) / 3600
+
+
+class ResultCache:
+    """Looks up and stores run results by input hash."""
+
+    def __init__(self, directory: Path = CACHE_DIR, ttl_hours: float = DEFAULT_TTL_HOURS, mode: str = "on"):
+        if mode not in MODES:
+            raise ValueError(f"cache mode must be one of {MODES}")
+        self.directory = directory
+        self.ttl_hours = ttl_hours
+        self.mode = mode
+        self.impact_map = impact.load_map()
+        self._build_inputs = _build_inputs()
+        self.hits: list[str] = []
+        self.misses: list[str] = []
+        self.expired: list[str] = []
+
+    def key(self, test_id: str, script: Path, fixtures: Iterable[Path] = (), mode: dict[str, Any] | None = None) -> str:
+        """Hash of ``test_id``'s script, build and app inputs, fixture files and run mode."""
+        paths = [script, *self._build_inputs, *_app_inputs(self.impact_map.get(test_id)), *sorted(fixtures)]
+        return _digest(paths, {"test": test_id, **(mode or {})})
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key / "result.json"
+
+    def get(self, test_id: str, key: str) -> Entry | None:
+        """The fresh entry for ``key``; counts the lookup as a hit, miss or expiry."""
+        path = self._entry_path(key)
+        if self.mode != "on" or not path.exists():
+            self.misses.append(test_id)
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        entry = Entry(key, data["result"], data["stored"])
+        # Entries written before failures stopped being stored.
+        if entry.record["testStatus"] != "PASSED":
+            self.misses.append(test_id)
+            return None
+        if entry.age_hours > self.ttl_hours:
+            self.expired.append(test_id)
+            self.misses.append(test_id)
+            return None
+        self.hits.append(test_id)
+        return entry
+
+    def put(self, key: str, record: dict[str, Any]) -> None:
+        """Store a passing ``record``, copying its artifacts into the entry so later runs cannot overwrite them.
+
+        A failing one only drops what was stored under ``key`` before.
+        """
+        if self.mode == "off":
+            return
+        entry_dir = self.directory / key
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        if record["testStatus"] != "PASSED":
+            return
+        entry_dir.mkdir(parents=True)
+        copies: dict[str, Path] = {}
+        for artifact in record.get("artifacts", []):
+            source = Path(artifact)
+            target = entry_dir / source.name
+            if source.is_file():
+                shutil.copy2(source, target)
+            elif source.is_dir():
+                # e.g. the JPEG frames of an on-failure video that could not be encoded
+                shutil.copytree(source, target)
+            else:
+                continue
+            copies[artifact] = target
+        # The video is also the visualization; point it at the copy, not the file the next run overwrites.
+        visualization = record.get("testVisualization", "")
+        if visualization:
+            visualization = str(copies.get(visualization, ""))
+        result = {**record, "artifacts": [str(target) for target in copies.values()], "testVisualization": visualization}
+        data = {"stored": time.time(), "result": result}
+        self._entry_path(key).write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    def summary(self) -> str:
+        expired = f" ({len(self.expired)} expired)" if self.expired else ""
+        return f"result cache: {len(self.hits)} hits, {len(self.misses)} misses{expired}"
+
+
+def fixture_files(har_mode: str, test_id: str, seed: Path | None = None) -> list[Path]:
+    """Data files a test's outcome depends on besides code."""
+    from .har import har_paths
+
+    files = [CONFIG_PATH]
+    if seed is not None:
+        files.append(seed)
+    if har_mode == "replay":
+        files.extend(har_paths(test_id))
+    return files
+
+
+def entries(directory: Path = CACHE_DIR) -> list[Entry]:
+    found = []
+    for path in sorted(directory.glob("*/result.json")):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        found.append(Entry(path.parent.name, data["result"], data["stored"]))
+    return found
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.result_cache", description=__doc__.splitlines()[0])
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL_HOURS, help="hours an entry stays valid")
+    parser.add_argument("--prune", action="store_true", help="delete expired entries")
+    args = parser.parse_args(argv)
+    for entry in sorted(entries(), key=lambda e: (e.record["testId"], e.stored)):
+        expired = entry.age_hours > args.ttl
+        print(f"{entry.record['testId']:<7}{entry.record['testStatus']:<8}{entry.age_hours:6.1f} h  {entry.key[:12]}{'  expired' if expired else ''}")
+        if expired and args.prune:
+            shutil.rmtree(CACHE_DIR / entry.key)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
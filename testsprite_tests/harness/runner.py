@@ -0,0 +1,524 @@
+"""Run the TC scripts against a shared browser pool.
+
+Tests run concurrently as separate contexts in one event loop
+(``--workers``) and can additionally be split into duration-balanced
+shards, one worker process per shard (``--processes``).  With
+``--supabase standin`` every context talks to a seeded local Supabase
+stand-in instead of the remote project.  ``--target preview`` runs the
+suite against the production bundle, cold-cache and warm-cache (see
+:mod:`harness.preview`); against the dev server, the workers wait until
+it answers and has pre-bundled its dependencies (:mod:`harness.warmup`).
+Test-plan entries without a script run compiled from the plan
+(``--plan``, see :mod:`harness.compiler`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import json
+import os
+import re
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+from . import capture, compiler, har, impact, preview, result_cache, spans, warmup
+from .auth import STATE_PATH, StorageStateCache
+from .config import RUN_RESULTS_PATH, SUITE_DIR
+from .pool import BrowserPool, ContextHook, share_with_siblings
+from .shards import estimate, load_durations, longest_first, makespan, pack_shards
+from .standins.supabase import SupabaseStandin, load_seed, redirect_supabase
+
+TC_PATTERN = re.compile(r"^(TC\d{3})_(.+)\.py$")
+
+
+@dataclass
+class TestCase:
+    test_id: str
+    path: Path
+
+    @property
+    def name(self) -> str:
+        return self.path.stem
+
+    @property
+    def title(self) -> str:
+        """Title in the ``TC003-User Login with ...`` form of ``test_results.json``."""
+        return f"{self.test_id}-{self.name.split('_', 1)[1].replace('_', ' ')}"
+
+
+@dataclass
+class TestResult:
+    test_id: str
+    title: str
+    status: str
+    error: str = ""
+    duration_ms: int = 0
+    warnings: list[str] = field(default_factory=list)
+    # Files the test left behind (reports, recordings), kept with cached results
+    artifacts: list[str] = field(default_factory=list)
+    # Reused from the result cache instead of run
+    cached: bool = False
+    # Video of the run, when one was kept (see harness.capture)
+    visualization: str = ""
+
+    @property
+    def passed(self) -> bool:
+        return self.status == "PASSED"
+
+    @classmethod
+    def from_dict(cls, record: dict[str, Any]) -> "TestResult":
+        return cls(
+            record["testId"],
+            record["title"],
+            record["testStatus"],
+            record.get("testError", ""),
+            record.get("durationMs", 0),
+            record.get("warnings", []),
+            record.get("artifacts", []),
+            record.get("cached", False),
+            record.get("testVisualization", ""),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "testId": self.test_id,
+            "title": self.title,
+            "testStatus": self.status,
+            "testError": self.error,
+            "durationMs": self.duration_ms,
+            "warnings": self.warnings,
+            "artifacts": self.artifacts,
+            "cached": self.cached,
+            "testVisualization": self.visualization,
+        }
+
+
+def discover_tests(suite_dir: Path = SUITE_DIR, selected: list[str] | None = None) -> list[TestCase]:
+    """Find the ``TCxxx_*.py`` scripts, optionally limited to ``selected`` ids."""
+    wanted = {s.upper() for s in selected} if selected else None
+    cases = []
+    for path in sorted(suite_dir.glob("TC*.py")):
+        match = TC_PATTERN.match(path.name)
+        if not match:
+            continue
+        if wanted is not None and match.group(1) not in wanted:
+            continue
+        cases.append(TestCase(test_id=match.group(1), path=path))
+    return cases
+
+
+PLAN_MODES = ("off", "missing", "all")
+
+
+def plan_tests(scripts: list[TestCase], mode: str = "missing", selected: list[str] | None = None) -> list[TestCase]:
+    """Add TCs compiled from the test plan: for plan entries without a script, or instead of every script."""
+    if mode == "off":
+        return scripts
+    compiled = [TestCase(c.test_id, c.path) for c in compiler.compile_plan(selected)]
+    if mode == "all":
+        return compiled
+    have = {case.test_id for case in scripts}
+    return sorted(scripts + [case for case in compiled if case.test_id not in have], key=lambda case: case.test_id)
+
+
+def load_test(case: TestCase) -> ModuleType:
+    """Import a TC script as a module without running it."""
+    spec = importlib.util.spec_from_file_location(case.name, case.path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"cannot load {case.path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@dataclass
+class RunSettings:
+    """Everything a run (or one shard of it) needs; picklable for worker processes."""
+
+    pool_size: int = 1
+    headless: bool = True
+    workers: int = 1
+    processes: int = 1
+    shared_login: bool = True
+    # Base URL of a Supabase stand-in that replaces the remote project
+    supabase_standin: str | None = None
+    # One of har.MODES
+    har_mode: str = "off"
+    # JSONL file the step spans of this run go to (None disables them)
+    spans_path: str | None = None
+    # Record what each passing test exercises for harness.impact
+    record_impact: bool = False
+    # One of capture.MODES each
+    video: str = "off"
+    trace: str = "off"
+    # Load the app once in each context before the test, outside its duration (harness.preview)
+    warm_cache: bool = False
+
+    def storage_state_path(self) -> Path:
+        # Sessions issued by the stand-in are worthless against the real project and vice versa.
+        return STATE_PATH.with_name("storage_state.standin.json") if self.supabase_standin else STATE_PATH
+
+
+async def start_pool(settings: RunSettings) -> BrowserPool:
+    pool = BrowserPool(size=settings.pool_size, headless=settings.headless)
+    if settings.supabase_standin:
+        standin = settings.supabase_standin
+        pool.add_context_hook(lambda context: redirect_supabase(context, standin))
+    return await pool.start()
+
+
+async def run_case(
+    pool: BrowserPool,
+    case: TestCase,
+    settings: RunSettings,
+    auth_cache: StorageStateCache | None = None,
+    span_writer: spans.SpanWriter | None = None,
+) -> TestResult:
+    """Run one TC in a fresh context borrowed from ``pool``.
+
+    Tests declaring ``SHARED_LOGIN = True`` start with the run's cached
+    Supabase session when ``auth_cache`` is given.  With ``span_writer``
+    every step of the test is timed (see :mod:`harness.spans`).  With
+    ``settings.record_impact`` a passing test leaves its coverage fragment
+    for :mod:`harness.impact`.  Videos and traces are kept according to
+    ``settings.video``/``settings.trace`` (see :mod:`harness.capture`).
+    With ``settings.warm_cache`` the context first loads the app once.
+    Contexts the test opens next to its own (:meth:`BrowserPool.sibling`)
+    get the same HAR recording or replay, step timing and coverage.
+    """
+    started = time.perf_counter()
+    primed_s = 0.0
+    status, error, warnings, artifacts = "PASSED", "", [], []
+    replay = har.HarReplay(case.test_id) if settings.har_mode == "replay" else None
+    recorder = impact.CoverageRecorder(case.test_id) if settings.record_impact else None
+    recording = capture.Capture(case.test_id, settings.video, settings.trace)
+
+    def sibling_setup(name: str) -> tuple[dict[str, Any], ContextHook]:
+        options = har.record_options(case.test_id, part=name) if settings.har_mode == "record" else {}
+
+        async def hook(sibling) -> None:
+            if trace is not None:
+                trace.watch(sibling)
+            if replay is not None:
+                await replay.attach(sibling, part=name)
+            if recorder is not None:
+                recorder.watch(sibling)
+
+        return options, hook
+
+    try:
+        with spans.test_scope(case.test_id, span_writer) as trace:
+            module = load_test(case)
+            options = {}
+            if settings.har_mode == "record":
+                options.update(har.record_options(case.test_id))
+            if auth_cache is not None and getattr(module, "SHARED_LOGIN", False):
+                options["storage_state"] = await auth_cache.get(pool)
+            options.update(recording.context_options())
+            async with pool.context(**options) as context:
+                if settings.warm_cache:
+                    priming = time.perf_counter()
+                    await preview.prime(context)
+                    primed_s = time.perf_counter() - priming
+                if trace is not None:
+                    trace.watch(context)
+                if replay is not None:
+                    await replay.attach(context)
+                if recorder is not None:
+                    recorder.watch(context)
+                share_with_siblings(context, sibling_setup)
+                if recording.enabled:
+                    await recording.start(context)
+                failed = True
+                try:
+                    await module.run_test(context)
+                    failed = False
+                finally:
+                    if recording.enabled:
+                        artifacts.extend(await recording.finish(context, failed))
+        if recorder is not None:
+            # A failed test may have stopped before reaching some modules; keep its old entry.
+            recorder.write_fragment()
+    except Exception as exc:
+        status = "FAILED"
+        error = f"{type(exc).__name__}: {exc}\n{traceback.format_exc()}"
+    finally:
+        if replay is not None:
+            replay.write_report()
+            if replay.unmatched:
+                warnings.append(f"{len(replay.unmatched)} requests missing from {replay.path.name}; re-record it")
+                artifacts.append(str(replay.report_path))
+        artifacts.extend(await recording.close())
+    duration_ms = int((time.perf_counter() - started - primed_s) * 1000)
+    visualization = str(recording.video_path or "")
+    return TestResult(case.test_id, case.title, status, error, duration_ms, warnings, artifacts, visualization=visualization)
+
+
+async def run_suite(
+    cases: list[TestCase], settings: RunSettings, durations: dict[str, int] | None = None
+) -> list[TestResult]:
+    """Run ``cases`` on a warm browser pool, ``settings.workers`` at a time.
+
+    Tests are queued longest first so the slow ones start immediately and
+    the short ones fill the gaps, which keeps the run close to the duration
+    of the slowest test.
+    """
+    durations = load_durations() if durations is None else durations
+    queue: asyncio.Queue[TestCase] = asyncio.Queue()
+    for case in longest_first(cases, durations):
+        queue.put_nowait(case)
+    results: dict[str, TestResult] = {}
+    auth_cache = StorageStateCache(settings.storage_state_path(), replay=settings.har_mode == "replay") if settings.shared_login else None
+    span_writer = None
+    if settings.spans_path:
+        spans.instrument()
+        span_writer = spans.SpanWriter(Path(settings.spans_path))
+
+    async def worker(pool: BrowserPool) -> None:
+        while not queue.empty():
+            case = queue.get_nowait()
+            result = await run_case(pool, case, settings, auth_cache, span_writer)
+            print(f"{result.status:<7} {case.test_id} ({result.duration_ms} ms)", flush=True)
+            for warning in result.warnings:
+                print(f"        warning: {warning}", flush=True)
+            results[case.test_id] = result
+
+    pool = await start_pool(settings)
+    try:
+        await asyncio.gather(*(worker(pool) for _ in range(max(1, min(settings.workers, len(cases))))))
+    finally:
+        await pool.stop()
+    return [results[case.test_id] for case in cases]
+
+
+def _run_shard(shard: list[tuple[str, str]], settings: RunSettings, durations: dict[str, int]) -> list[dict[str, Any]]:
+    """Process-pool entry point: run one shard of (test id, script path) and return plain dicts."""
+    cases = [TestCase(test_id, Path(path)) for test_id, path in shard]
+    results = asyncio.run(run_suite(cases, settings, durations))
+    return [r.to_dict() for r in results]
+
+
+def run_sharded(cases: list[TestCase], settings: RunSettings) -> list[TestResult]:
+    """Pack ``cases`` into ``settings.processes`` shards by past duration and run them in parallel.
+
+    The shared login state is cached on disk, so the first shard that needs
+    it logs in and the others pick it up (or log in themselves if they race).
+    """
+    durations = load_durations()
+    shards = pack_shards(cases, settings.processes, durations)
+    serial = sum(estimate(case.test_id, durations) for case in cases)
+    print(f"{len(shards)} shards, planned {makespan(shards, durations) / 1000:.0f}s (serial {serial / 1000:.0f}s)", flush=True)
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [
+            executor.submit(_run_shard, [(case.test_id, str(case.path)) for case in shard], settings, durations)
+            for shard in shards
+        ]
+        by_id = {
+            record["testId"]: TestResult.from_dict(record)
+            for future in futures
+            for record in future.result()
+        }
+    return [by_id[case.test_id] for case in cases]
+
+
+def run(cases: list[TestCase], settings: RunSettings) -> list[TestResult]:
+    """Run ``cases`` in-process or sharded, depending on ``settings.processes``."""
+    if settings.processes > 1:
+        return run_sharded(cases, settings)
+    return asyncio.run(run_suite(cases, settings))
+
+
+def write_results(results: list[TestResult], path: Path = RUN_RESULTS_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as fh:
+        json.dump([r.to_dict() for r in results], fh, indent=2, ensure_ascii=False)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m harness", description=__doc__)
+    parser.add_argument("tests", nargs="*", help="TC ids to run (default: all)")
+    parser.add_argument("--pool-size", type=int, default=1, help="number of warm browsers")
+    parser.add_argument("--headed", action="store_true", help="show the browser windows")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="tests running at once per process (default: CPU count)"
+    )
+    parser.add_argument(
+        "--processes", type=int, default=1, help="split the run into this many duration-balanced shard processes"
+    )
+    parser.add_argument(
+        "--no-shared-login", action="store_true", help="make every test log in through the UI itself"
+    )
+    parser.add_argument(
+        "--supabase",
+        choices=["remote", "standin"],
+        default="remote",
+        help="'standin' serves Supabase REST/auth from a seeded local server instead of the project",
+    )
+    parser.add_argument("--supabase-seed", type=Path, help="JSON seed for the stand-in (default: built-in tenant)")
+    parser.add_argument(
+        "--har",
+        choices=har.MODES,
+        default="off",
+        help="'record' saves each test's traffic to tmp/har, 'replay' serves it back without network",
+    )
+    parser.add_argument("--no-spans", action="store_true", help="do not time individual steps (tmp/spans)")
+    parser.add_argument(
+        "--video",
+        choices=capture.MODES,
+        default="off",
+        help="keep a video of each test; 'on-failure' buffers the last seconds and encodes only failures",
+    )
+    parser.add_argument(
+        "--trace", choices=capture.MODES, default="off", help="keep a Playwright trace of each test (tmp/artifacts)"
+    )
+    parser.add_argument(
+        "--plan",
+        choices=PLAN_MODES,
+        default="missing",
+        help="run TCs compiled from the test plan: for entries without a script (default) or for all of them",
+    )
+    parser.add_argument(
+        "--target",
+        choices=preview.TARGETS,
+        default="dev",
+        help="'preview' builds the app and runs against vite preview on the same port, cold- and warm-cache",
+    )
+    parser.add_argument("--rebuild", action="store_true", help="with --target preview, build even if the inputs are unchanged")
+    parser.add_argument(
+        "--no-warmup", action="store_true", help="start the tests without waiting for the dev server to warm up"
+    )
+    parser.add_argument(
+        "--record-impact", action="store_true", help="update impact_map.json with what each passing test exercises"
+    )
+    parser.add_argument(
+        "--cache",
+        choices=result_cache.MODES,
+        default="on",
+        help="reuse results of tests whose inputs are unchanged; 'refresh' reruns and re-stores them",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=result_cache.DEFAULT_TTL_HOURS,
+        help="hours a cached result stays valid (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--changed-since", metavar="REF", help="run only the TCs affected by changes since git REF (see harness.impact)"
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.record_impact and args.target == "preview":
+        # The bundle loads from /assets/, so every test would record that it exercises no src/ module.
+        parser.error("--record-impact needs the dev server; it cannot map the production bundle back to src/")
+    cases = plan_tests(discover_tests(selected=args.tests), args.plan, args.tests)
+    if not cases:
+        print("no TC scripts matched")
+        return 1
+    if args.changed_since:
+        selection = impact.affected(
+            impact.changed_files(args.changed_since),
+            impact.load_map(),
+            [case.test_id for case in cases],
+            since=args.changed_since,
+        )
+        skipped = len(cases) - len(selection)
+        cases = [case for case in cases if case.test_id in selection]
+        print(f"{len(cases)} TCs affected by changes since {args.changed_since}, {skipped} skipped", flush=True)
+        if not cases:
+            return 0
+    settings = RunSettings(
+        pool_size=args.pool_size,
+        headless=not args.headed,
+        workers=args.workers,
+        processes=args.processes,
+        shared_login=not args.no_shared_login,
+        har_mode=args.har,
+        spans_path=None if args.no_spans else str(spans.new_trace_path()),
+        record_impact=args.record_impact,
+        video=args.video,
+        trace=args.trace,
+    )
+    cache, keys, cached = None, {}, {}
+    # Recording runs exist for their side effects, so they always execute.
+    if args.cache != "off" and args.har != "record" and not args.record_impact:
+        cache = result_cache.ResultCache(ttl_hours=args.cache_ttl, mode=args.cache)
+        mode = {
+            "supabase": args.supabase,
+            "har": args.har,
+            "shared_login": settings.shared_login,
+            "video": args.video,
+            "trace": args.trace,
+            "target": args.target,
+        }
+        for case in cases:
+            fixtures = result_cache.fixture_files(args.har, case.test_id, args.supabase_seed)
+            keys[case.test_id] = cache.key(case.test_id, case.path, fixtures, mode)
+            entry = cache.get(case.test_id, keys[case.test_id])
+            if entry is not None:
+                cached[case.test_id] = replace(TestResult.from_dict(entry.record), cached=True)
+                print(f"CACHED  {case.test_id} {entry.record['testStatus']} ({entry.age_hours:.1f} h old)", flush=True)
+    to_run = [case for case in cases if case.test_id not in cached]
+    fresh: list[TestResult] = []
+    if to_run:
+        with contextlib.ExitStack() as stack:
+            if args.supabase == "standin":
+                seed = load_seed(args.supabase_seed) if args.supabase_seed else None
+                settings.supabase_standin = stack.enter_context(SupabaseStandin(seed=seed)).url
+            if args.target == "preview":
+                build = preview.build(args.rebuild)
+                print(f"build {'reused' if build.reused else f'took {build.seconds} s'}: {build.files} files", flush=True)
+                stack.enter_context(preview.PreviewServer())
+            # A HAR replay serves the app itself; the preview server is waited for when it starts.
+            elif args.har != "replay" and not args.no_warmup:
+                try:
+                    warmed = asyncio.run(warmup.warm_up(headless=settings.headless, supabase_standin=settings.supabase_standin))
+                except TimeoutError as exc:
+                    print(exc)
+                    return 1
+                warmup.write_report(warmed)
+                print(warmup.summary(warmed), flush=True)
+            fresh = run(to_run, settings)
+            if args.target == "preview":
+                warm: list[TestResult] = []
+                # Routing turns the context's HTTP cache off, so a warm pass would be another cold one.
+                if settings.supabase_standin or args.har == "replay":
+                    print("warm-cache pass skipped: request routing disables the HTTP cache", flush=True)
+                else:
+                    print("warm-cache pass", flush=True)
+                    # Recording would overwrite the cold pass's HARs, and mixed spans would blur both passes' medians.
+                    warm_spans = None
+                    if settings.spans_path:
+                        cold_spans = Path(settings.spans_path)
+                        warm_spans = str(cold_spans.parent / "warm" / cold_spans.name)
+                    warm = run(to_run, replace(settings, warm_cache=True, video="off", trace="off", har_mode="off", spans_path=warm_spans))
+                    if warm_spans:
+                        print(f"warm-pass step timings: {warm_spans}")
+                preview.print_timings(preview.write_timings(build, fresh, warm))
+                print(f"cold/warm timings: {preview.TIMINGS_PATH}")
+    if cache is not None:
+        for result in fresh:
+            cache.put(keys[result.test_id], result.to_dict())
+        print(cache.summary())
+    by_id = {**cached, **{result.test_id: result for result in fresh}}
+    results = [by_id[case.test_id] for case in cases]
+    write_results(results)
+    if settings.record_impact:
+        updated = impact.merge_fragments()
+        print(f"impact map updated for {len(updated)} TCs: {impact.IMPACT_MAP_PATH.name}")
+    failed = sum(not r.passed for r in results)
+    print(f"{len(results) - failed} passed, {failed} failed")
+    if settings.spans_path:
+        print(f"step timings: {settings.spans_path} (python -m harness.spans)")
+    return 1 if failed else 0
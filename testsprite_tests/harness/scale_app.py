@@ -0,0 +1,118 @@
+"""The app against a stand-in seeded at scale, for the benchmarks.
+
+:class:`ScaleApp` starts a :class:`SupabaseStandin`, fills it with
+:mod:`harness.seeder` data, launches one pooled browser whose contexts
+talk to the stand-in, and hands out pages already logged in as the
+``config.json`` user, who owns the heaviest seeded tenant::
+
+    async with ScaleApp(Scale(organizations=1, messages=100_000)) as app:
+        page = await app.new_page()
+        await page.goto(f"{app.url}/reports")
+
+:class:`HeapSampler` polls Chromium's ``Performance.getMetrics`` to find
+the JS heap peak of a page while something runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from typing import Any
+
+from playwright.async_api import BrowserContext, Page
+
+from . import auth, waits
+from .config import base_url
+from .pool import BrowserPool
+from .seeder import Scale, seed_standin
+from .standins.supabase import SupabaseStandin, redirect_supabase
+
+
+class ScaleApp:
+    """A seeded stand-in plus a browser pointed at it."""
+
+    def __init__(self, scale: Scale, headless: bool = True, latency_ms: float = 0, max_rows: int | None = None):
+        self.scale = scale
+        self.headless = headless
+        self.standin = SupabaseStandin(seed={}, latency_ms=latency_ms, max_rows=max_rows)
+        self.pool = BrowserPool(size=1, headless=headless)
+        self.url = base_url()
+        self.seed_report: dict[str, Any] = {}
+        self._contexts = contextlib.AsyncExitStack()
+
+    async def start(self) -> "ScaleApp":
+        # Seeding a million rows takes seconds of pure Python; keep the loop responsive.
+        self.seed_report = await asyncio.to_thread(seed_standin, self.standin, self.scale)
+        self.standin.start()
+        self.pool.add_context_hook(lambda context: redirect_supabase(context, self.standin.url))
+        await self.pool.start()
+        return self
+
+    async def stop(self) -> None:
+        await self._contexts.aclose()
+        await self.pool.stop()
+        self.standin.stop()
+
+    async def __aenter__(self) -> "ScaleApp":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    async def new_context(self, **options: Any) -> BrowserContext:
+        """A context that lives until :meth:`stop`."""
+        context = await self._contexts.enter_async_context(self.pool.context(**options))
+        waits.track(context)
+        return context
+
+    async def new_page(self, **options: Any) -> Page:
+        """A logged-in page on the dashboard, in a context of its own."""
+        context = await self.new_context(**options)
+        page = await context.new_page()
+        await auth.login(page)
+        return page
+
+
+class HeapSampler:
+    """Samples a page's JS heap every ``interval_s`` until stopped."""
+
+    def __init__(self, page: Page, interval_s: float = 0.05):
+        self.page = page
+        self.interval_s = interval_s
+        self.samples: list[int] = []
+        self._session: Any = None
+        self._task: asyncio.Task | None = None
+
+    async def _used(self) -> int:
+        metrics = (await self._session.send("Performance.getMetrics"))["metrics"]
+        return int(next(m["value"] for m in metrics if m["name"] == "JSHeapUsedSize"))
+
+    async def baseline(self) -> int:
+        """Heap in use after a full GC, before the measured work starts."""
+        if self._session is None:
+            self._session = await self.page.context.new_cdp_session(self.page)
+            await self._session.send("Performance.enable")
+        await self._session.send("HeapProfiler.collectGarbage")
+        return await self._used()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.samples.append(await self._used())
+            except Exception:
+                return  # the page crashed or closed
+            await asyncio.sleep(self.interval_s)
+
+    async def start(self) -> int:
+        baseline = await self.baseline()
+        self.samples = [baseline]
+        self._task = asyncio.ensure_future(self._run())
+        return baseline
+
+    async def stop(self) -> int:
+        """Stop sampling and return the peak in bytes."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        return max(self.samples, default=0)
@@ -0,0 +1,98 @@
+"""Per-test durations from past runs and longest-first shard packing."""
+
+from __future__ import annotations
+
+import heapq
+import json
+import operator
+import re
+import statistics
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Sequence, TypeVar
+
+from .config import RUN_RESULTS_PATH, TEST_RESULTS_PATH
+
+T = TypeVar("T")
+
+_test_id = operator.attrgetter("test_id")
+
+# Used for tests that have never been timed and when no history exists at all.
+DEFAULT_DURATION_MS = 60_000
+
+_ID_PATTERN = re.compile(r"^(TC\d{3})")
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _record_duration(record: dict) -> int | None:
+    """Duration of one result record in milliseconds.
+
+    Our own runner writes ``durationMs``.  TestSprite records only carry
+    ``created``/``modified``, whose difference is the wall time of the
+    remote execution and still ranks tests well enough for packing.
+    """
+    if isinstance(record.get("durationMs"), (int, float)):
+        return int(record["durationMs"])
+    if record.get("created") and record.get("modified"):
+        delta = _parse_time(record["modified"]) - _parse_time(record["created"])
+        # Tests that never ran (e.g. TC010 timing out in the queue) have no span.
+        return int(delta.total_seconds() * 1000) or None
+    return None
+
+
+def _record_id(record: dict) -> str | None:
+    match = _ID_PATTERN.match(record.get("testId") or "") or _ID_PATTERN.match(record.get("title") or "")
+    return match.group(1) if match else None
+
+
+def load_durations(paths: Iterable[Path] = (TEST_RESULTS_PATH, RUN_RESULTS_PATH)) -> dict[str, int]:
+    """Map TC id to its last known duration; later files override earlier ones."""
+    durations: dict[str, int] = {}
+    for path in paths:
+        if not path.exists():
+            continue
+        with path.open(encoding="utf-8") as fh:
+            records = json.load(fh)
+        for record in records:
+            test_id = _record_id(record)
+            duration = _record_duration(record)
+            if test_id and duration is not None:
+                durations[test_id] = duration
+    return durations
+
+
+def estimate(test_id: str, durations: dict[str, int]) -> int:
+    """Known duration of ``test_id``, or the median of the known ones."""
+    if test_id in durations:
+        return durations[test_id]
+    if durations:
+        return int(statistics.median(durations.values()))
+    return DEFAULT_DURATION_MS
+
+
+def longest_first(items: Sequence[T], durations: dict[str, int], id_of=_test_id) -> list[T]:
+    return sorted(items, key=lambda item: estimate(id_of(item), durations), reverse=True)
+
+
+def pack_shards(items: Sequence[T], count: int, durations: dict[str, int], id_of=_test_id) -> list[list[T]]:
+    """Split ``items`` into ``count`` shards with balanced total duration.
+
+    Classic LPT: take tests longest first and always give the next one to
+    the shard with the smallest total so far.
+    """
+    count = max(1, min(count, len(items)))
+    heap = [(0, index) for index in range(count)]
+    shards: list[list[T]] = [[] for _ in range(count)]
+    for item in longest_first(items, durations, id_of):
+        load, index = heapq.heappop(heap)
+        shards[index].append(item)
+        heapq.heappush(heap, (load + estimate(id_of(item), durations), index))
+    return shards
+
+
+def makespan(shards: Sequence[Sequence[T]], durations: dict[str, int], id_of=_test_id) -> int:
+    """Expected wall time of running ``shards`` side by side."""
+    return max((sum(estimate(id_of(item), durations) for item in shard) for shard in shards), default=0)
@@ -0,0 +1,307 @@
+"""Step-level timing spans for the TC scripts.
+
+    python -m harness.spans [tmp/spans/<run>.jsonl ...] [--test TC005] [--top 15]
+
+:func:`instrument` wraps Playwright's ``goto``, ``fill`` and ``click``,
+every ``expect`` assertion, and the harness's own waits and login, so the
+scripts need no changes.  Inside :func:`test_scope` each call becomes a
+span with wall-clock start/end and the number of requests the page made
+meanwhile; the runner writes them to one JSONL file per run.  Top-level
+spans are the script's steps; spans nested in them (the ``goto`` inside
+``auth.login``) keep ``depth`` 1.  Nesting and request counts follow the
+asyncio task, so TC018's devices, checked in parallel, each become one
+top-level ``device`` step that counts only its own context's requests.
+
+The per-test table splits a test's wall time into navigation, input,
+assertions, harness waits and time outside any span, which is enough to
+tell a slow app (``goto``/``expect``) from slow data (requests per step)
+from our own waiting (``wait``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import functools
+import json
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from .config import TMP_DIR
+from .stats import summarize
+
+SPANS_DIR = TMP_DIR / "spans"
+
+# Device spans run in parallel, so with them the kinds can add up to more than the wall time.
+KINDS = ("goto", "fill", "click", "expect", "wait", "login", "device")
+
+
+def new_trace_path(directory: Path = SPANS_DIR) -> Path:
+    return directory / f"{datetime.now():%Y%m%d-%H%M%S}.jsonl"
+
+
+class SpanWriter:
+    """Appends span records to a JSONL file, one ``write`` per line.
+
+    Shard processes of the same run append to the same file; single-line
+    appends do not interleave.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(self, record: dict[str, Any]) -> None:
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+@dataclass
+class RequestCount:
+    requests: int = 0
+    supabase_requests: int = 0
+
+
+# Task-local, so parallel tasks of one test neither nest in nor count for each other.
+_open: ContextVar[tuple[int, int] | None] = ContextVar("harness_span_open", default=None)  # (step, depth) of the innermost span
+_counting: ContextVar[RequestCount | None] = ContextVar("harness_span_requests", default=None)
+
+
+class TestTrace:
+    """Spans of one running test."""
+
+    def __init__(self, test_id: str, writer: SpanWriter):
+        self.test_id = test_id
+        self.writer = writer
+        self.step = 0
+
+    def watch(self, context) -> None:
+        """Count the requests ``context`` makes for the spans of the calling task."""
+        from .waits import is_supabase_request
+
+        count = _counting.get()
+        if count is None:
+            return
+
+        def on_request(request) -> None:
+            count.requests += 1
+            count.supabase_requests += is_supabase_request(request.url)
+
+        context.on("request", on_request)
+
+    @contextlib.asynccontextmanager
+    async def span(self, kind: str, target: str) -> AsyncIterator[dict[str, Any]]:
+        parent = _open.get()
+        if parent is None:
+            self.step += 1
+            step, depth = self.step, 0
+        else:
+            step, depth = parent[0], parent[1] + 1
+        record: dict[str, Any] = {"test": self.test_id, "step": step, "depth": depth, "kind": kind, "target": target}
+        count = _counting.get() or RequestCount()
+        requests, supabase_requests = count.requests, count.supabase_requests
+        record["start"] = time.time()
+        started = time.perf_counter()
+        token = _open.set((step, depth))
+        try:
+            yield record
+        except BaseException as exc:
+            record["error"] = type(exc).__name__
+            raise
+        finally:
+            _open.reset(token)
+            record["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            record["end"] = record["start"] + record["duration_ms"] / 1000
+            record["requests"] = count.requests - requests
+            record["supabase_requests"] = count.supabase_requests - supabase_requests
+            self.writer.write(record)
+
+
+_current: ContextVar[TestTrace | None] = ContextVar("harness_span_trace", default=None)
+
+
+@contextlib.contextmanager
+def test_scope(test_id: str, writer: SpanWriter | None) -> Iterator[TestTrace | None]:
+    """Attribute spans recorded in this task to ``test_id`` (no-op without a writer)."""
+    if writer is None:
+        yield None
+        return
+    trace = TestTrace(test_id, writer)
+    token = _current.set(trace)
+    counting = _counting.set(RequestCount())
+    started, wall = time.perf_counter(), time.time()
+    status = "PASSED"
+    try:
+        yield trace
+    except BaseException:
+        status = "FAILED"
+        raise
+    finally:
+        _counting.reset(counting)
+        _current.reset(token)
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        writer.write(
+            {"test": test_id, "kind": "test", "status": status, "start": wall, "end": wall + duration_ms / 1000, "duration_ms": duration_ms, "steps": trace.step}
+        )
+
+
+def _selector(obj: Any) -> str:
+    """Best-effort selector/URL of a Locator, Page or assertion object for span labels."""
+    impl = getattr(obj, "_impl_obj", obj)
+    for attr in ("_actual_locator", "_actual_page"):
+        if hasattr(impl, attr):
+            impl = getattr(impl, attr)
+    if hasattr(impl, "_selector"):
+        return impl._selector
+    return getattr(impl, "url", "") or type(obj).__name__
+
+
+def _wrap(owner: Any, name: str, kind: str, describe: Callable[..., str], own_requests: bool = False) -> None:
+    """Make calls of ``owner.name`` spans; with ``own_requests`` the span counts only the requests of contexts watched inside it."""
+    original = getattr(owner, name)
+    if getattr(original, "_harness_span", False):
+        return
+
+    @functools.wraps(original)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        trace = _current.get()
+        if trace is None:
+            return await original(*args, **kwargs)
+        counting = _counting.set(RequestCount()) if own_requests else None
+        try:
+            async with trace.span(kind, describe(*args, **kwargs)) as record:
+                result = await original(*args, **kwargs)
+                if result is False:
+                    # Harness waits report a missed condition by returning False.
+                    record["timed_out"] = True
+                return result
+        finally:
+            if counting is not None:
+                _counting.reset(counting)
+
+    wrapper._harness_span = True
+    setattr(owner, name, wrapper)
+
+
+def instrument() -> None:
+    """Wrap the traced calls (idempotent)."""
+    from playwright.async_api import Frame, Locator, LocatorAssertions, Page, PageAssertions
+
+    from . import auth, devices, waits
+
+    for cls in (Page, Frame):
+        _wrap(cls, "goto", "goto", lambda self, url="", *a, **k: url)
+    for name in ("fill", "click"):
+        _wrap(Locator, name, name, lambda self, *a, **k: _selector(self))
+    for cls in (LocatorAssertions, PageAssertions):
+        for name in dir(cls):
+            if name.startswith(("to_", "not_to_")):
+                _wrap(cls, name, "expect", lambda self, *a, _name=name, **k: f"{_name} {_selector(self)}")
+    for name in ("locator_ready", "page_ready", "settled"):
+        _wrap(waits, name, "wait", lambda *a, _name=name, **k: _name)
+    _wrap(auth, "login", "login", lambda *a, **k: "auth.login")
+    # Each device runs in a sibling context of its own, in parallel with the others.
+    _wrap(devices, "check_device", "device", lambda open_context, device, *a, **k: device.name, own_requests=True)
+
+
+def load_spans(paths: list[Path]) -> list[dict[str, Any]]:
+    records = []
+    for path in paths:
+        with path.open(encoding="utf-8") as fh:
+            records.extend(json.loads(line) for line in fh if line.strip())
+    return records
+
+
+def test_table(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Per test: wall time, time per step kind, unspanned time and requests (medians over runs)."""
+    runs: dict[str, list[dict[str, float]]] = defaultdict(list)
+    current: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for record in sorted(records, key=lambda r: r["end"]):
+        test = record["test"]
+        if record["kind"] == "test":
+            row = current.pop(test, defaultdict(float))
+            row["wall"] = record["duration_ms"]
+            row["other"] = record["duration_ms"] - sum(row[kind] for kind in KINDS)
+            runs[test].append(row)
+        elif record["depth"] == 0:
+            current[test][record["kind"]] += record["duration_ms"]
+            current[test]["requests"] += record["requests"]
+    columns = ("wall", *KINDS, "other", "requests")
+    return [
+        {"test": test, "runs": len(rows), **{c: summarize(r.get(c, 0.0) for r in rows)["p50"] for c in columns}}
+        for test, rows in sorted(runs.items())
+    ]
+
+
+def step_table(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Per top-level step: duration percentiles over runs, requests and timeouts."""
+    steps: dict[tuple[str, int, str, str], list[dict[str, Any]]] = defaultdict(list)
+    for record in records:
+        if record["kind"] != "test" and record["depth"] == 0:
+            steps[(record["test"], record["step"], record["kind"], record["target"])].append(record)
+    rows = []
+    for (test, step, kind, target), spans in sorted(steps.items()):
+        durations = summarize(s["duration_ms"] for s in spans)
+        rows.append(
+            {
+                "test": test,
+                "step": step,
+                "kind": kind,
+                "target": target,
+                "runs": len(spans),
+                "p50_ms": durations["p50"],
+                "max_ms": durations["max"],
+                "requests": max(s["requests"] for s in spans),
+                "timeouts": sum(bool(s.get("timed_out")) for s in spans),
+                "errors": sum("error" in s for s in spans),
+            }
+        )
+    return rows
+
+
+def print_tables(tests: list[dict[str, Any]], steps: list[dict[str, Any]], top: int) -> None:
+    columns = ("wall", *KINDS, "other")
+    print(f"{'test':<7}{'runs':>5}" + "".join(f"{c:>9}" for c in columns) + f"{'reqs':>6}")
+    for row in tests:
+        print(f"{row['test']:<7}{row['runs']:>5}" + "".join(f"{row[c]:>9.0f}" for c in columns) + f"{row['requests']:>6.0f}")
+    print("\nslowest steps (p50 ms):")
+    for row in sorted(steps, key=lambda r: r["p50_ms"], reverse=True)[:top]:
+        flags = "".join(f"  {n} {k}" for k, n in (("timeouts", row["timeouts"]), ("errors", row["errors"])) if n)
+        target = row["target"] if len(row["target"]) <= 60 else "..." + row["target"][-57:]
+        print(f"{row['test']:<7}#{row['step']:<3}{row['kind']:<7}{row['p50_ms']:>9.0f}{row['requests']:>5} reqs  {target}{flags}")
+
+
+def latest_trace(directory: Path = SPANS_DIR) -> Path | None:
+    traces = sorted(directory.glob("*.jsonl"))
+    return traces[-1] if traces else None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.spans", description=__doc__.splitlines()[0])
+    parser.add_argument("traces", nargs="*", type=Path, help="span files to roll up (default: the latest run)")
+    parser.add_argument("--test", action="append", help="only these TC ids")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest steps to list")
+    parser.add_argument("--json", type=Path, help="also write both tables here")
+    args = parser.parse_args(argv)
+    paths = args.traces or [p for p in [latest_trace()] if p]
+    if not paths:
+        print(f"no span files in {SPANS_DIR}; run the suite first")
+        return 1
+    records = load_spans(paths)
+    if args.test:
+        wanted = {t.upper() for t in args.test}
+        records = [r for r in records if r["test"] in wanted]
+    tests, steps = test_table(records), step_table(records)
+    print_tables(tests, steps, args.top)
+    if args.json:
+        args.json.write_text(json.dumps({"tests": tests, "steps": steps}, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
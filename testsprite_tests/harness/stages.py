@@ -0,0 +1,263 @@
+"""Per-stage latency breakdown of the Evolution webhook.
+
+    python -m harness.stages [--samples tmp/load_samples.jsonl] [--calls-dir tmp/standin_calls] [--show 5]
+
+The webhook forwards the load generator's ``X-Request-Id`` on every
+Supabase, OpenAI and Evolution call (``shared/tracing.ts``), and the
+stand-ins log it.  This joins those call logs to the load generator's
+samples, maps each call to a pipeline stage and writes:
+
+* ``tmp/webhook_stages.json`` - per-stage percentiles, next to ``test_results.json``;
+* ``tmp/webhook_trace.json`` - one flame-style track per message, for
+  ``chrome://tracing`` or https://ui.perfetto.dev.
+
+``decrypt`` makes no outbound call; it is the gap between the outbound
+insert finishing and the Evolution send starting.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+from .config import TMP_DIR
+from .standins.stack import CALLS_DIR
+from .stats import summarize
+
+SAMPLES_PATH = TMP_DIR / "load_samples.jsonl"
+REPORT_PATH = TMP_DIR / "webhook_stages.json"
+TRACE_PATH = TMP_DIR / "webhook_trace.json"
+
+STAGES = (
+    "connection_lookup",
+    "agent_lookup",
+    "check_message_limit",
+    "conversation",
+    "config_fetch",
+    "history_fetch",
+    "inbound_insert",
+    "openai",
+    "outbound_insert",
+    "decrypt",
+    "evolution_send",
+    "metadata_update",
+)
+
+
+def stage_of(server: str, call: dict[str, Any]) -> str | None:
+    """Which webhook stage a stand-in call belongs to (by table, method and filters)."""
+    if server == "openai":
+        return "openai"
+    if server == "evolution":
+        return "evolution_send"
+    if not call["path"].startswith("/rest/v1/"):
+        return None
+    table = call["path"][len("/rest/v1/") :].strip("/")
+    method = call["method"]
+    filters = {key for key, _ in call["query"]}
+    if table == "agent_connections":
+        return "connection_lookup"
+    if table == "agents":
+        # checkMessageLimit lists the organization's agents; the handler fetches one by id.
+        return "agent_lookup" if "id" in filters else "check_message_limit"
+    if table in ("subscriptions", "organizations"):
+        return "check_message_limit"
+    if table == "conversations":
+        return "conversation"
+    if table == "agent_configurations":
+        return "config_fetch"
+    if table == "messages":
+        if method == "HEAD" or "agent_id" in filters:
+            return "check_message_limit"
+        if method == "GET":
+            return "history_fetch"
+        if method == "PATCH":
+            return "metadata_update"
+        if method == "POST":
+            body = call["body"][0] if isinstance(call["body"], list) else call["body"] or {}
+            return "outbound_insert" if body.get("direction") == "outbound" else "inbound_insert"
+    return None
+
+
+@dataclass
+class Span:
+    stage: str
+    start: float
+    end: float
+    calls: int = 1
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end - self.start) * 1000
+
+
+@dataclass
+class Timeline:
+    """One message: the client's view plus the stage spans seen by the stand-ins."""
+
+    request_id: str
+    sent: float
+    finished: float
+    outcome: str
+    spans: dict[str, Span] = field(default_factory=dict)
+
+    @property
+    def total_ms(self) -> float:
+        return (self.finished - self.sent) * 1000
+
+    @property
+    def unaccounted_ms(self) -> float:
+        """Time in the handler itself and in transit that no stage covers."""
+        return self.total_ms - sum(span.duration_ms for span in self.spans.values())
+
+    def add(self, stage: str, start: float, end: float) -> None:
+        span = self.spans.get(stage)
+        if span is None:
+            self.spans[stage] = Span(stage, start, end)
+        else:
+            span.start, span.end, span.calls = min(span.start, start), max(span.end, end), span.calls + 1
+
+    def ordered(self) -> list[Span]:
+        return sorted(self.spans.values(), key=lambda span: span.start)
+
+
+def _read_jsonl(path: Path) -> Iterable[dict[str, Any]]:
+    with path.open(encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def correlate(samples: Iterable[dict[str, Any]], calls_dir: Path) -> list[Timeline]:
+    """Join load-generator samples with the stand-in call logs by request ID."""
+    timelines = {
+        s["request_id"]: Timeline(s["request_id"], s["sent"], s["finished"], s["outcome"]) for s in samples
+    }
+    for path in sorted(calls_dir.glob("*.jsonl")):
+        for call in _read_jsonl(path):
+            timeline = timelines.get(call.get("request_id") or "")
+            stage = stage_of(path.stem, call) if timeline else None
+            if stage:
+                timeline.add(stage, call["started"], call["finished"])
+    for timeline in timelines.values():
+        inserted, sending = timeline.spans.get("outbound_insert"), timeline.spans.get("evolution_send")
+        if inserted and sending and sending.start > inserted.end:
+            timeline.spans["decrypt"] = Span("decrypt", inserted.end, sending.start, calls=0)
+    return [t for t in timelines.values() if t.spans]
+
+
+def stage_report(timelines: list[Timeline], samples: int) -> dict[str, Any]:
+    total = sum(t.total_ms for t in timelines) or 1.0
+    stages = {}
+    for stage in STAGES:
+        spans = [t.spans[stage] for t in timelines if stage in t.spans]
+        if spans:
+            stages[stage] = {
+                **summarize(span.duration_ms for span in spans),
+                "round_trips": round(sum(span.calls for span in spans) / len(spans), 2),
+                "share": round(sum(span.duration_ms for span in spans) / total, 3),
+            }
+    return {
+        "messages": samples,
+        "correlated": len(timelines),
+        "end_to_end_ms": summarize(t.total_ms for t in timelines),
+        "unaccounted_ms": summarize(t.unaccounted_ms for t in timelines),
+        "stages": stages,
+    }
+
+
+def chrome_trace(timelines: list[Timeline]) -> dict[str, Any]:
+    """Trace Event Format: one thread per message, stages nested under the request."""
+    origin = min((t.sent for t in timelines), default=0.0)
+    events = []
+    for tid, timeline in enumerate(timelines, start=1):
+        events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": timeline.request_id[:8]}})
+        events.append(
+            {
+                "name": f"webhook ({timeline.outcome})",
+                "ph": "X",
+                "pid": 1,
+                "tid": tid,
+                "ts": (timeline.sent - origin) * 1e6,
+                "dur": timeline.total_ms * 1000,
+            }
+        )
+        for span in timeline.ordered():
+            events.append(
+                {
+                    "name": span.stage,
+                    "ph": "X",
+                    "pid": 1,
+                    "tid": tid,
+                    "ts": (span.start - origin) * 1e6,
+                    "dur": span.duration_ms * 1000,
+                    "args": {"round_trips": span.calls},
+                }
+            )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def render_timeline(timeline: Timeline, width: int = 48) -> str:
+    """Text flame graph of one message, bars placed on the request's own time axis."""
+    scale = width / max(timeline.total_ms, 1e-6)
+    lines = [f"{timeline.request_id[:8]}  {timeline.total_ms:.1f} ms  {timeline.outcome}"]
+    for span in timeline.ordered():
+        offset = int((span.start - timeline.sent) * 1000 * scale)
+        length = max(1, round(span.duration_ms * scale))
+        bar = (" " * offset + "█" * length)[:width].ljust(width)
+        lines.append(f"  {span.stage:<20}|{bar}| {span.duration_ms:8.1f} ms")
+    lines.append(f"  {'(unaccounted)':<20} {'':{width}}  {timeline.unaccounted_ms:8.1f} ms")
+    return "\n".join(lines)
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print(f"{report['correlated']}/{report['messages']} messages correlated")
+    print(f"{'stage':<22}{'p50':>9}{'p95':>9}{'p99':>9}{'trips':>7}{'share':>8}")
+    for stage, row in report["stages"].items():
+        print(f"{stage:<22}{row['p50']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}{row['round_trips']:>7}{row['share']:>8.1%}")
+    for label, key in (("(unaccounted)", "unaccounted_ms"), ("end to end", "end_to_end_ms")):
+        row = report[key]
+        if row.get("count"):
+            print(f"{label:<22}{row['p50']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}")
+
+
+def analyze(
+    samples_path: Path = SAMPLES_PATH,
+    calls_dir: Path = CALLS_DIR,
+    output: Path = REPORT_PATH,
+    trace_path: Path | None = TRACE_PATH,
+    show: int = 3,
+) -> dict[str, Any]:
+    """Correlate, print the stage table and the ``show`` slowest timelines, and write reports."""
+    samples = list(_read_jsonl(samples_path))
+    timelines = correlate(samples, calls_dir)
+    report = stage_report(timelines, len(samples))
+    print_report(report)
+    for timeline in sorted(timelines, key=lambda t: t.total_ms, reverse=True)[:show]:
+        print()
+        print(render_timeline(timeline))
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if trace_path is not None:
+        trace_path.write_text(json.dumps(chrome_trace(timelines)), encoding="utf-8")
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.stages", description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=Path, default=SAMPLES_PATH, help="JSONL written by harness.loadgen --samples")
+    parser.add_argument("--calls-dir", type=Path, default=CALLS_DIR, help="stand-in call logs (python -m harness.standins)")
+    parser.add_argument("--output", type=Path, default=REPORT_PATH)
+    parser.add_argument("--trace", type=Path, default=TRACE_PATH, help="Chrome trace output")
+    parser.add_argument("--show", type=int, default=3, help="print timelines of the N slowest messages")
+    args = parser.parse_args(argv)
+    report = analyze(args.samples, args.calls_dir, args.output, args.trace, args.show)
+    print(f"\nreport written to {args.output}, trace to {args.trace}")
+    return 0 if report["correlated"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,5 @@
+"""Local stand-ins for the services the app and its edge functions call.
+
+They run on plain ``http.server`` threads so they need nothing beyond the
+standard library, and every server records the calls it served.
+"""
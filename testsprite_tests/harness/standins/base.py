@@ -0,0 +1,190 @@
+"""Threaded HTTP plumbing shared by the stand-in servers.
+
+Every stand-in records the calls it served (:class:`Call`) so harnesses
+can assert on them or line them up against client-side timings.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, PATCH, PUT, DELETE, HEAD, OPTIONS",
+    "Access-Control-Allow-Headers": "*",
+    "Access-Control-Expose-Headers": "Content-Range, Content-Location, X-Request-Id",
+}
+
+
+@dataclass
+class Call:
+    """One request served by a stand-in."""
+
+    method: str
+    path: str
+    query: list[tuple[str, str]]
+    body: Any
+    started: float
+    finished: float = 0.0
+    status: int = 0
+    request_id: str | None = None
+    meta: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.finished - self.started) * 1000
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "duration_ms": self.duration_ms}
+
+
+class JsonHandler(BaseHTTPRequestHandler):
+    """Base request handler: JSON in, JSON out, CORS on everything.
+
+    Subclasses implement ``handle_request(call)`` and answer through
+    :meth:`send_json`.  ``self.server`` is the owning :class:`StandinServer`.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, keep-alive
+    # clients wait out a delayed ACK (~40 ms) on every request.
+    disable_nagle_algorithm = True
+    server: "StandinHTTPServer"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        pass
+
+    def _dispatch(self) -> None:
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = raw.decode("utf-8", "replace")
+        call = Call(
+            method=self.command,
+            path=parts.path,
+            query=parse_qsl(parts.query, keep_blank_values=True),
+            body=body,
+            started=time.time(),
+            request_id=self.headers.get("X-Request-Id"),
+        )
+        self._call = call
+        try:
+            if self.command == "OPTIONS":
+                self.send_json(204, None)
+            else:
+                self.handle_request(call)
+        finally:
+            call.finished = time.time()
+            self.server.owner.record(call)
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = do_HEAD = do_OPTIONS = _dispatch
+
+    def handle_request(self, call: Call) -> None:
+        raise NotImplementedError
+
+    def send_json(self, status: int, payload: Any, headers: dict[str, str] | None = None) -> None:
+        data = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self._call.status = status
+        self.send_response(status)
+        for name, value in {**CORS_HEADERS, **(headers or {})}.items():
+            self.send_header(name, value)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(0 if self.command == "HEAD" else len(data)))
+        self.end_headers()
+        if self.command != "HEAD" and data:
+            self.wfile.write(data)
+
+
+class StandinHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], handler: type[JsonHandler], owner: "StandinServer"):
+        super().__init__(address, handler)
+        self.owner = owner
+
+
+class StandinServer:
+    """Runs a :class:`JsonHandler` on a background thread and keeps its call log."""
+
+    handler: type[JsonHandler] = JsonHandler
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.calls: list[Call] = []
+        self._calls_lock = threading.Lock()
+        self._httpd: StandinHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def record(self, call: Call) -> None:
+        with self._calls_lock:
+            self.calls.append(call)
+
+    def drain_calls(self) -> list[Call]:
+        """Return and forget the calls recorded so far."""
+        with self._calls_lock:
+            calls, self.calls = self.calls, []
+        return calls
+
+    def write_calls(self, path: Path, drain: bool = False) -> int:
+        """Append the recorded calls to a JSONL file; returns how many were written.
+
+        With ``drain`` the written calls are forgotten, so periodic flushes
+        never write a call twice.
+        """
+        if drain:
+            calls = self.drain_calls()
+        else:
+            with self._calls_lock:
+                calls = list(self.calls)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as fh:
+            for call in calls:
+                fh.write(json.dumps(call.to_dict(), default=str) + "\n")
+        return len(calls)
+
+    def start(self) -> "StandinServer":
+        self._httpd = StandinHTTPServer((self.host, self.port), self.handler, self)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def serve_forever(self) -> None:
+        """Run in the foreground until interrupted (CLI use)."""
+        self.start()
+        print(f"{type(self).__name__} listening on {self.url}", flush=True)
+        try:
+            while self._thread is not None and self._thread.is_alive():
+                self._thread.join(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
@@ -0,0 +1,123 @@
+"""Stand-in for the Evolution API ``message/sendText`` endpoint.
+
+    python -m harness.standins.evolution [--port 8081] [--latency lognormal:300,0.4] [--error-rate 0.01]
+
+Point an agent connection's ``baseUrl`` at this server and every reply
+the webhook sends is recorded instead of reaching WhatsApp.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any
+
+from .base import Call, JsonHandler, StandinServer
+from .profiles import ResponseProfile, add_profile_arguments, profile_from_args
+
+
+def encrypt_credentials(credentials: dict[str, Any], key_hex: str) -> str:
+    """Encrypt connection credentials the way ``shared/encryption.ts`` does.
+
+    AES-256-GCM with a random 12-byte IV, stored as base64(IV + ciphertext).
+    Needs the optional ``cryptography`` package.
+    """
+    try:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("encrypting connection credentials needs `pip install cryptography`") from exc
+    iv = os.urandom(12)
+    sealed = AESGCM(bytes.fromhex(key_hex)).encrypt(iv, json.dumps(credentials).encode("utf-8"), None)
+    return base64.b64encode(iv + sealed).decode("ascii")
+
+
+class EvolutionHandler(JsonHandler):
+    def handle_request(self, call: Call) -> None:
+        owner: EvolutionStandin = self.server.owner
+        parts = call.path.strip("/").split("/")
+        if call.method != "POST" or parts[:2] != ["message", "sendText"] or len(parts) != 3:
+            self.send_json(404, {"status": 404, "message": f"Cannot {call.method} {call.path}"})
+            return
+        instance = parts[2]
+        body = call.body if isinstance(call.body, dict) else {}
+        number = str(body.get("number", ""))
+        text = (body.get("textMessage") or {}).get("text") or body.get("text") or ""
+        call.meta.update(instance=instance, number=number, chars=len(text))
+
+        if owner.api_key and self.headers.get("apikey") != owner.api_key:
+            self.send_json(401, {"status": 401, "message": "Unauthorized"})
+            return
+        delay_ms, fail = owner.profile.apply()
+        call.meta["injected_delay_ms"] = delay_ms
+        if fail:
+            call.meta["injected_error"] = True
+            self.send_json(owner.profile.error_status, {"status": owner.profile.error_status, "message": "Injected failure"})
+            return
+        message_id = uuid.uuid4().hex[:20].upper()
+        call.meta["message_id"] = message_id
+        self.send_json(
+            201,
+            {
+                "key": {"remoteJid": f"{number}@s.whatsapp.net", "fromMe": True, "id": message_id},
+                "message": {"extendedTextMessage": {"text": text}},
+                "messageTimestamp": int(time.time()),
+                "status": "PENDING",
+            },
+        )
+
+
+class EvolutionStandin(StandinServer):
+    handler = EvolutionHandler
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, profile: ResponseProfile | None = None, api_key: str | None = None):
+        super().__init__(host, port)
+        self.profile = profile or ResponseProfile()
+        self.api_key = api_key
+        self._sent = threading.Condition()
+
+    def record(self, call: Call) -> None:
+        super().record(call)
+        with self._sent:
+            self._sent.notify_all()
+
+    def sent(self) -> list[Call]:
+        """Successful ``sendText`` calls recorded so far."""
+        return [c for c in self.calls if c.status == 201]
+
+    def wait_for_send(self, number: str, since: float, timeout: float = 30.0) -> Call | None:
+        """Block until a ``sendText`` to ``number`` started after ``since`` (epoch seconds) arrives.
+
+        This is the far end of the webhook round trip: inbound message ->
+        OpenAI -> reply sent back through Evolution.
+        """
+        deadline = time.time() + timeout
+        with self._sent:
+            while True:
+                match = next(
+                    (c for c in self.calls if c.meta.get("number") == number and c.started >= since and c.status),
+                    None,
+                )
+                remaining = deadline - time.time()
+                if match is not None or remaining <= 0:
+                    return match
+                self._sent.wait(remaining)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.standins.evolution", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--api-key", help="reject requests whose apikey header differs")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    EvolutionStandin(args.host, args.port, profile_from_args(args), args.api_key).serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
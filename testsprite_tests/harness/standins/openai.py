@@ -0,0 +1,99 @@
+"""Stand-in for the OpenAI ``/v1/chat/completions`` endpoint.
+
+    python -m harness.standins.openai [--port 8082] [--latency lognormal:900,0.5] [--error-rate 0.02]
+
+The edge functions read ``OPENAI_BASE_URL`` (default
+``https://api.openai.com/v1``); set it to ``http://127.0.0.1:8082/v1`` to
+answer ``callOpenAI`` from here.  Replies are deterministic so runs can
+be compared.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+
+from .base import Call, JsonHandler, StandinServer
+from .profiles import ResponseProfile, add_profile_arguments, profile_from_args
+
+
+def _tokens(text: str) -> int:
+    # Roughly four characters per token, like the tokenizer on Portuguese/English text.
+    return max(1, len(text) // 4)
+
+
+class OpenAIHandler(JsonHandler):
+    def handle_request(self, call: Call) -> None:
+        owner: OpenAIStandin = self.server.owner
+        if call.method != "POST" or call.path.rstrip("/") != "/v1/chat/completions":
+            self.send_json(404, {"error": {"message": f"Unknown request URL: {call.method} {call.path}", "type": "invalid_request_error"}})
+            return
+        body = call.body if isinstance(call.body, dict) else {}
+        messages = body.get("messages") or []
+        model = body.get("model", "gpt-3.5-turbo")
+        prompt = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        call.meta.update(model=model, messages=len(messages), max_tokens=body.get("max_tokens"))
+
+        delay_ms, fail = owner.profile.apply()
+        call.meta["injected_delay_ms"] = delay_ms
+        if fail:
+            call.meta["injected_error"] = True
+            status = owner.profile.error_status
+            kind = "rate_limit_exceeded" if status == 429 else "server_error"
+            self.send_json(status, {"error": {"message": "Injected failure", "type": kind, "code": kind}})
+            return
+
+        content = owner.reply_template.format(prompt=prompt)
+        prompt_tokens = sum(_tokens(m.get("content", "")) for m in messages)
+        completion_tokens = _tokens(content)
+        call.meta.update(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        self.send_json(
+            200,
+            {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            },
+        )
+
+
+class OpenAIStandin(StandinServer):
+    handler = OpenAIHandler
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        profile: ResponseProfile | None = None,
+        reply_template: str = "Resposta automática para: {prompt}",
+    ):
+        super().__init__(host, port)
+        self.profile = profile or ResponseProfile()
+        self.reply_template = reply_template
+
+    @property
+    def base_url(self) -> str:
+        """Value for the functions' ``OPENAI_BASE_URL``."""
+        return f"{self.url}/v1"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.standins.openai", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8082)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    OpenAIStandin(args.host, args.port, profile_from_args(args)).serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,530 @@
+"""In-memory evaluation of the PostgREST subset supabase-js emits.
+
+Supported: ``select`` with ``*``, column lists, aliases, ``->``/``->>``
+JSON paths and embedded resources (``agent:agents!inner(id, name)``);
+the ``eq neq gt gte lt lte like ilike in is`` operators, ``not.`` and
+``or=(...)``; filters on embedded resources; ``order``, ``limit`` and
+``offset``; inserts, upserts, updates and deletes.  Row level security is
+not emulated: every request sees every row.
+
+Filters on ``id`` and ``*_id`` columns (``eq`` and ``in``) and embeds go
+through hash indexes the store builds on first use, like the primary and
+foreign key indexes of the real schema, so lookups stay cheap at seeded
+scale.
+"""
+
+from __future__ import annotations
+
+import operator
+import re
+import threading
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Any, Iterable
+
+from .schema import Table
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+_JSON_PATH = re.compile(r"(->>?)(\w+)")
+
+_COMPARISONS = {
+    "eq": operator.eq,
+    "neq": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+
+class PostgrestError(Exception):
+    """An error PostgREST would answer with ``status`` and a JSON body."""
+
+    def __init__(self, status: int, code: str, message: str, details: str | None = None):
+        super().__init__(message)
+        self.status = status
+        self.body = {"code": code, "message": message, "details": details, "hint": None}
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+# --- select ---------------------------------------------------------------
+
+
+@dataclass
+class Field:
+    name: str
+    alias: str
+    json_path: list[tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class Embed:
+    alias: str
+    target: str
+    inner: bool
+    hint: str | None
+    items: list
+
+
+def _split_top_level(text: str) -> list[str]:
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    if current:
+        parts.append("".join(current))
+    return [p for p in parts if p]
+
+
+def parse_select(text: str | None) -> list:
+    """Parse a ``select`` parameter into ``"*"``, :class:`Field` and :class:`Embed` items."""
+    text = re.sub(r"\s+", "", text or "*")
+    items: list = []
+    for part in _split_top_level(text):
+        alias = None
+        if ":" in part.split("(", 1)[0] and "::" not in part.split("(", 1)[0]:
+            alias, part = part.split(":", 1)
+        if "(" in part:
+            head, body = part.split("(", 1)
+            target, *modifiers = head.split("!")
+            items.append(
+                Embed(
+                    alias=alias or target,
+                    target=target,
+                    inner="inner" in modifiers,
+                    hint=next((m for m in modifiers if m not in ("inner", "left")), None),
+                    items=parse_select(body[:-1]),
+                )
+            )
+        elif part == "*":
+            items.append("*")
+        else:
+            part = part.split("::", 1)[0]
+            column = _JSON_PATH.split(part, 1)[0]
+            path = _JSON_PATH.findall(part)
+            items.append(Field(column, alias or (path[-1][1] if path else column), path))
+    return items
+
+
+# --- filters --------------------------------------------------------------
+
+
+@dataclass
+class Condition:
+    column: str
+    json_path: list[tuple[str, str]]
+    op: str
+    value: str
+    negate: bool = False
+    embed_path: tuple[str, ...] = ()
+
+    def matches(self, row: dict[str, Any]) -> bool:
+        value = _extract(row.get(self.column), self.json_path)
+        result = _apply(self.op, value, self.value)
+        return not result if self.negate else result
+
+    def key_values(self, table: Table) -> list[str] | None:
+        """The key values an ``eq``/``in`` filter on an indexed column selects, else ``None``."""
+        if self.negate or self.json_path or self.op not in ("eq", "in") or not _indexed(table, self.column):
+            return None
+        return [self.value] if self.op == "eq" else _split_list(self.value.strip("()"))
+
+
+@dataclass
+class AnyOf:
+    """``or=(...)``: at least one condition holds."""
+
+    conditions: list[Condition]
+    embed_path: tuple[str, ...] = ()
+
+    def matches(self, row: dict[str, Any]) -> bool:
+        return any(c.matches(row) for c in self.conditions)
+
+
+def _extract(value: Any, json_path: list[tuple[str, str]]) -> Any:
+    for arrow, key in json_path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+        if arrow == "->>" and value is not None and not isinstance(value, str):
+            value = str(value).lower() if isinstance(value, bool) else str(value)
+    return value
+
+
+def _parse_datetime(text: str) -> datetime:
+    parsed = datetime.fromisoformat(text.replace("Z", "+00:00").replace(" ", "T"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _coerce(left: Any, right: str) -> tuple[Any, Any]:
+    """Bring a stored value and a filter literal to comparable types."""
+    if isinstance(left, bool):
+        return left, right.lower() == "true"
+    if isinstance(left, (int, float)):
+        try:
+            return left, float(right)
+        except ValueError:
+            return str(left), right
+    if isinstance(left, str) and _ISO_DATE.match(left) and _ISO_DATE.match(right):
+        try:
+            return _parse_datetime(left), _parse_datetime(right)
+        except ValueError:
+            pass
+    return str(left), right
+
+
+def _like(pattern: str, flags: int = 0) -> re.Pattern:
+    regex = "".join(".*" if ch in "%*" else "." if ch == "_" else re.escape(ch) for ch in pattern)
+    return re.compile(f"^{regex}$", flags | re.S)
+
+
+def _split_list(text: str) -> list[str]:
+    """Split the body of ``in.(a,"b,c")``."""
+    values, current, quoted = [], [], False
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif char == "," and not quoted:
+            values.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    values.append("".join(current))
+    return values
+
+
+def _apply(op: str, value: Any, literal: str) -> bool:
+    if op == "is":
+        expected = {"null": None, "true": True, "false": False}.get(literal.lower(), literal)
+        return value is expected if expected is None else value == expected
+    if value is None:
+        return False
+    if op == "in":
+        options = _split_list(literal.strip("()"))
+        return any(_apply("eq", value, option) for option in options)
+    if op in ("like", "ilike"):
+        return bool(_like(literal, re.I if op == "ilike" else 0).match(str(value)))
+    compare = _COMPARISONS.get(op)
+    if compare is None:
+        raise PostgrestError(400, "PGRST100", f'"{op}" is not a supported operator')
+    left, right = _coerce(value, literal)
+    try:
+        return compare(left, right)
+    except TypeError:
+        return False
+
+
+def parse_condition(key: str, expression: str) -> Condition:
+    """``col``/``embed.col`` plus ``[not.]op.value`` into a :class:`Condition`."""
+    *embed_path, column_spec = key.split(".")
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, value = expression.partition(".")
+    column = _JSON_PATH.split(column_spec, 1)[0]
+    return Condition(column, _JSON_PATH.findall(column_spec), op, value, negate, tuple(embed_path))
+
+
+def parse_or(key: str, expression: str) -> AnyOf:
+    """``or=(a.ilike.%x%,b.eq.1)``, optionally scoped as ``embed.or``."""
+    embed_path = tuple(key.split(".")[:-1])
+    conditions = []
+    for part in _split_top_level(expression.strip("()")):
+        column, rest = part.split(".", 1)
+        conditions.append(parse_condition(column, rest))
+    return AnyOf(conditions, embed_path)
+
+
+def _indexed(table: Table, column: str) -> bool:
+    # Key columns hold uuids as strings, so an index hit means "eq" would match.
+    spec = table.columns.get(column)
+    return spec is not None and spec.type == "string" and (column == "id" or column.endswith("_id"))
+
+
+# --- queries --------------------------------------------------------------
+
+
+@dataclass
+class Query:
+    select: list
+    filters: list = field(default_factory=list)
+    order: list[tuple[str, bool, bool | None]] = field(default_factory=list)
+    limit: int | None = None
+    offset: int = 0
+    on_conflict: str | None = None
+
+    @classmethod
+    def from_params(cls, params: Iterable[tuple[str, str]]) -> "Query":
+        query = cls(select=["*"])
+        for key, value in params:
+            if key == "select":
+                query.select = parse_select(value)
+            elif key == "order":
+                query.order = [_parse_order(term) for term in value.split(",") if term]
+            elif key == "limit":
+                query.limit = int(value)
+            elif key == "offset":
+                query.offset = int(value)
+            elif key == "on_conflict":
+                query.on_conflict = value
+            elif key in RESERVED_PARAMS:
+                continue
+            elif key == "or" or key.endswith(".or"):
+                query.filters.append(parse_or(key, value))
+            else:
+                query.filters.append(parse_condition(key, value))
+        return query
+
+    def top_filters(self) -> list:
+        return [f for f in self.filters if not f.embed_path]
+
+    def embed_filters(self, path: tuple[str, ...]) -> list:
+        return [f for f in self.filters if f.embed_path == path]
+
+
+def _parse_order(term: str) -> tuple[str, bool, bool | None]:
+    column, *modifiers = term.split(".")
+    descending = "desc" in modifiers
+    nulls_first = True if "nullsfirst" in modifiers else False if "nullslast" in modifiers else None
+    return column, descending, nulls_first
+
+
+def _sort(rows: list[dict[str, Any]], order: list[tuple[str, bool, bool | None]]) -> list[dict[str, Any]]:
+    # Stable sorts applied from the last key to the first.
+    for column, descending, nulls_first in reversed(order):
+        if nulls_first is None:
+            nulls_first = descending  # PostgreSQL default
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: r[column], reverse=descending)
+        rows = missing + present if nulls_first else present + missing
+    return rows
+
+
+class Store:
+    """Thread-safe in-memory tables shaped after ``types.ts``."""
+
+    def __init__(self, schema: dict[str, Table]):
+        self.schema = schema
+        self.tables: dict[str, list[dict[str, Any]]] = {name: [] for name in schema}
+        # table -> column -> value -> row positions; see _index.
+        self.indexes: dict[str, dict[str, defaultdict[Any, list[int]]]] = {name: {} for name in schema}
+        self.lock = threading.RLock()
+
+    def table(self, name: str) -> Table:
+        try:
+            return self.schema[name]
+        except KeyError:
+            raise PostgrestError(404, "42P01", f'relation "public.{name}" does not exist') from None
+
+    # Indexes ------------------------------------------------------------
+
+    def _index(self, name: str, column: str) -> defaultdict[Any, list[int]]:
+        """Positions of the rows of ``name`` by ``column``, built on first use.
+
+        Appends keep every index current; updates to an indexed column and
+        deletes drop the table's indexes, to be rebuilt by the next lookup.
+        """
+        index = self.indexes[name].get(column)
+        if index is None:
+            index = self.indexes[name][column] = defaultdict(list)
+            for position, row in enumerate(self.tables[name]):
+                index[row.get(column)].append(position)
+        return index
+
+    def _lookup(self, name: str, column: str, values: Iterable[Any]) -> list[dict[str, Any]]:
+        """Rows whose ``column`` is one of ``values``, in table order."""
+        index, rows = self._index(name, column), self.tables[name]
+        return [rows[p] for p in sorted(chain.from_iterable(index.get(v, ()) for v in set(values)))]
+
+    def _appended(self, name: str, start: int) -> None:
+        rows = self.tables[name]
+        for column, index in self.indexes[name].items():
+            for position in range(start, len(rows)):
+                index[rows[position].get(column)].append(position)
+
+    def _candidates(self, table: Table, query: Query) -> list[dict[str, Any]]:
+        """The rows ``query`` can match: an index lookup when it filters on a key column."""
+        for item in query.top_filters():
+            values = item.key_values(table) if isinstance(item, Condition) else None
+            if values is not None:
+                return self._lookup(table.name, item.column, values)
+        return self.tables[table.name]
+
+    # Rows ---------------------------------------------------------------
+
+    def new_row(self, table: Table, values: dict[str, Any]) -> dict[str, Any]:
+        unknown = set(values) - set(table.columns)
+        if unknown:
+            column = sorted(unknown)[0]
+            raise PostgrestError(400, "PGRST204", f"Could not find the '{column}' column of '{table.name}' in the schema cache")
+        row = {}
+        for name, column in table.columns.items():
+            if name in values:
+                row[name] = values[name]
+            elif name == "id":
+                row[name] = str(uuid.uuid4())
+            elif name in ("created_at", "updated_at") or (name.endswith("_at") and not column.nullable):
+                row[name] = now_iso()
+            else:
+                row[name] = column.default()
+        return row
+
+    def insert(self, name: str, values: list[dict[str, Any]], upsert_on: str | None = None, ignore_duplicates: bool = False) -> list[dict[str, Any]]:
+        table = self.table(name)
+        with self.lock:
+            rows = self.tables[name]
+            written = []
+            for item in values:
+                existing = None
+                if upsert_on:
+                    keys = upsert_on.split(",")
+                    candidates = self._lookup(name, keys[0], [item.get(keys[0])]) if _indexed(table, keys[0]) else rows
+                    existing = next((r for r in candidates if all(r.get(k) == item.get(k) for k in keys)), None)
+                if existing is not None:
+                    if not ignore_duplicates:
+                        existing.update(self.new_row(table, {**existing, **item}))
+                        self.indexes[name].clear()
+                        written.append(existing)
+                    continue
+                row = self.new_row(table, item)
+                if "id" in row and self._index(name, "id").get(row["id"]):
+                    raise PostgrestError(409, "23505", f'duplicate key value violates unique constraint "{name}_pkey"')
+                rows.append(row)
+                self._appended(name, len(rows) - 1)
+                written.append(row)
+            return written
+
+    def bulk_load(self, name: str, rows: Iterable[dict[str, Any]]) -> int:
+        """Append pre-built rows without per-row checks (seeding fast path)."""
+        table = self.table(name)
+        with self.lock:
+            target = self.tables[table.name]
+            before = len(target)
+            target.extend(rows)
+            self._appended(table.name, before)
+            return len(target) - before
+
+    def update(self, name: str, query: Query, values: dict[str, Any]) -> list[dict[str, Any]]:
+        table = self.table(name)
+        unknown = set(values) - set(table.columns)
+        if unknown:
+            raise PostgrestError(400, "PGRST204", f"Could not find the '{sorted(unknown)[0]}' column of '{name}' in the schema cache")
+        with self.lock:
+            matched = self._filter(table, self._candidates(table, query), query)
+            for row in matched:
+                row.update(values)
+                if "updated_at" in table.columns and "updated_at" not in values:
+                    row["updated_at"] = now_iso()
+            for column in set(values) & set(self.indexes[name]):
+                del self.indexes[name][column]
+            return matched
+
+    def delete(self, name: str, query: Query) -> list[dict[str, Any]]:
+        table = self.table(name)
+        with self.lock:
+            matched = self._filter(table, self._candidates(table, query), query)
+            ids = {id(r) for r in matched}
+            self.tables[name] = [r for r in self.tables[name] if id(r) not in ids]
+            self.indexes[name].clear()
+            return matched
+
+    def select(self, name: str, query: Query) -> tuple[list[dict[str, Any]], int]:
+        """Return the projected page of rows and the total match count."""
+        table = self.table(name)
+        with self.lock:
+            matched = self._filter(table, self._candidates(table, query), query)
+            total = len(matched)
+            rows = _sort(matched, query.order)
+            end = None if query.limit is None else query.offset + query.limit
+            page = rows[query.offset : end]
+            return [self.project(table, row, query.select, query) for row in page], total
+
+    # Evaluation -----------------------------------------------------------
+
+    @staticmethod
+    def _check_columns(table: Table, filters: list) -> None:
+        for item in filters:
+            for condition in item.conditions if isinstance(item, AnyOf) else [item]:
+                if condition.column not in table.columns:
+                    raise PostgrestError(400, "42703", f"column {table.name}.{condition.column} does not exist")
+
+    def _filter(self, table: Table, rows: list[dict[str, Any]], query: Query) -> list[dict[str, Any]]:
+        conditions = query.top_filters()
+        self._check_columns(table, conditions)
+        inner = [item for item in query.select if isinstance(item, Embed) and item.inner]
+        matched = []
+        for row in rows:
+            if not all(c.matches(row) for c in conditions):
+                continue
+            if any(not self._embedded_rows(table, row, embed, query, (embed.alias,)) for embed in inner):
+                continue
+            matched.append(row)
+        return matched
+
+    def _relation(self, parent: Table, embed: Embed) -> tuple[Table, str, str, bool]:
+        """Resolve an embed to (target table, parent column, target column, returns_many)."""
+        target = self.schema.get(embed.target)
+        if target is None:
+            # ``agent:agent_id(...)`` style: embed through a foreign-key column
+            fk = next((fk for fk in parent.foreign_keys if fk.column == embed.target), None)
+            if fk is None:
+                raise PostgrestError(400, "PGRST200", f"Could not find a relationship between '{parent.name}' and '{embed.target}'")
+            return self.schema[fk.table], fk.column, fk.referenced_column, False
+        for fk in parent.foreign_keys:
+            if fk.table == target.name and (embed.hint in (None, fk.column)):
+                return target, fk.column, fk.referenced_column, False
+        for fk in target.foreign_keys:
+            if fk.table == parent.name and (embed.hint in (None, fk.column)):
+                return target, fk.referenced_column, fk.column, not fk.one_to_one
+        raise PostgrestError(400, "PGRST200", f"Could not find a relationship between '{parent.name}' and '{target.name}'")
+
+    def _embedded_rows(self, parent: Table, row: dict[str, Any], embed: Embed, query: Query, path: tuple[str, ...]) -> list[dict[str, Any]]:
+        target, parent_column, target_column, _ = self._relation(parent, embed)
+        key = row.get(parent_column)
+        if key is None:
+            return []
+        conditions = query.embed_filters(path)
+        self._check_columns(target, conditions)
+        nested_inner = [item for item in embed.items if isinstance(item, Embed) and item.inner]
+        related = []
+        candidates = self._lookup(target.name, target_column, [key]) if _indexed(target, target_column) else self.tables[target.name]
+        for candidate in candidates:
+            if candidate.get(target_column) != key or not all(c.matches(candidate) for c in conditions):
+                continue
+            if any(not self._embedded_rows(target, candidate, sub, query, path + (sub.alias,)) for sub in nested_inner):
+                continue
+            related.append(candidate)
+        return related
+
+    def project(self, table: Table, row: dict[str, Any], items: list, query: Query, path: tuple[str, ...] = ()) -> dict[str, Any]:
+        result: dict[str, Any] = {}
+        for item in items:
+            if item == "*":
+                result.update(row)
+            elif isinstance(item, Field):
+                if item.name not in table.columns:
+                    raise PostgrestError(400, "42703", f"column {table.name}.{item.name} does not exist")
+                result[item.alias] = _extract(row.get(item.name), item.json_path)
+            else:
+                sub_path = path + (item.alias,)
+                target, _, _, many = self._relation(table, item)
+                related = self._embedded_rows(table, row, item, query, sub_path)
+                projected = [self.project(target, r, item.items, query, sub_path) for r in related]
+                result[item.alias] = projected if many else (projected[0] if projected else None)
+        return result
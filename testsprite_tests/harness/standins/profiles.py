@@ -0,0 +1,80 @@
+"""Latency distributions and error injection for the stand-in servers.
+
+Latency specs are ``kind:params`` strings, all in milliseconds::
+
+    fixed:120            always 120 ms
+    uniform:50,300       uniformly between 50 and 300 ms
+    normal:400,80        mean 400, standard deviation 80 (clamped at 0)
+    lognormal:800,0.5    median 800, sigma 0.5 - long right tail like real APIs
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+
+
+def parse_latency(spec: str):
+    """Turn a latency spec into a ``rng -> milliseconds`` sampler."""
+    kind, _, raw = spec.partition(":")
+    try:
+        params = [float(p) for p in raw.split(",")] if raw else []
+        if kind == "fixed":
+            (value,) = params or [0.0]
+            return lambda rng: value
+        if kind == "uniform":
+            low, high = params
+            return lambda rng: rng.uniform(low, high)
+        if kind == "normal":
+            mean, sd = params
+            return lambda rng: max(0.0, rng.gauss(mean, sd))
+        if kind == "lognormal":
+            median, sigma = params
+            return lambda rng: rng.lognormvariate(math.log(median), sigma)
+    except ValueError:
+        pass
+    raise ValueError(f"invalid latency spec {spec!r}")
+
+
+@dataclass
+class ResponseProfile:
+    """How a stand-in endpoint behaves: how slow, and how often it fails."""
+
+    latency: str = "fixed:0"
+    error_rate: float = 0.0
+    error_status: int = 500
+    seed: int | None = None
+    _rng: random.Random = field(init=False, repr=False)
+    _lock: threading.Lock = field(init=False, repr=False, default_factory=threading.Lock)
+
+    def __post_init__(self) -> None:
+        if not 0.0 <= self.error_rate <= 1.0:
+            raise ValueError("error_rate must be between 0 and 1")
+        self._sampler = parse_latency(self.latency)
+        self._rng = random.Random(self.seed)
+
+    def draw(self) -> tuple[float, bool]:
+        """Sample ``(delay_ms, fail)`` for one request."""
+        with self._lock:
+            return self._sampler(self._rng), self._rng.random() < self.error_rate
+
+    def apply(self) -> tuple[float, bool]:
+        """Sleep for a sampled delay and say whether to answer with an error."""
+        delay_ms, fail = self.draw()
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+        return delay_ms, fail
+
+
+def add_profile_arguments(parser, default_latency: str = "fixed:0") -> None:
+    parser.add_argument("--latency", default=default_latency, help="latency spec, e.g. lognormal:800,0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--seed", type=int, help="seed for repeatable latency/error draws")
+
+
+def profile_from_args(args) -> ResponseProfile:
+    return ResponseProfile(args.latency, args.error_rate, args.error_status, args.seed)
@@ -0,0 +1,74 @@
+"""Table definitions read from the generated ``types.ts``.
+
+The Supabase type generator writes every table as a ``Row`` block plus a
+``Relationships`` list; that is all the stand-ins need to validate
+columns, fill defaults and resolve embedded selects.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+from ..config import SUITE_DIR
+
+TYPES_PATH = SUITE_DIR.parent / "src" / "integrations" / "supabase" / "types.ts"
+
+_TABLE = re.compile(r"^      (\w+): \{\n        Row: \{\n(.*?)^        \}\n.*?^        Relationships: \[(.*?)\]\n      \}", re.M | re.S)
+_COLUMN = re.compile(r"^          (\w+): (.+)$", re.M)
+_RELATION = re.compile(
+    r'columns: \["(\w+)"\]\s*isOneToOne: (true|false)\s*referencedRelation: "(\w+)"\s*referencedColumns: \["(\w+)"\]', re.S
+)
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    type: str
+    nullable: bool
+
+    def default(self):
+        """Value for a required column left out of an insert."""
+        if self.nullable:
+            return None
+        return {"number": 0, "boolean": False, "Json": {}}.get(self.type, "")
+
+
+@dataclass(frozen=True)
+class ForeignKey:
+    column: str
+    table: str
+    referenced_column: str
+    one_to_one: bool
+
+
+@dataclass
+class Table:
+    name: str
+    columns: dict[str, Column]
+    foreign_keys: list[ForeignKey] = field(default_factory=list)
+
+
+def parse_types(source: str) -> dict[str, Table]:
+    tables = {}
+    tables_block = source[source.index("    Tables: {") : source.index("    Views: {")]
+    for match in _TABLE.finditer(tables_block):
+        name, row, relationships = match.groups()
+        columns = {}
+        for col, ts_type in _COLUMN.findall(row):
+            parts = [p.strip() for p in ts_type.split("|")]
+            base = next((p for p in parts if p != "null"), "string")
+            columns[col] = Column(col, base, "null" in parts)
+        fks = [
+            ForeignKey(column, table, referenced, one_to_one == "true")
+            for column, one_to_one, table, referenced in _RELATION.findall(relationships)
+        ]
+        tables[name] = Table(name, columns, fks)
+    return tables
+
+
+@lru_cache(maxsize=None)
+def load_schema(path: Path = TYPES_PATH) -> dict[str, Table]:
+    return parse_types(path.read_text(encoding="utf-8"))
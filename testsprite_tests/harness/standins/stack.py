@@ -0,0 +1,144 @@
+"""Run the Supabase, Evolution API and OpenAI stand-ins together.
+
+    python -m harness.standins [--openai-latency lognormal:900,0.5] [--evolution-error-rate 0.02]
+
+The stack wires the webhook's dependencies to each other: every active
+seeded agent gets a WhatsApp connection (instance ``standin-<n>``) whose
+credentials point at the Evolution stand-in, and :meth:`StandinStack.env`
+gives the variables for ``supabase functions serve --env-file``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any
+
+from ..config import TMP_DIR
+from .evolution import EvolutionStandin, encrypt_credentials
+from .openai import OpenAIStandin
+from .postgrest import Query
+from .profiles import ResponseProfile
+from .supabase import SupabaseStandin, load_seed
+
+CALLS_DIR = TMP_DIR / "standin_calls"
+EVOLUTION_API_KEY = "standin-evolution-key"
+SERVICE_ROLE_KEY = "standin-service-role-key"
+FLUSH_INTERVAL_S = 1.0
+
+
+class StandinStack:
+    """The three stand-ins plus the seed data that connects them."""
+
+    def __init__(
+        self,
+        supabase: SupabaseStandin,
+        evolution: EvolutionStandin,
+        openai: OpenAIStandin,
+        encryption_key: str | None = None,
+    ):
+        self.supabase = supabase
+        self.evolution = evolution
+        self.openai = openai
+        self.encryption_key = encryption_key or os.urandom(32).hex()
+        self.instances: dict[str, str] = {}
+        self._stack = ExitStack()
+
+    def start(self) -> "StandinStack":
+        for server in (self.supabase, self.evolution, self.openai):
+            self._stack.enter_context(server)
+        self.instances = self.connect_agents()
+        return self
+
+    def stop(self) -> None:
+        self._stack.close()
+
+    def __enter__(self) -> "StandinStack":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def connect_agents(self) -> dict[str, str]:
+        """Give each active agent a WhatsApp connection; returns instance -> agent id."""
+        credentials = encrypt_credentials({"baseUrl": self.evolution.url, "apiKey": EVOLUTION_API_KEY}, self.encryption_key)
+        agents, _ = self.supabase.store.select("agents", Query.from_params([("is_active", "eq.true")]))
+        instances = {f"standin-{n}": agent["id"] for n, agent in enumerate(agents)}
+        self.supabase.store.insert(
+            "agent_connections",
+            [
+                {
+                    "agent_id": agent_id,
+                    "connection_type": "whatsapp",
+                    "credentials_encrypted": credentials,
+                    "is_active": True,
+                    "metadata": {"instanceName": instance},
+                }
+                for instance, agent_id in instances.items()
+            ],
+        )
+        return instances
+
+    def env(self) -> dict[str, str]:
+        """Environment for the edge functions so they talk only to the stand-ins."""
+        return {
+            "SUPABASE_URL": self.supabase.url,
+            "SUPABASE_SERVICE_ROLE_KEY": SERVICE_ROLE_KEY,
+            "ENCRYPTION_KEY": self.encryption_key,
+            "OPENAI_API_KEY": "standin-openai-key",
+            "OPENAI_BASE_URL": self.openai.base_url,
+        }
+
+    def write_calls(self, directory: Path = CALLS_DIR, drain: bool = False) -> dict[str, int]:
+        """Append each stand-in's call log to ``<directory>/<name>.jsonl``."""
+        return {
+            name: server.write_calls(directory / f"{name}.jsonl", drain)
+            for name, server in (("supabase", self.supabase), ("evolution", self.evolution), ("openai", self.openai))
+        }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.standins", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--supabase-port", type=int, default=54321)
+    parser.add_argument("--evolution-port", type=int, default=8081)
+    parser.add_argument("--openai-port", type=int, default=8082)
+    parser.add_argument("--seed", type=Path, help="JSON seed for the Supabase stand-in")
+    parser.add_argument("--encryption-key", help="hex AES-256 key shared with the functions (default: random)")
+    for name, latency in (("evolution", "lognormal:300,0.4"), ("openai", "lognormal:900,0.5")):
+        parser.add_argument(f"--{name}-latency", default=latency, help="latency spec, see harness.standins.profiles")
+        parser.add_argument(f"--{name}-error-rate", type=float, default=0.0)
+    parser.add_argument("--profile-seed", type=int, help="seed for repeatable latency/error draws")
+    parser.add_argument("--env-file", type=Path, help="also write the functions' environment here")
+    args = parser.parse_args(argv)
+
+    stack = StandinStack(
+        SupabaseStandin(args.host, args.supabase_port, load_seed(args.seed) if args.seed else None),
+        EvolutionStandin(
+            args.host,
+            args.evolution_port,
+            ResponseProfile(args.evolution_latency, args.evolution_error_rate, seed=args.profile_seed),
+            api_key=EVOLUTION_API_KEY,
+        ),
+        OpenAIStandin(args.host, args.openai_port, ResponseProfile(args.openai_latency, args.openai_error_rate, seed=args.profile_seed)),
+        args.encryption_key,
+    )
+    with stack:
+        env = "".join(f"{key}={value}\n" for key, value in stack.env().items())
+        if args.env_file:
+            args.env_file.write_text(env, encoding="utf-8")
+        print(env + "instances: " + ", ".join(stack.instances), flush=True)
+        # Flush call logs as we go so harness.stages can correlate them mid-run.
+        try:
+            while True:
+                time.sleep(FLUSH_INTERVAL_S)
+                stack.write_calls(drain=True)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stack.write_calls(drain=True)
+            print(f"call logs written to {CALLS_DIR}")
+    return 0
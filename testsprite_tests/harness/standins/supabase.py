@@ -0,0 +1,351 @@
+"""Local stand-in for the Supabase REST (PostgREST) and auth (GoTrue) APIs.
+
+    python -m harness.standins.supabase [--port 54321] [--seed data.json]
+
+Serves the tables of ``src/integrations/supabase/types.ts`` from memory,
+seeded with a small tenant owned by the ``config.json`` login user, so the
+suite can run without the remote project.  The app keeps its hard-coded
+project URL; :func:`redirect_supabase` reroutes a browser context's
+Supabase traffic to the stand-in.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from ..config import load_config, supabase_url
+from .base import Call, JsonHandler, StandinServer
+from .postgrest import PostgrestError, Query, Store, now_iso
+from .schema import load_schema
+
+JWT_SECRET = b"standin-jwt-secret"
+TOKEN_TTL_S = 3600
+OBJECT_MEDIA_TYPE = "application/vnd.pgrst.object+json"
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def make_jwt(claims: dict[str, Any]) -> str:
+    header = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    payload = _b64(json.dumps(claims).encode())
+    signature = hmac.new(JWT_SECRET, f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    return f"{header}.{payload}.{_b64(signature)}"
+
+
+def read_jwt(token: str) -> dict[str, Any] | None:
+    """Claims of a token this stand-in issued, or ``None`` if invalid or expired."""
+    try:
+        header, payload, signature = token.split(".")
+    except ValueError:
+        return None
+    expected = hmac.new(JWT_SECRET, f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    if not hmac.compare_digest(_b64(expected), signature):
+        return None
+    claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    return claims if claims.get("exp", 0) > time.time() else None
+
+
+def default_seed(config: dict[str, Any] | None = None) -> dict[str, list[dict[str, Any]]]:
+    """One organization owned by the login user, with a little of everything."""
+    config = load_config() if config is None else config
+    email = config.get("loginUser") or "user@example.com"
+    now = datetime.now(timezone.utc)
+
+    def at(**delta: float) -> str:
+        return (now + timedelta(**delta)).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+    user_id, org_id, plan_id = str(uuid.uuid4()), str(uuid.uuid4()), str(uuid.uuid4())
+    agents = [
+        {"id": str(uuid.uuid4()), "organization_id": org_id, "name": name, "is_active": active}
+        for name, active in (("Assistente de Vendas", True), ("Suporte", True), ("Agendamentos", False))
+    ]
+    conversations, messages, appointments = [], [], []
+    for index, agent in enumerate(agents):
+        for n in range(3):
+            conversation_id = str(uuid.uuid4())
+            phone = f"55119{index}{n:07d}"
+            conversations.append(
+                {
+                    "id": conversation_id,
+                    "agent_id": agent["id"],
+                    "whatsapp_number": phone,
+                    "contact_name": f"Cliente {index}{n}",
+                    "status": "active" if n else "closed",
+                    "last_message_at": at(minutes=-n),
+                }
+            )
+            for m in range(4):
+                messages.append(
+                    {
+                        "agent_id": agent["id"],
+                        "conversation_id": conversation_id,
+                        "content": f"Mensagem {m}",
+                        "direction": "inbound" if m % 2 == 0 else "outbound",
+                        "sent_at": at(minutes=-(n * 10 + m)),
+                    }
+                )
+        appointments.append(
+            {
+                "agent_id": agent["id"],
+                "title": "Reunião",
+                "attendee_name": f"Cliente {index}0",
+                "attendee_phone": f"55119{index}0000000",
+                "start_time": at(hours=2),
+                "end_time": at(hours=3),
+                "status": "scheduled",
+            }
+        )
+    return {
+        "users": [{"id": user_id, "email": email, "full_name": "Test User", "role": "user"}],
+        "subscription_plans": [
+            {"id": plan_id, "name": "Pro", "slug": "pro", "price_monthly": 99, "max_agents": 5, "max_messages_per_month": 10000, "is_active": True}
+        ],
+        "organizations": [{"id": org_id, "name": "Organização Teste", "slug": "organizacao-teste", "owner_id": user_id, "status": "active", "subscription_plan_id": plan_id}],
+        "organization_members": [{"organization_id": org_id, "user_id": user_id, "role": "owner"}],
+        "subscriptions": [
+            {"organization_id": org_id, "plan_id": plan_id, "status": "active", "current_period_start": at(days=-1), "current_period_end": at(days=29)}
+        ],
+        "agents": agents,
+        "agent_configurations": [{"agent_id": a["id"], "custom_prompt": "Você é um assistente.", "temperature": 0.7, "max_tokens": 1000} for a in agents],
+        "conversations": conversations,
+        "messages": messages,
+        "appointments": appointments,
+    }
+
+
+class SupabaseHandler(JsonHandler):
+    """Routes ``/rest/v1`` to the store and ``/auth/v1`` to the fake GoTrue."""
+
+    def handle_request(self, call: Call) -> None:
+        owner: SupabaseStandin = self.server.owner
+        if owner.latency_s:
+            time.sleep(owner.latency_s)
+        try:
+            if call.path.startswith("/rest/v1/"):
+                self._rest(owner, call, call.path[len("/rest/v1/") :].strip("/"))
+            elif call.path.startswith("/auth/v1/"):
+                self._auth(owner, call, call.path[len("/auth/v1/") :].strip("/"))
+            else:
+                self.send_json(404, {"message": f"no route for {call.path}"})
+        except PostgrestError as exc:
+            self.send_json(exc.status, exc.body)
+
+    # REST ------------------------------------------------------------------
+
+    def _prefer(self) -> dict[str, str]:
+        prefs = {}
+        for part in (self.headers.get("Prefer") or "").split(","):
+            key, _, value = part.strip().partition("=")
+            if key:
+                prefs[key] = value
+        return prefs
+
+    def _rest(self, owner: "SupabaseStandin", call: Call, table: str) -> None:
+        call.meta["table"] = table
+        query = Query.from_params(call.query)
+        prefer = self._prefer()
+        single = OBJECT_MEDIA_TYPE in (self.headers.get("Accept") or "")
+        store = owner.store
+
+        if call.method in ("GET", "HEAD"):
+            if owner.max_rows is not None and (query.limit is None or query.limit > owner.max_rows):
+                # PostgREST's db-max-rows caps every response (Supabase projects default to 1000).
+                query.limit = owner.max_rows
+            rows, total = store.select(table, query)
+            headers = {}
+            if prefer.get("count"):
+                first = query.offset
+                headers["Content-Range"] = f"{first}-{first + len(rows) - 1}/{total}" if rows else f"*/{total}"
+            self._respond_rows(rows, single, 200, headers)
+            return
+
+        if call.method == "POST":
+            values = call.body if isinstance(call.body, list) else [call.body or {}]
+            resolution = prefer.get("resolution")
+            upsert_on = (query.on_conflict or "id") if resolution else None
+            written = store.insert(table, values, upsert_on, resolution == "ignore-duplicates")
+            status = 201
+        elif call.method == "PATCH":
+            written = store.update(table, query, call.body or {})
+            status = 200
+        elif call.method == "DELETE":
+            written = store.delete(table, query)
+            status = 200
+        else:
+            self.send_json(405, {"message": f"{call.method} not supported"})
+            return
+
+        if prefer.get("return") != "representation":
+            self.send_json(204 if status == 200 else status, None)
+            return
+        schema = store.table(table)
+        rows = [store.project(schema, row, query.select, query) for row in written]
+        self._respond_rows(rows, single, status, {})
+
+    def _respond_rows(self, rows: list[dict[str, Any]], single: bool, status: int, headers: dict[str, str]) -> None:
+        if not single:
+            self.send_json(status, rows, headers)
+        elif len(rows) == 1:
+            self.send_json(status, rows[0], headers)
+        else:
+            self.send_json(
+                406,
+                {
+                    "code": "PGRST116",
+                    "message": "JSON object requested, multiple (or no) rows returned",
+                    "details": f"The result contains {len(rows)} rows",
+                    "hint": None,
+                },
+            )
+
+    # Auth ------------------------------------------------------------------
+
+    def _auth(self, owner: "SupabaseStandin", call: Call, route: str) -> None:
+        body = call.body if isinstance(call.body, dict) else {}
+        params = dict(call.query)
+        if route == "token" and params.get("grant_type") == "password":
+            user = owner.authenticate(body.get("email", ""), body.get("password", ""))
+            if user is None:
+                self.send_json(400, {"error": "invalid_grant", "error_description": "Invalid login credentials"})
+            else:
+                self.send_json(200, owner.new_session(user))
+        elif route == "token" and params.get("grant_type") == "refresh_token":
+            user = owner.refresh_tokens.pop(body.get("refresh_token", ""), None)
+            if user is None:
+                self.send_json(400, {"error": "invalid_grant", "error_description": "Invalid Refresh Token"})
+            else:
+                self.send_json(200, owner.new_session(user))
+        elif route == "signup":
+            user = owner.sign_up(body.get("email", ""), body.get("password", ""), body.get("data") or {})
+            self.send_json(200, owner.new_session(user))
+        elif route == "user":
+            claims = read_jwt((self.headers.get("Authorization") or "").removeprefix("Bearer ").strip())
+            user = owner.auth_users.get(claims["sub"]) if claims else None
+            if user is None:
+                self.send_json(401, {"code": 401, "msg": "invalid JWT"})
+            else:
+                self.send_json(200, user)
+        elif route == "logout":
+            self.send_json(204, None)
+        else:
+            self.send_json(404, {"message": f"auth route {route} not implemented"})
+
+
+class SupabaseStandin(StandinServer):
+    """REST and auth stand-in backed by an in-memory :class:`Store`."""
+
+    handler = SupabaseHandler
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: dict[str, list[dict[str, Any]]] | None = None,
+        latency_ms: float = 0,
+        max_rows: int | None = None,
+    ):
+        super().__init__(host, port)
+        self.store = Store(load_schema())
+        self.latency_s = latency_ms / 1000
+        self.max_rows = max_rows
+        self.auth_users: dict[str, dict[str, Any]] = {}
+        self.passwords: dict[str, str] = {}
+        self.refresh_tokens: dict[str, dict[str, Any]] = {}
+        self.seed(default_seed() if seed is None else seed)
+
+    def seed(self, data: dict[str, list[dict[str, Any]]]) -> None:
+        """Insert ``data`` (table -> rows) and give every ``users`` row a login."""
+        for table, rows in data.items():
+            self.store.insert(table, rows)
+        password = load_config().get("loginPassword", "")
+        for row in data.get("users", []):
+            self.add_auth_user(row["id"], row["email"], password)
+
+    def add_auth_user(self, user_id: str, email: str, password: str, metadata: dict[str, Any] | None = None) -> dict[str, Any]:
+        user = {
+            "id": user_id,
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": email,
+            "email_confirmed_at": now_iso(),
+            "user_metadata": metadata or {},
+            "app_metadata": {"provider": "email"},
+            "created_at": now_iso(),
+        }
+        self.auth_users[user_id] = user
+        self.passwords[email.lower()] = password
+        return user
+
+    def authenticate(self, email: str, password: str) -> dict[str, Any] | None:
+        if self.passwords.get(email.lower()) != password:
+            return None
+        return next((u for u in self.auth_users.values() if u["email"].lower() == email.lower()), None)
+
+    def sign_up(self, email: str, password: str, metadata: dict[str, Any]) -> dict[str, Any]:
+        user = self.add_auth_user(str(uuid.uuid4()), email, password, metadata)
+        self.store.insert("users", [{"id": user["id"], "email": email, "full_name": metadata.get("full_name")}])
+        return user
+
+    def new_session(self, user: dict[str, Any]) -> dict[str, Any]:
+        expires_at = int(time.time()) + TOKEN_TTL_S
+        refresh_token = uuid.uuid4().hex
+        self.refresh_tokens[refresh_token] = user
+        token = make_jwt({"sub": user["id"], "email": user["email"], "role": "authenticated", "aud": "authenticated", "exp": expires_at})
+        return {
+            "access_token": token,
+            "token_type": "bearer",
+            "expires_in": TOKEN_TTL_S,
+            "expires_at": expires_at,
+            "refresh_token": refresh_token,
+            "user": user,
+        }
+
+
+async def redirect_supabase(context, standin_url: str, project_url: str | None = None) -> None:
+    """Serve a Playwright context's Supabase requests from the stand-in.
+
+    ``route.continue_`` cannot switch from https to http, so requests are
+    fetched from the stand-in and fulfilled with its response.
+    """
+    project_url = (project_url or supabase_url()).rstrip("/")
+    standin_url = standin_url.rstrip("/")
+
+    async def handler(route) -> None:
+        url = route.request.url.replace(project_url, standin_url, 1)
+        response = await route.fetch(url=url)
+        await route.fulfill(response=response)
+
+    await context.route(f"{project_url}/**", handler)
+
+
+def load_seed(path: Path) -> dict[str, list[dict[str, Any]]]:
+    with path.open(encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.standins.supabase", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--seed", type=Path, help="JSON file mapping table names to rows (default: built-in tenant)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="artificial delay added to every request")
+    parser.add_argument("--max-rows", type=int, help="cap rows per response like PostgREST's db-max-rows (default: none)")
+    args = parser.parse_args(argv)
+    seed = load_seed(args.seed) if args.seed else None
+    SupabaseStandin(args.host, args.port, seed, args.latency_ms, args.max_rows).serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
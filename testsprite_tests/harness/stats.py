@@ -0,0 +1,26 @@
+"""Small latency-statistics helpers shared by the benchmark tools."""
+
+from __future__ import annotations
+
+import math
+from typing import Iterable, Sequence
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values (``q`` in 0-100)."""
+    if not sorted_values:
+        return math.nan
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(values: Iterable[float], percentiles: Sequence[int] = PERCENTILES) -> dict[str, float]:
+    """Count, mean, max and the requested percentiles, rounded to 0.1 ms."""
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+    summary = {"count": len(ordered), "mean": sum(ordered) / len(ordered), "max": ordered[-1]}
+    summary.update({f"p{q}": percentile(ordered, q) for q in percentiles})
+    return {key: value if key == "count" else round(value, 1) for key, value in summary.items()}
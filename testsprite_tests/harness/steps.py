@@ -0,0 +1,160 @@
+"""Step library for TCs compiled from the test plan (see :mod:`harness.compiler`).
+
+A compiled TC is a list of :class:`Step` records - an action name from
+:data:`ACTIONS`, its arguments and the plan text it came from - run in
+order on one page by :func:`run`.  Steps are plain data so a compiled
+module is just their ``repr``, and the launch code lives here once
+instead of in every script.
+
+Form values may be tokens (:data:`VALUES`) resolved when the step runs:
+``$login_email``/``$login_password`` come from ``config.json``,
+``$new_email`` is a fresh address reused by later steps of the same run.
+"""
+
+from __future__ import annotations
+
+import re
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Sequence
+
+from playwright.async_api import BrowserContext, Page, expect
+
+from . import auth, waits
+from .config import base_url, load_config
+from .pool import BrowserPool
+
+EXPECT_TIMEOUT_MS = 10000
+
+VALUES: dict[str, Callable[[dict[str, Any]], str]] = {
+    "$login_email": lambda state: load_config().get("loginUser", ""),
+    "$login_password": lambda state: load_config().get("loginPassword", ""),
+    "$new_email": lambda state: state.setdefault("new_email", f"teste+{uuid.uuid4().hex[:10]}@example.com"),
+    "$invalid_email": lambda state: "email-invalido",
+    "$wrong_password": lambda state: "senha-incorreta-123",
+    "$password": lambda state: "Senha@12345",
+}
+
+
+@dataclass(frozen=True)
+class Step:
+    action: str
+    args: tuple = ()
+    # The plan step this was compiled from
+    description: str = ""
+
+    async def __call__(self, page: Page, state: dict[str, Any]) -> None:
+        await ACTIONS[self.action](page, state, *self.args)
+
+
+def _value(value: str, state: dict[str, Any]) -> str:
+    resolve = VALUES.get(value)
+    return resolve(state) if resolve is not None else value
+
+
+async def login(page: Page, state: dict[str, Any]) -> None:
+    await auth.login(page)
+
+
+async def navigate(page: Page, state: dict[str, Any], route: str) -> None:
+    await page.goto(f"{base_url()}{route}", timeout=10000)
+    await waits.page_ready(page)
+
+
+async def fill_form(page: Page, state: dict[str, Any], fields: dict[str, str]) -> None:
+    """Fill inputs by their label text."""
+    for label, value in fields.items():
+        await page.get_by_label(label, exact=True).fill(_value(value, state))
+
+
+async def submit(page: Page, state: dict[str, Any]) -> None:
+    await page.locator("form button[type=submit]").first.click()
+    await waits.settled(page)
+
+
+async def click(page: Page, state: dict[str, Any], name: str) -> None:
+    await page.get_by_role("button", name=name).or_(page.get_by_role("link", name=name)).first.click()
+    await waits.settled(page)
+
+
+async def reload(page: Page, state: dict[str, Any]) -> None:
+    await page.reload(timeout=10000)
+    await waits.page_ready(page)
+
+
+async def assert_text(page: Page, state: dict[str, Any], text: str) -> None:
+    await expect(page.get_by_text(text).first).to_be_visible(timeout=EXPECT_TIMEOUT_MS)
+
+
+async def assert_toast(page: Page, state: dict[str, Any], kind: str) -> None:
+    """A sonner toast of ``kind`` ("success", "error") is showing."""
+    await expect(page.locator(f"[data-sonner-toast][data-type={kind}]").first).to_be_visible(timeout=EXPECT_TIMEOUT_MS)
+
+
+async def assert_card(page: Page, state: dict[str, Any], title: str) -> None:
+    """A card with ``title`` is visible and shows a value, not a loading placeholder."""
+    label = page.get_by_text(title, exact=True).first
+    await expect(label).to_be_visible(timeout=EXPECT_TIMEOUT_MS)
+    await expect(label.locator("xpath=following-sibling::*[1]")).to_have_text(re.compile(r"\d"), timeout=EXPECT_TIMEOUT_MS)
+
+
+async def assert_url(page: Page, state: dict[str, Any], route: str) -> None:
+    await expect(page).to_have_url(re.compile(re.escape(base_url() + route) + r"/?([?#].*)?$"), timeout=EXPECT_TIMEOUT_MS)
+
+
+async def assert_invalid(page: Page, state: dict[str, Any], label: str) -> None:
+    """The browser's constraint validation rejects the field labelled ``label``."""
+    target = page.get_by_label(label, exact=True)
+    if await target.evaluate("(el) => el.validity.valid"):
+        raise AssertionError(f"field {label!r} was accepted")
+
+
+async def assert_session(page: Page, state: dict[str, Any]) -> None:
+    if not await auth.has_session(page):
+        raise AssertionError("no Supabase session in the page")
+
+
+async def pending(page: Page, state: dict[str, Any]) -> None:
+    raise AssertionError("no step in harness.steps implements this; extend harness.compiler.RULES")
+
+
+ACTIONS: dict[str, Callable[..., Awaitable[None]]] = {
+    "login": login,
+    "navigate": navigate,
+    "fill_form": fill_form,
+    "submit": submit,
+    "click": click,
+    "reload": reload,
+    "assert_text": assert_text,
+    "assert_toast": assert_toast,
+    "assert_card": assert_card,
+    "assert_url": assert_url,
+    "assert_invalid": assert_invalid,
+    "assert_session": assert_session,
+    "pending": pending,
+}
+
+
+class StepFailure(AssertionError):
+    """A compiled step failed; names the plan step so it is easy to find."""
+
+    def __init__(self, number: int, step: Step, error: Exception):
+        super().__init__(f"step {number} ({step.description or step.action}): {type(error).__name__}: {error}")
+        self.number = number
+        self.step = step
+
+
+async def run(steps: Sequence[Step], context: BrowserContext | None = None) -> None:
+    """Run ``steps`` on a new page of ``context``, or of a browser of its own when run standalone."""
+    if context is None:
+        async with BrowserPool() as pool, pool.context() as context:
+            await run(steps, context)
+        return
+    waits.track(context)
+    page = await context.new_page()
+    state: dict[str, Any] = {}
+    for number, step in enumerate(steps, 1):
+        try:
+            await step(page, state)
+        except Exception as exc:
+            raise StepFailure(number, step, exc) from exc
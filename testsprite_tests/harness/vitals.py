@@ -0,0 +1,190 @@
+"""Core Web Vitals collection and budgets for the TC scripts.
+
+Call :func:`install` on a page before its first navigation; it injects
+``PerformanceObserver`` hooks into every document the page loads.  After
+the interesting content is on screen, :func:`check_budgets` reads FCP,
+LCP, CLS, INP, TBT and the time until the watched texts (by default the
+four dashboard cards) became visible, appends them to
+``tmp/vitals.jsonl`` and fails the test when a budget is exceeded.
+
+Budgets come from the ``vitals`` section of ``budgets.json``: a
+``default`` entry plus optional per-test overrides keyed by TC id.  The
+defaults are web.dev's "needs improvement" limits rather than the "good"
+ones, since the suite runs against the Vite dev server.
+
+Metrics belong to the current document: FCP and LCP describe the last
+full page load, and LCP stops updating at the first click or key press.
+For content reached by a client-side navigation, :func:`mark` the moment
+the user acts and the card time is measured from that mark.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Sequence
+
+from playwright.async_api import Page
+
+from .config import TMP_DIR, load_budgets
+
+VITALS_LOG = TMP_DIR / "vitals.jsonl"
+
+DASHBOARD_CARDS = ("Agentes Ativos", "Mensagens Hoje", "Conversas Ativas", "Agendamentos Hoje")
+
+# Runs before any page script.  Times are performance.now() milliseconds.
+_OBSERVERS_JS = """
+(() => {
+  if (window.__harnessVitals) return;
+  const config = window.__harnessVitalsConfig || { watch: [] };
+  const v = window.__harnessVitals = { fcp: null, lcp: null, cls: 0, inp: null, tbt: 0, visible: {} };
+  const observe = (type, callback, options = {}) => {
+    try {
+      new PerformanceObserver((list) => list.getEntries().forEach(callback)).observe({ type, buffered: true, ...options });
+    } catch (e) { /* entry type not supported by this browser */ }
+  };
+
+  observe("paint", (e) => { if (e.name === "first-contentful-paint") v.fcp = e.startTime; });
+  observe("largest-contentful-paint", (e) => { v.lcp = e.startTime; });
+
+  // CLS: largest session window (gaps < 1 s, windows <= 5 s) of shifts not caused by input.
+  let session = 0, first = 0, last = 0;
+  observe("layout-shift", (e) => {
+    if (e.hadRecentInput) return;
+    if (session && e.startTime - last < 1000 && e.startTime - first < 5000) {
+      session += e.value;
+    } else {
+      session = e.value;
+      first = e.startTime;
+    }
+    last = e.startTime;
+    v.cls = Math.max(v.cls, session);
+  });
+
+  // INP: slowest interaction (exact for fewer than 50 interactions, which covers any TC).
+  observe("event", (e) => {
+    if (e.interactionId) v.inp = Math.max(v.inp || 0, e.duration);
+  }, { durationThreshold: 16 });
+  observe("first-input", (e) => { v.inp = Math.max(v.inp || 0, e.duration); });
+
+  // TBT: long-task time beyond 50 ms after first paint.
+  observe("longtask", (e) => {
+    if (v.fcp !== null && e.startTime >= v.fcp) v.tbt += Math.max(0, e.duration - 50);
+  });
+
+  const pending = new Set(config.watch);
+  if (!pending.size) return;
+  const isVisible = (text) => {
+    const found = document.evaluate(
+      `//body//*[contains(text(), ${JSON.stringify(text)})]`, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (let i = 0; i < found.snapshotLength; i++) {
+      const rect = found.snapshotItem(i).getBoundingClientRect();
+      if (rect.width > 0 && rect.height > 0) return true;
+    }
+    return false;
+  };
+  let scheduled = false;
+  const check = () => {
+    scheduled = false;
+    for (const text of [...pending]) {
+      if (isVisible(text)) {
+        pending.delete(text);
+        v.visible[text] = performance.now();
+      }
+    }
+    if (!pending.size) mutations.disconnect();
+  };
+  // Checked on the frame after each DOM change, i.e. roughly when it is painted.
+  const mutations = new MutationObserver(() => {
+    if (!scheduled) { scheduled = true; requestAnimationFrame(check); }
+  });
+  mutations.observe(document, { childList: true, subtree: true, characterData: true });
+})();
+"""
+
+_READ_JS = """(markName) => {
+  const v = window.__harnessVitals;
+  if (!v) return null;
+  const marks = markName ? performance.getEntriesByName(markName, "mark") : [];
+  const watch = (window.__harnessVitalsConfig || { watch: [] }).watch;
+  return { ...v, watch, mark: marks.length ? marks[marks.length - 1].startTime : null, url: location.href };
+}"""
+
+
+@dataclass
+class Vitals:
+    """Metrics of one document, in milliseconds (CLS is unitless)."""
+
+    url: str
+    fcp_ms: float | None = None
+    lcp_ms: float | None = None
+    cls: float = 0.0
+    inp_ms: float | None = None
+    tbt_ms: float = 0.0
+    watched: list[str] = field(default_factory=list)
+    # Watched text -> ms after navigation start (or after the mark) it became visible
+    visible_ms: dict[str, float] = field(default_factory=dict)
+    cards_visible_ms: float | None = None
+
+    def breaches(self, budgets: dict[str, float]) -> list[str]:
+        """Budget violations as readable strings; metrics that were not observed pass."""
+        failures = []
+        for metric, limit in budgets.items():
+            value = getattr(self, metric, None)
+            if metric == "cards_visible_ms" and value is None and self.watched:
+                missing = ", ".join(t for t in self.watched if t not in self.visible_ms)
+                failures.append(f"{metric}: never visible ({missing})")
+            elif value is not None and value > limit:
+                failures.append(f"{metric}: {value:.3g} > {limit:g}" if metric == "cls" else f"{metric}: {value:.0f} > {limit:g}")
+        return failures
+
+
+async def install(page: Page, watch: Sequence[str] = DASHBOARD_CARDS) -> None:
+    """Inject the observers into every document ``page`` loads from now on."""
+    config = json.dumps({"watch": list(watch)})
+    await page.add_init_script(script=f"window.__harnessVitalsConfig = {config};\n{_OBSERVERS_JS}")
+
+
+async def mark(page: Page, name: str) -> None:
+    """Record a ``performance.mark`` to measure card visibility from."""
+    await page.evaluate("(name) => performance.mark(name)", name)
+
+
+async def collect(page: Page, since: str | None = None) -> Vitals:
+    """Read the current document's metrics; card times are relative to mark ``since`` if given."""
+    raw = await page.evaluate(_READ_JS, since) or {"url": page.url}
+    watch = raw.get("watch") or []
+    origin = raw.get("mark") or 0.0
+    visible = {text: round(at - origin, 1) for text, at in (raw.get("visible") or {}).items()}
+    cards = max(visible.values()) if watch and len(visible) == len(watch) else None
+    return Vitals(
+        url=raw["url"],
+        fcp_ms=raw.get("fcp"),
+        lcp_ms=raw.get("lcp"),
+        cls=round(raw.get("cls") or 0.0, 4),
+        inp_ms=raw.get("inp"),
+        tbt_ms=raw.get("tbt") or 0.0,
+        watched=watch,
+        visible_ms=visible,
+        cards_visible_ms=cards,
+    )
+
+
+def budgets_for(test_id: str) -> dict[str, float]:
+    section = load_budgets("vitals")
+    return {**section.get("default", {}), **section.get(test_id, {})}
+
+
+async def check_budgets(page: Page, test_id: str, since: str | None = None) -> Vitals:
+    """Collect, log to ``tmp/vitals.jsonl`` and raise ``AssertionError`` on any budget breach."""
+    vitals = await collect(page, since)
+    budgets = budgets_for(test_id)
+    failures = vitals.breaches(budgets)
+    VITALS_LOG.parent.mkdir(parents=True, exist_ok=True)
+    with VITALS_LOG.open("a", encoding="utf-8") as fh:
+        record = {"test": test_id, "time": time.time(), **asdict(vitals), "budgets": budgets, "breaches": failures}
+        fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+    if failures:
+        raise AssertionError(f"{test_id} exceeded performance budgets on {vitals.url}: " + "; ".join(failures))
+    return vitals
@@ -0,0 +1,132 @@
+"""Condition-based waits used by the TC scripts instead of fixed sleeps.
+
+Every helper is best effort: when its condition is not met in time it
+returns ``False`` and lets the next action or ``expect`` fail with its own,
+more specific timeout, exactly as the fixed sleeps did.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+
+from playwright.async_api import BrowserContext, Error, Locator, Page, Request
+
+# URL fragments of the Supabase APIs the app talks to.
+SUPABASE_PATHS = ("/rest/v1/", "/auth/v1/", "/functions/v1/", "/storage/v1/")
+
+POLL_INTERVAL = 0.05
+
+
+def is_supabase_request(url: str) -> bool:
+    return any(fragment in url for fragment in SUPABASE_PATHS)
+
+
+class RequestTracker:
+    """Counts in-flight Supabase requests for one browser context."""
+
+    def __init__(self) -> None:
+        self.inflight: set[Request] = set()
+        self.last_change = time.monotonic()
+
+    def attach(self, context: BrowserContext) -> None:
+        context.on("request", self._started)
+        context.on("requestfinished", self._finished)
+        context.on("requestfailed", self._finished)
+
+    def _started(self, request: Request) -> None:
+        if is_supabase_request(request.url):
+            self.inflight.add(request)
+            self.last_change = time.monotonic()
+
+    def _finished(self, request: Request) -> None:
+        if request in self.inflight:
+            self.inflight.discard(request)
+            self.last_change = time.monotonic()
+
+    def quiet_for(self) -> float:
+        """Seconds since the last request started or finished, 0 while busy."""
+        return 0.0 if self.inflight else time.monotonic() - self.last_change
+
+
+_trackers: "weakref.WeakKeyDictionary[BrowserContext, RequestTracker]" = weakref.WeakKeyDictionary()
+
+
+def track(context: BrowserContext) -> RequestTracker:
+    """Start tracking Supabase requests on ``context`` (idempotent).
+
+    Call it right after creating the context so requests fired by the
+    first navigation are seen too.
+    """
+    tracker = _trackers.get(context)
+    if tracker is None:
+        tracker = _trackers[context] = RequestTracker()
+        tracker.attach(context)
+    return tracker
+
+
+async def _poll(condition, timeout_ms: int) -> bool:
+    deadline = time.monotonic() + timeout_ms / 1000
+    while not condition():
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(POLL_INTERVAL)
+    return True
+
+
+async def network_idle(page: Page, timeout_ms: int = 5000) -> bool:
+    """Wait for Playwright's ``networkidle`` (no requests for 500 ms)."""
+    try:
+        await page.wait_for_load_state("networkidle", timeout=timeout_ms)
+    except Error:
+        return False
+    return True
+
+
+async def locator_ready(locator: Locator, timeout_ms: int = 5000) -> bool:
+    """Wait until ``locator`` is attached and visible."""
+    try:
+        await locator.wait_for(state="visible", timeout=timeout_ms)
+    except Error:
+        return False
+    return True
+
+
+async def route_settled(page: Page, quiet_ms: int = 300, timeout_ms: int = 5000) -> bool:
+    """Wait until the SPA URL has stopped changing for ``quiet_ms``."""
+    state = {"url": page.url, "since": time.monotonic()}
+
+    def stable() -> bool:
+        if page.url != state["url"]:
+            state["url"], state["since"] = page.url, time.monotonic()
+        return time.monotonic() - state["since"] >= quiet_ms / 1000
+
+    return await _poll(stable, timeout_ms)
+
+
+async def supabase_drained(page: Page, quiet_ms: int = 200, timeout_ms: int = 10000) -> bool:
+    """Wait until no Supabase request has been in flight for ``quiet_ms``."""
+    tracker = track(page.context)
+    return await _poll(lambda: tracker.quiet_for() >= quiet_ms / 1000, timeout_ms)
+
+
+async def page_ready(page: Page) -> bool:
+    """After ``goto``: the document has loaded and its data requests are done."""
+    try:
+        await page.wait_for_load_state("domcontentloaded", timeout=10000)
+    except Error:
+        return False
+    return await supabase_drained(page)
+
+
+async def settled(page: Page) -> bool:
+    """After a click: any client-side navigation and the requests it fired are done.
+
+    The drain runs on both sides of the route check because a submit
+    usually awaits an auth request before it navigates, and the new route
+    then fires its own data requests.
+    """
+    drained = await supabase_drained(page)
+    routed = await route_settled(page)
+    return await supabase_drained(page) and drained and routed
@@ -0,0 +1,228 @@
+"""Pre-flight for the Vite dev server: wait until it answers, then warm it up.
+
+    python -m harness.warmup [--ready-timeout 60] [--max-passes 4]
+
+Vite pre-bundles dependencies lazily: the first page load that imports
+one it has not seen makes it re-optimize, answer the stale
+``/node_modules/.vite/deps/*.js?v=<hash>`` requests with 504 (or drop
+them, the ``ERR_EMPTY_RESPONSE`` in ``raw_report.md``) and reload the
+page.  Tests that start meanwhile spend their ``expect`` timeouts on it.
+
+The runner calls :func:`warm_up` before it releases the workers:
+
+1. poll ``localEndpoint`` until it returns 200;
+2. load every route of the test plan (the ``(/path)`` in its steps) and
+   every route the TC scripts navigate to, in a fresh context per pass,
+   noting the deps hash (``v=``), failed or 5xx app requests and reloads;
+3. repeat until a pass is clean and its deps hash equals the previous
+   pass's - the optimizer has settled.
+
+The time of each phase goes to ``tmp/warmup.json``.  An unsettled server
+is reported but does not stop the run; one that never answers does.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import time
+import urllib.error
+import urllib.request
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from playwright.async_api import BrowserContext, Error
+
+from .config import SUITE_DIR, TMP_DIR, base_url
+from .pool import BrowserPool
+from .standins.supabase import redirect_supabase
+
+PLAN_PATH = SUITE_DIR / "testsprite_frontend_test_plan.json"
+REPORT_PATH = TMP_DIR / "warmup.json"
+
+DEPS_PATH = "/node_modules/.vite/deps/"
+
+READY_TIMEOUT_S = 60.0
+MAX_PASSES = 4
+
+_PLAN_ROUTE = re.compile(r"\((/[\w/-]*)\)")
+_SCRIPT_GOTO = re.compile(r"""\.goto\(\s*['"]https?://[^/'"]+(/[^'"?#]*)?""")
+
+
+def plan_routes(path: Path = PLAN_PATH) -> set[str]:
+    """Routes named in the test plan's steps, e.g. "Navigate to the registration page (/register)"."""
+    if not path.exists():
+        return set()
+    plan = json.loads(path.read_text(encoding="utf-8"))
+    return {route for case in plan for step in case.get("steps", []) for route in _PLAN_ROUTE.findall(step["description"])}
+
+
+def script_routes(suite_dir: Path = SUITE_DIR) -> set[str]:
+    """Routes the TC scripts ``goto`` directly."""
+    return {
+        route or "/"
+        for path in suite_dir.glob("TC*.py")
+        for route in _SCRIPT_GOTO.findall(path.read_text(encoding="utf-8"))
+    }
+
+
+def routes() -> list[str]:
+    return sorted(plan_routes() | script_routes() | {"/"})
+
+
+def _status(url: str) -> int | None:
+    try:
+        with urllib.request.urlopen(url, timeout=2) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+    except OSError:
+        return None
+
+
+async def wait_ready(url: str, timeout_s: float = READY_TIMEOUT_S) -> float:
+    """Poll ``url`` until it answers 200; returns the seconds it took."""
+    started = time.monotonic()
+    while await asyncio.to_thread(_status, url) != 200:
+        if time.monotonic() - started > timeout_s:
+            raise TimeoutError(f"{url} did not answer 200 within {timeout_s:.0f} s; is the dev server running?")
+        await asyncio.sleep(0.5)
+    return time.monotonic() - started
+
+
+@dataclass
+class WarmupPass:
+    ms: int
+    routes: int
+    # The ``v=`` hashes of the pre-bundled deps the pages imported
+    deps_hashes: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    # Document loads beyond one per route: Vite's full reload after re-optimizing
+    reloads: int = 0
+
+    @property
+    def clean(self) -> bool:
+        return not self.errors and not self.reloads
+
+
+@dataclass
+class Warmup:
+    url: str
+    ready_ms: int = 0
+    passes: list[WarmupPass] = field(default_factory=list)
+    settled: bool = False
+    total_ms: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+async def load_routes(context: BrowserContext, url: str, route_list: list[str], timeout_s: float) -> WarmupPass:
+    """Load each route once in ``context`` and note what the dev server did."""
+    origin = f"{urlsplit(url).scheme}://{urlsplit(url).netloc}"
+    hashes: set[str] = set()
+    errors: list[str] = []
+    loads = 0
+
+    def on_response(response) -> None:
+        if not response.url.startswith(origin):
+            return
+        parts = urlsplit(response.url)
+        if parts.path.startswith(DEPS_PATH):
+            hashes.update(parse_qs(parts.query).get("v", []))
+        if response.status >= 500:
+            errors.append(f"{response.status} {parts.path}")
+
+    def on_failed(request) -> None:
+        if request.url.startswith(origin):
+            errors.append(f"{request.failure} {urlsplit(request.url).path}")
+
+    def on_load(_) -> None:
+        nonlocal loads
+        loads += 1
+
+    context.on("response", on_response)
+    context.on("requestfailed", on_failed)
+    started = time.perf_counter()
+    page = await context.new_page()
+    page.on("load", on_load)
+    for route in route_list:
+        try:
+            await page.goto(f"{url}{route}", wait_until="load", timeout=timeout_s * 1000)
+            await page.wait_for_load_state("networkidle", timeout=timeout_s * 1000)
+        except Error as exc:
+            errors.append(f"{route}: {str(exc).splitlines()[0]}")
+    await page.close()
+    return WarmupPass(round((time.perf_counter() - started) * 1000), len(route_list), sorted(hashes), errors, max(0, loads - len(route_list)))
+
+
+async def warm_up(
+    url: str | None = None,
+    route_list: list[str] | None = None,
+    headless: bool = True,
+    supabase_standin: str | None = None,
+    ready_timeout_s: float = READY_TIMEOUT_S,
+    max_passes: int = MAX_PASSES,
+    page_timeout_s: float = 30.0,
+) -> Warmup:
+    """Wait for the dev server, then load ``route_list`` until the optimizer settles."""
+    url = (url or base_url()).rstrip("/")
+    route_list = route_list or routes()
+    started = time.perf_counter()
+    result = Warmup(url)
+    result.ready_ms = round(await wait_ready(url, ready_timeout_s) * 1000)
+    async with BrowserPool(headless=headless) as pool:
+        if supabase_standin:
+            pool.add_context_hook(lambda context: redirect_supabase(context, supabase_standin))
+        for _ in range(max_passes):
+            # A fresh context each pass: the deps are cached immutable, so a reused one would not request them.
+            async with pool.context() as context:
+                current = await load_routes(context, url, route_list, page_timeout_s)
+            previous = result.passes[-1] if result.passes else None
+            result.passes.append(current)
+            if current.clean and previous is not None and previous.deps_hashes == current.deps_hashes:
+                result.settled = True
+                break
+    result.total_ms = round((time.perf_counter() - started) * 1000)
+    return result
+
+
+def write_report(result: Warmup, path: Path = REPORT_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result.to_dict(), indent=2), encoding="utf-8")
+
+
+def summary(result: Warmup) -> str:
+    passes = ", ".join(
+        f"{p.ms / 1000:.1f} s" + ("" if p.clean else f" ({len(p.errors)} errors, {p.reloads} reloads)") for p in result.passes
+    )
+    state = "settled" if result.settled else f"NOT settled after {len(result.passes)} passes"
+    return f"warm-up {state} in {result.total_ms / 1000:.1f} s (ready {result.ready_ms / 1000:.1f} s; passes {passes})"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.warmup", description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="dev server URL (default: config.json's localEndpoint)")
+    parser.add_argument("--ready-timeout", type=float, default=READY_TIMEOUT_S, help="seconds to wait for a 200")
+    parser.add_argument("--max-passes", type=int, default=MAX_PASSES)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--output", type=Path, default=REPORT_PATH)
+    args = parser.parse_args(argv)
+    try:
+        result = asyncio.run(warm_up(args.url, headless=not args.headed, ready_timeout_s=args.ready_timeout, max_passes=args.max_passes))
+    except TimeoutError as exc:
+        print(exc)
+        return 1
+    write_report(result, args.output)
+    print(summary(result))
+    for error in sorted({e for p in result.passes for e in p.errors}):
+        print(f"  {error}")
+    return 0 if result.settled else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,253 @@
+"""Supabase REST request counts and waterfalls per route load.
+
+    python -m harness.waterfall            # summarise tmp/waterfalls.jsonl per route
+
+In a TC script, start a capture before the navigation and check it once
+the route has settled::
+
+    load = waterfall.start(context, "dashboard")
+    await page.goto(f"{url}/dashboard")
+    await waits.page_ready(page)
+    await waterfall.check_budget(load)
+
+The capture counts ``/rest/v1/`` requests and measures how many round
+trips had to happen one after another: a request that starts only after
+another one finished is one level deeper in the waterfall.  Budgets come
+from the ``supabase`` section of ``budgets.json`` keyed by route label
+(``max_requests``, ``max_serial``); an N+1 loop raises the request count,
+an added ``await`` in a chain raises the serial depth, and either fails
+the test.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import unquote, urlsplit
+
+from .config import TMP_DIR, load_budgets
+
+WATERFALL_LOG = TMP_DIR / "waterfalls.jsonl"
+
+REST_PATH = "/rest/v1/"
+
+# Clock slack when deciding that one request started after another ended.
+SERIAL_SLACK_MS = 2.0
+
+
+@dataclass
+class RestRequest:
+    method: str
+    table: str
+    query: str
+    start_ms: float
+    end_ms: float = 0.0
+    status: int | None = None
+    failed: bool = False
+    level: int = 0
+    # The Playwright request, kept until stop() has read its status
+    request: Any = field(default=None, repr=False)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.end_ms - self.start_ms
+
+    def label(self) -> str:
+        return f"{self.method} {self.table}?{self.query}" if self.query else f"{self.method} {self.table}"
+
+
+def assign_levels(requests: list[RestRequest]) -> int:
+    """Set each request's waterfall level and return the deepest one (the serial round trips).
+
+    A request's level is one more than the deepest request that had
+    already finished when it started, i.e. the longest chain of
+    strictly sequential requests leading to it.
+    """
+    ordered = sorted(requests, key=lambda r: r.start_ms)
+    for index, request in enumerate(ordered):
+        before = [r.level for r in ordered[:index] if r.end_ms <= request.start_ms + SERIAL_SLACK_MS]
+        request.level = 1 + max(before, default=0)
+    return max((r.level for r in ordered), default=0)
+
+
+def max_in_flight(requests: list[RestRequest]) -> int:
+    events = sorted([(r.start_ms, 1) for r in requests] + [(r.end_ms, -1) for r in requests], key=lambda e: (e[0], e[1]))
+    current = peak = 0
+    for _, delta in events:
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+
+@dataclass
+class Capture:
+    """Supabase REST traffic of one browser context while a route loads."""
+
+    label: str
+    context: Any
+    requests: list[RestRequest] = field(default_factory=list)
+    _pending: dict[Any, RestRequest] = field(default_factory=dict, repr=False)
+    _last_event_ms: float = field(default_factory=lambda: time.time() * 1000, repr=False)
+    _stopped: bool = False
+
+    def _on_request(self, request) -> None:
+        parts = urlsplit(request.url)
+        if REST_PATH not in parts.path:
+            return
+        table = parts.path.split(REST_PATH, 1)[1]
+        self._last_event_ms = time.time() * 1000
+        self._pending[request] = RestRequest(request.method, table, unquote(parts.query), time.time() * 1000, request=request)
+
+    def _on_done(self, request, failed: bool) -> None:
+        entry = self._pending.pop(request, None)
+        if entry is None:
+            return
+        entry.end_ms, entry.failed = time.time() * 1000, failed
+        self._last_event_ms = entry.end_ms
+        timing = request.timing
+        # Prefer the browser's own timestamps when it has them.
+        if timing.get("startTime", -1) > 0 and timing.get("responseEnd", -1) > 0:
+            entry.start_ms = timing["startTime"]
+            entry.end_ms = timing["startTime"] + timing["responseEnd"]
+        self.requests.append(entry)
+
+    def _on_finished(self, request) -> None:
+        self._on_done(request, False)
+
+    def _on_failed(self, request) -> None:
+        self._on_done(request, True)
+
+    def attach(self) -> "Capture":
+        self.context.on("request", self._on_request)
+        self.context.on("requestfinished", self._on_finished)
+        self.context.on("requestfailed", self._on_failed)
+        return self
+
+    async def stop(self, quiet_ms: int = 300, timeout_ms: int = 10000) -> "Capture":
+        """Wait for the route's requests to drain, then stop listening and read statuses.
+
+        Requests still in flight after ``timeout_ms`` are dropped.
+        """
+        if self._stopped:
+            return self
+        deadline = time.monotonic() + timeout_ms / 1000
+        while time.monotonic() < deadline:
+            if not self._pending and time.time() * 1000 - self._last_event_ms >= quiet_ms:
+                break
+            await asyncio.sleep(0.05)
+        self._stopped = True
+        self.context.remove_listener("request", self._on_request)
+        self.context.remove_listener("requestfinished", self._on_finished)
+        self.context.remove_listener("requestfailed", self._on_failed)
+        self._pending.clear()
+        for entry in self.requests:
+            if entry.request is not None and not entry.failed:
+                response = await entry.request.response()
+                entry.status = response.status if response else None
+            entry.request = None
+        return self
+
+    def summary(self) -> dict[str, Any]:
+        serial = assign_levels(self.requests)
+        repeated = Counter(f"{r.method} {r.table}" for r in self.requests)
+        started = min((r.start_ms for r in self.requests), default=0.0)
+        return {
+            "label": self.label,
+            "requests": len(self.requests),
+            "serial": serial,
+            "max_in_flight": max_in_flight(self.requests),
+            "span_ms": round(max((r.end_ms for r in self.requests), default=started) - started, 1),
+            "repeated": {key: n for key, n in repeated.most_common() if n > 1},
+        }
+
+    def render(self, width: int = 40) -> str:
+        """ASCII waterfall, one line per request in start order."""
+        summary = self.summary()
+        lines = [
+            f"{self.label}: {summary['requests']} REST requests, {summary['serial']} serial round trips, "
+            f"max {summary['max_in_flight']} in flight, {summary['span_ms']:.0f} ms"
+        ]
+        if not self.requests:
+            return lines[0]
+        origin = min(r.start_ms for r in self.requests)
+        scale = width / max(summary["span_ms"], 1.0)
+        for request in sorted(self.requests, key=lambda r: r.start_ms):
+            offset = int((request.start_ms - origin) * scale)
+            bar = (" " * offset + "█" * max(1, round(request.duration_ms * scale)))[:width].ljust(width)
+            label = request.label()
+            label = label if len(label) <= 56 else label[:53] + "..."
+            lines.append(f"  L{request.level:<2} {label:<56} |{bar}| {request.duration_ms:6.0f} ms")
+        return "\n".join(lines)
+
+
+def start(context, label: str) -> Capture:
+    """Begin capturing the Supabase REST requests of ``context`` for route ``label``."""
+    return Capture(label, context).attach()
+
+
+def budget_for(label: str) -> dict[str, int]:
+    return load_budgets("supabase").get(label, {})
+
+
+async def check_budget(capture: Capture, test_id: str | None = None) -> dict[str, Any]:
+    """Stop ``capture``, log and print its waterfall, and fail on a budget breach."""
+    await capture.stop()
+    summary = capture.summary()
+    budget = budget_for(capture.label)
+    failures = []
+    for metric in ("requests", "serial"):
+        limit = budget.get(f"max_{metric}")
+        if limit is not None and summary[metric] > limit:
+            failures.append(f"{metric} {summary[metric]} > {limit}")
+    print(capture.render(), flush=True)
+    WATERFALL_LOG.parent.mkdir(parents=True, exist_ok=True)
+    with WATERFALL_LOG.open("a", encoding="utf-8") as fh:
+        record = {
+            "test": test_id,
+            "time": time.time(),
+            **summary,
+            "budget": budget,
+            "breaches": failures,
+            "waterfall": [
+                {"level": r.level, "request": r.label(), "start_ms": round(r.start_ms, 1), "duration_ms": round(r.duration_ms, 1), "status": r.status}
+                for r in sorted(capture.requests, key=lambda r: r.start_ms)
+            ],
+        }
+        fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+    if failures:
+        raise AssertionError(f"Supabase budget for '{capture.label}' exceeded: " + "; ".join(failures))
+    return summary
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.waterfall", description=__doc__.splitlines()[0])
+    parser.add_argument("--log", type=Path, default=WATERFALL_LOG)
+    args = parser.parse_args(argv)
+    if not args.log.exists():
+        print(f"no captures in {args.log}; run TC003/TC012/TC017 first")
+        return 1
+    by_label: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    with args.log.open(encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                record = json.loads(line)
+                by_label[record["label"]].append(record)
+    print(f"{'route':<14}{'loads':>6}{'requests':>10}{'serial':>8}{'budget':>16}")
+    for label, records in sorted(by_label.items()):
+        budget = budget_for(label)
+        limits = f"{budget.get('max_requests', '-')}/{budget.get('max_serial', '-')}"
+        print(
+            f"{label:<14}{len(records):>6}{max(r['requests'] for r in records):>10}"
+            f"{max(r['serial'] for r in records):>8}{limits:>16}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())